@@ -1,13 +1,14 @@
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from redis import Redis
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.constants.routes import AUTH_TOKEN_URL
 from app.domain.music.factory import get_provider
 from app.domain.music.interfaces.music_provider import IMusicProvider
-from app.db.database import get_db
-from app.models.user import User
+from app.db.database import SessionLocal, get_db, get_redis, redis_client
+from app.schemas.user import User as Principal
 from app.repositories.user import SQLAlchemyUserRepository, UserRepository
 from app.repositories.artist import ArtistRepository, SQLAlchemyArtistRepository
 from app.repositories.album import AlbumRepository, SQLAlchemyAlbumRepository
@@ -16,10 +17,23 @@ from app.repositories.listening_event import (
     ListeningEventRepository, 
     SQLAlchemyListeningEventRepository,
 )
+from app.repositories.ingestion_job import (
+    IngestionJobRepository,
+    RedisIngestionJobRepository,
+)
+from app.services.audio_feature_index_service import AudioFeatureIndexService
 from app.services.auth_service import AuthService
+from app.services.principal_cache import PrincipalCache
 from app.services.user_service import UserService
 from app.services.data_service import DataService
+from app.services.history_export_service import HistoryExportService
+from app.services.ingestion_job_service import IngestionJobService
+from app.services.listening_history_service import ListeningHistoryService
+from app.services.response_cache import ResponseCache
 from app.services.spotify_ingestion_service import SpotifyIngestionService
+from app.services.track_similarity_service import similar_tracks_file
+from app.core.recommendations.audio_features import AudioFeatureIndex
+from app.core.recommendations.item_similarity import SimilarTracksIndex
 from app.domain.music.interfaces.music_data_provider import IMusicDataProvider
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=AUTH_TOKEN_URL)
@@ -57,6 +71,16 @@ async def get_listening_event_repository(
 ) -> SQLAlchemyListeningEventRepository:
     return SQLAlchemyListeningEventRepository(session)
 
+async def get_principal_cache(
+    redis: Redis = Depends(get_redis)
+) -> PrincipalCache:
+    return PrincipalCache(redis)
+
+async def get_ingestion_job_repository(
+    redis: Redis = Depends(get_redis)
+) -> RedisIngestionJobRepository:
+    return RedisIngestionJobRepository(redis)
+
 
 # --- Service providers ---
 async def get_user_service(
@@ -81,6 +105,40 @@ async def get_data_service(
         ingestion=ingestion
     )
 
+async def get_listening_history_service(
+    event_repo: ListeningEventRepository = Depends(get_listening_event_repository),
+    redis: Redis = Depends(get_redis)
+) -> ListeningHistoryService:
+    return ListeningHistoryService(event_repo, redis)
+
+async def get_history_export_service() -> HistoryExportService:
+    return HistoryExportService(SessionLocal)
+
+async def get_response_cache(
+    redis: Redis = Depends(get_redis)
+) -> ResponseCache:
+    return ResponseCache(redis)
+
+def get_similar_tracks_index() -> SimilarTracksIndex:
+    index = similar_tracks_file.get()
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Similar tracks index has not been built yet"
+        )
+    return index
+
+# Shared by every request of this process; kept current from the database.
+audio_feature_index = AudioFeatureIndexService(SessionLocal, redis_client)
+
+async def get_audio_feature_index() -> AudioFeatureIndex:
+    return await audio_feature_index.get()
+
+async def get_ingestion_job_service(
+    repo: IngestionJobRepository = Depends(get_ingestion_job_repository)
+) -> IngestionJobService:
+    return IngestionJobService(repo)
+
 
 # --- Auth + Music provider ---
 async def get_music_provider(request: Request) -> IMusicProvider:
@@ -111,10 +169,21 @@ async def get_music_data_provider(request: Request) -> IMusicDataProvider:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    repo: SQLAlchemyUserRepository = Depends(get_user_repository)
-) -> User:
-    user_id: str = AuthService().decode_token(token)
-    user: User | None = await repo.get_by_id(user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    repo: UserRepository = Depends(get_user_repository),
+    principals: PrincipalCache = Depends(get_principal_cache)
+) -> Principal:
+    """
+    The authenticated user. Verified claims and the user snapshot are
+    cached, so a repeat request with the same token touches neither the
+    JWT library nor the database.
+    """
+    claims = AuthService().verify_token(token)
+    user_id = str(claims["sub"])
+    principal = principals.get(user_id)
+    if principal is None:
+        user = await repo.get_by_id(user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = Principal.model_validate(user)
+        principals.put(principal, expires_at=claims["exp"])
+    return principal
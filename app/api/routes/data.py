@@ -1,26 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from typing import Any
-import json
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime
+from pydantic import TypeAdapter
+from typing import Any, Optional
+from urllib.parse import quote
+import zipfile
 
 from app.api.deps import (
     get_data_service,
+    get_history_export_service,
+    get_ingestion_job_service,
     get_listening_event_repository,
+    get_listening_history_service,
+    get_response_cache,
     get_track_repository,
 )
-from app.repositories.listening_event import ListeningEventRepository
+from app.config import settings
+from app.repositories.listening_event import ListeningEventRepository, TopEntity
 from app.repositories.track import TrackRepository
+from app.schemas.ingestion_job import IngestionJobStatus
+from app.schemas.listening_event import ListeningHistoryPage
 from app.schemas.track import Track
-from app.schemas.listening_event import ListeningEvent
+from app.schemas.user_daily_stats import UserDailyStats
+from app.schemas.user_entity_stats import TopEntry
 from app.services.data_service import DataService
+from app.services.history_export_service import (
+    MEDIA_TYPES,
+    ExportFormat,
+    HistoryExportService,
+)
+from app.services.ingestion_job_service import IngestionJobService
+from app.services.listening_history_service import ListeningHistoryService
+from app.services.response_cache import CATALOG_SCOPE, ResponseCache, user_scope
+from app.tasks.ingestion import ingest_spotify_archive, ingest_spotify_upload
+from app.utils.cursor import InvalidCursor
+from app.utils.uploads import looks_like_json_array, spool_upload
 
 router = APIRouter(prefix="/data", tags=["Data Upload"])
 
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+# List endpoints validate ORM rows and dump JSON bytes in one pass each,
+# instead of a model per row re-encoded by FastAPI.
+_TRACKS = TypeAdapter(list[Track])
+_DAILY_STATS = TypeAdapter(list[UserDailyStats])
+_TOP_ENTRIES = TypeAdapter(list[TopEntry])
+
+
+def _json_rows(adapter: TypeAdapter, rows: Any) -> Response:
+    content = adapter.dump_json(
+        adapter.validate_python(rows, from_attributes=True)
+    )
+    return Response(content, media_type="application/json")
+
 
 @router.post("/upload/spotify", status_code=status.HTTP_202_ACCEPTED)
 async def upload_spotify_data(
     file: UploadFile = File(...),
     user_id: str = "default_user",
-    service: DataService = Depends(get_data_service)
+    jobs: IngestionJobService = Depends(get_ingestion_job_service)
 ) -> dict[str, Any]:
     if file.content_type != "application/json":
         raise HTTPException(
@@ -28,48 +69,166 @@ async def upload_spotify_data(
             detail="Invalid file type. JSON required."
         )
 
-    try:
-        contents = await file.read()
-        data = json.loads(contents.decode("utf-8"))
-    except json.JSONDecodeError:
+    if not await run_in_threadpool(looks_like_json_array, file.file):
         raise HTTPException(status_code=400, detail="Could not decode JSON.")
 
-    result = await service.process_spotify_data(data, user_id)
-    return {"message": "Data uploaded and processed", "details": result}
+    path, size = await run_in_threadpool(
+        spool_upload, file.file, settings.ingest_spool_dir, ".json"
+    )
+    job_id = jobs.create_job(user_id, size)
+    ingest_spotify_upload.delay(job_id, user_id, path)
+    return {
+        "message": "Upload accepted for processing",
+        "job_id": job_id,
+        "status_url": f"{settings.api_v1_prefix}{router.prefix}/jobs/{job_id}"
+    }
 
 
-@router.get("/users/{user_id}/listening-history")
-async def get_user_listening_history(
-    user_id: str,
-    limit: int = 100,
-    offset: int = 0,
-    repo: ListeningEventRepository = Depends(get_listening_event_repository)
+@router.post("/upload/spotify/archive", status_code=status.HTTP_202_ACCEPTED)
+async def upload_spotify_archive(
+    file: UploadFile = File(...),
+    user_id: str = "default_user",
+    jobs: IngestionJobService = Depends(get_ingestion_job_service)
 ) -> dict[str, Any]:
-    events = await repo.get_user_listening_history(
-        user_id,
-        limit,
-        offset
+    """Import a whole Spotify extended streaming history ZIP export"""
+    if file.content_type not in ZIP_CONTENT_TYPES \
+            or not await run_in_threadpool(zipfile.is_zipfile, file.file):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. ZIP archive required."
+        )
+
+    path, size = await run_in_threadpool(
+        spool_upload, file.file, settings.ingest_spool_dir, ".zip"
     )
+    job_id = jobs.create_job(user_id, size)
+    ingest_spotify_archive.delay(job_id, user_id, path)
     return {
-        "user_id": user_id,
-        "events": [ListeningEvent.model_validate(ev) for ev in events],
-        "total": len(events),
-        "limit": limit,
-        "offset": offset
+        "message": "Archive accepted for processing",
+        "job_id": job_id,
+        "status_url": f"{settings.api_v1_prefix}{router.prefix}/jobs/{job_id}"
     }
 
 
+@router.get("/jobs/{job_id}", response_model=IngestionJobStatus)
+async def get_ingestion_job(
+    job_id: str,
+    jobs: IngestionJobService = Depends(get_ingestion_job_service)
+) -> IngestionJobStatus:
+    job = jobs.get_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get(
+    "/users/{user_id}/listening-history",
+    response_model=ListeningHistoryPage
+)
+async def get_user_listening_history(
+    user_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    service: ListeningHistoryService = Depends(get_listening_history_service),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
+    """
+    Newest-first listening history. Pass the returned `next_cursor` as
+    `cursor` to get the following page; `offset` is still accepted but
+    gets slower the deeper it goes.
+    """
+    params = {
+        "limit": limit, "cursor": cursor, "offset": offset,
+        "start": start, "end": end,
+    }
+    try:
+        content = await cache.get_or_load_json(
+            "history", user_scope(user_id), params,
+            lambda: service.get_page_json(
+                user_id, limit, cursor, offset, start, end
+            )
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return Response(content, media_type="application/json")
+
+
+@router.get("/users/{user_id}/listening-history/export")
+async def export_user_listening_history(
+    user_id: str,
+    format: ExportFormat = "ndjson",
+    gzip: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    service: HistoryExportService = Depends(get_history_export_service)
+) -> StreamingResponse:
+    """
+    The whole history, oldest first, with track, artist and album names,
+    streamed as NDJSON or CSV (optionally gzipped) in constant memory.
+    """
+    # Percent-encoded, so quotes and non-latin-1 ids cannot break the header
+    filename = f"listening-history-{quote(user_id, safe='')}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        service.export(user_id, format, gzip, start, end),
+        media_type=media_type,
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="{filename}"; filename*=UTF-8\'\'{filename}'
+        },
+    )
+
+
 @router.get("/users/{user_id}/stats")
 async def get_user_stats(
     user_id: str,
-    service: DataService = Depends(get_data_service)
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    service: DataService = Depends(get_data_service),
+    cache: ResponseCache = Depends(get_response_cache)
 ) -> dict[str, Any]:
-    result = await service.get_user_stats(user_id)
+    result = await cache.get_or_load(
+        "stats", user_scope(user_id), {"start": start, "end": end},
+        lambda: service.get_user_stats(user_id, start, end)
+    )
     if result is None:
         raise HTTPException(status_code=404, detail="User not found")
     return result
 
 
+@router.get(
+    "/users/{user_id}/stats/daily",
+    response_model=list[UserDailyStats]
+)
+async def get_user_daily_stats(
+    user_id: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    repo: ListeningEventRepository = Depends(get_listening_event_repository)
+) -> Response:
+    """Per-day (UTC) plays, time played and distinct tracks; `end` exclusive"""
+    days = await repo.get_daily_stats(user_id, start, end)
+    return _json_rows(_DAILY_STATS, days)
+
+
+@router.get("/users/{user_id}/top/{entity}", response_model=list[TopEntry])
+async def get_user_top(
+    user_id: str,
+    entity: TopEntity,
+    limit: int = Query(50, ge=1, le=500),
+    repo: ListeningEventRepository = Depends(get_listening_event_repository)
+) -> Response:
+    """All-time most played tracks, artists or albums"""
+    rows = await repo.get_top(user_id, entity, limit)
+    return _json_rows(_TOP_ENTRIES, rows)
+
+
 @router.get("/tracks/{track_id}")
 async def get_track(
     track_id: str,
@@ -84,7 +243,24 @@ async def get_track(
 @router.get("/artists/{artist_id}/tracks", response_model=list[Track])
 async def get_artist_tracks(
     artist_id: str, 
-    repo: TrackRepository = Depends(get_track_repository)
-) -> list[Track]:
-    tracks = await repo.get_by_artist_id(artist_id)
-    return [Track.model_validate(track) for track in tracks]
+    repo: TrackRepository = Depends(get_track_repository),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
+    async def load() -> bytes:
+        tracks = await repo.get_by_artist_id(artist_id)
+        return _TRACKS.dump_json(
+            _TRACKS.validate_python(tracks, from_attributes=True)
+        )
+
+    content = await cache.get_or_load_json(
+        "artist_tracks", CATALOG_SCOPE, {"artist_id": artist_id}, load
+    )
+    return Response(content, media_type="application/json")
+
+
+@router.get("/cache/metrics")
+async def get_cache_metrics(
+    cache: ResponseCache = Depends(get_response_cache)
+) -> dict[str, dict[str, int]]:
+    """Response cache hits and misses per endpoint"""
+    return cache.metrics()
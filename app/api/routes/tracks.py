@@ -1,11 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from app.api.deps import get_track_repository
-from app.schemas.track import Track, TrackCreate
+from app.api.deps import (
+    get_audio_feature_index,
+    get_similar_tracks_index,
+    get_track_repository,
+)
+from app.core.recommendations.audio_features import (
+    AudioFeatureIndex,
+    Ranges,
+    parse_range,
+)
+from app.core.recommendations.item_similarity import SimilarTracksIndex
+from app.schemas.track import AudioFeatureMatch, SimilarTrack, Track, TrackCreate
 from app.repositories.track import TrackRepository
 
 router = APIRouter(prefix="/tracks", tags=["Tracks"])
 
+WHERE_DESCRIPTION = (
+    "Audio-feature range as feature:min:max, either bound optional "
+    "(tempo:120:130, energy:0.7:); repeat for several"
+)
+
+
+def _ranges(where: list[str]) -> Ranges:
+    try:
+        return dict(parse_range(spec) for spec in where)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+
 
 @router.post("/", response_model=Track, status_code=status.HTTP_201_CREATED)
 async def create_track(
@@ -16,6 +40,19 @@ async def create_track(
     return Track.model_validate(created)
 
 
+@router.get("/audio-features/search", response_model=list[AudioFeatureMatch])
+async def search_audio_features(
+    where: list[str] = Query(..., description=WHERE_DESCRIPTION),
+    limit: int = Query(100, ge=1, le=1000),
+    index: AudioFeatureIndex = Depends(get_audio_feature_index)
+) -> list[AudioFeatureMatch]:
+    """Tracks whose audio features fall in every given range"""
+    return [
+        AudioFeatureMatch(track_id=track_id)
+        for track_id, _ in index.search(_ranges(where), limit)
+    ]
+
+
 @router.get("/{track_id}", response_model=Track)
 async def get_track(
     track_id: str,
@@ -25,3 +62,37 @@ async def get_track(
     if not found:
         raise HTTPException(status_code=404, detail="Track not found")
     return Track.model_validate(found)
+
+
+@router.get("/{track_id}/similar", response_model=list[SimilarTrack])
+async def get_similar_tracks(
+    track_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    index: SimilarTracksIndex = Depends(get_similar_tracks_index)
+) -> list[SimilarTrack]:
+    """Tracks most often listened to by the same people, best first"""
+    if track_id not in index:
+        raise HTTPException(status_code=404, detail="Track not in the index")
+    return [
+        SimilarTrack(track_id=neighbor, score=score)
+        for neighbor, score in index.similar(track_id, limit)
+    ]
+
+
+@router.get("/{track_id}/sounds-like", response_model=list[AudioFeatureMatch])
+async def get_sounds_like(
+    track_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    where: list[str] = Query([], description=WHERE_DESCRIPTION),
+    index: AudioFeatureIndex = Depends(get_audio_feature_index)
+) -> list[AudioFeatureMatch]:
+    """Tracks with the closest audio features, closest first"""
+    ranges = _ranges(where)
+    if track_id not in index:
+        raise HTTPException(
+            status_code=404, detail="Track has no audio features indexed"
+        )
+    return [
+        AudioFeatureMatch(track_id=match, distance=distance)
+        for match, distance in index.sounds_like(track_id, limit, ranges)
+    ]
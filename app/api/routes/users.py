@@ -9,7 +9,6 @@ from app.api.deps import (
     get_music_provider
 )
 from app.domain.music.interfaces.music_data_provider import IMusicDataProvider
-from app.models.user import User
 from app.repositories.user import SQLAlchemyUserRepository
 from app.schemas.track import Track
 from app.schemas.user import UserCreate, User as UserOut 
@@ -34,7 +33,7 @@ async def create_user(
 
 @router.get("/me", response_model=UserOut)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: UserOut = Depends(get_current_user)
 ) -> UserOut:
     return current_user
 
@@ -64,7 +63,9 @@ async def get_user_summary(
     return {
         "user": UserOut.model_validate(user),
         "stats": {
-            "total_listening_events": len(user.listening_events),
+            "total_listening_events": await repo.count_listening_events(
+                user.id
+            ),
             "member_since": user.created_at
         }
     }
@@ -0,0 +1,49 @@
+"""Process-wide pooled HTTP client for outbound API calls."""
+import httpx
+
+from app.config import settings
+
+_client: httpx.AsyncClient | None = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """A keep-alive, HTTP/2 capable client sized from the settings"""
+    return httpx.AsyncClient(
+        http2=settings.http_http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.http_timeout_seconds,
+            connect=settings.http_connect_timeout_seconds,
+        ),
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the shared client; called from the application lifespan"""
+    global _client
+    if _client is None:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    The shared client. Outside the API (scripts, tests) it is created on
+    first use; code running its own event loops, like Celery tasks, should
+    pass a client of its own to the Spotify clients instead.
+    """
+    global _client
+    if _client is None:
+        _client = create_http_client()
+    return _client
@@ -1,18 +1,105 @@
-from typing import Any, Optional
-import httpx
+from redis import Redis, RedisError
+from typing import Any, Optional, Sequence
+import asyncio
 import base64
+import httpx
+import json
+import logging
+import time
 
+from app.clients.http import get_http_client
 from app.config import Settings
-from app.constants.spotify import SPOTIFY_API_BASE_URL, SPOTIFY_TOKEN_URL
 
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_KEY = "spotify:client_token"
 
-class SpotifyClient:
-    BASE_URL = SPOTIFY_API_BASE_URL
-    TOKEN_URL = SPOTIFY_TOKEN_URL
 
-    def __init__(self, settings: Settings) -> None:
+def retry_after_seconds(resp: httpx.Response, default: float = 1.0) -> float:
+    """Delay requested by a 429 response's Retry-After header"""
+    try:
+        return max(float(resp.headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return default
+
+
+class SpotifyClient:
+    def __init__(
+            self,
+            settings: Settings,
+            http: Optional[httpx.AsyncClient] = None,
+            redis: Optional[Redis] = None
+    ) -> None:
         self._settings = settings
+        self.base_url = settings.spotify_api_base_url
+        self.token_url = settings.spotify_token_url
+        self._http = http or get_http_client()
+        # Shares the client-credentials token with other processes.
+        self._redis = redis
         self._access_token: Optional[str] = None
+        self._expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+
+    def _token_is_fresh(self) -> bool:
+        margin = self._settings.spotify_token_refresh_margin_seconds
+        return (
+            self._access_token is not None
+            and time.time() < self._expires_at - margin
+        )
+
+    async def _get_token(self, stale: Optional[str] = None) -> str:
+        """
+        A valid access token, refreshed ahead of its expiry. Concurrent
+        callers share one refresh. `stale` is a token the API has just
+        rejected; it is never returned again.
+        """
+        if self._token_is_fresh() and self._access_token != stale:
+            return self._access_token  # type: ignore[return-value]
+
+        async with self._token_lock:
+            # Another coroutine may have refreshed while we waited.
+            if self._token_is_fresh() and self._access_token != stale:
+                return self._access_token  # type: ignore[return-value]
+            if not self._load_shared_token(stale):
+                await self._authenticate()
+                self._store_shared_token()
+            return self._access_token  # type: ignore[return-value]
+
+    def _load_shared_token(self, stale: Optional[str]) -> bool:
+        if self._redis is None:
+            return False
+        try:
+            cached = self._redis.get(TOKEN_CACHE_KEY)
+        except RedisError as e:
+            logger.warning("Could not read the shared Spotify token: %s", e)
+            return False
+        if not cached:
+            return False
+        token = json.loads(cached)
+        if token["access_token"] == stale:
+            return False
+        self._access_token = token["access_token"]
+        self._expires_at = token["expires_at"]
+        return self._token_is_fresh()
+
+    def _store_shared_token(self) -> None:
+        if self._redis is None:
+            return
+        margin = self._settings.spotify_token_refresh_margin_seconds
+        ttl = int(self._expires_at - margin - time.time())
+        if ttl <= 0:
+            return
+        try:
+            self._redis.set(
+                TOKEN_CACHE_KEY,
+                json.dumps({
+                    "access_token": self._access_token,
+                    "expires_at": self._expires_at,
+                }),
+                ex=ttl
+            )
+        except RedisError as e:
+            logger.warning("Could not share the Spotify token: %s", e)
 
     async def _authenticate(self) -> None:
         client_id = self._settings.spotify_client_id
@@ -26,22 +113,62 @@ class SpotifyClient:
         }
         data = {"grant_type": "client_credentials"}
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(self.TOKEN_URL, headers=headers, data=data)
-            resp.raise_for_status()
-            self._access_token = resp.json()["access_token"]
+        resp = await self._http.post(self.token_url, headers=headers, data=data)
+        resp.raise_for_status()
+        token = resp.json()
+        self._access_token = token["access_token"]
+        self._expires_at = time.time() + int(token.get("expires_in", 3600))
 
     async def get(
-            self, 
-            endpoint: str, 
+            self,
+            endpoint: str,
             params: Optional[dict] = None
     ) -> dict[str, Any]:
-        if not self._access_token:
-            await self._authenticate()
-
-        headers = {"Authorization": f"Bearer {self._access_token}"}
-        async with httpx.AsyncClient(base_url=self.BASE_URL) as client:
-            resp = await client.get(endpoint, headers=headers, params=params)
-            resp.raise_for_status()
-            json_data: dict[str, Any] = resp.json()
-            return json_data
+        """
+        GET an API endpoint. A 401 re-authenticates once; a 429 waits for
+        `Retry-After` and retries up to `spotify_max_retries` times.
+        """
+        token = await self._get_token()
+        reauthenticated = False
+        retries = 0
+        while True:
+            resp = await self._send(endpoint, token, params)
+            if resp.status_code == httpx.codes.UNAUTHORIZED and not reauthenticated:
+                # Revoked or expired early: re-authenticate once and retry.
+                token = await self._get_token(stale=token)
+                reauthenticated = True
+                continue
+            if resp.status_code == httpx.codes.TOO_MANY_REQUESTS \
+                    and retries < self._settings.spotify_max_retries:
+                retries += 1
+                delay = retry_after_seconds(resp)
+                logger.info("Spotify rate limit hit; retrying in %ss", delay)
+                await asyncio.sleep(delay)
+                continue
+            break
+        resp.raise_for_status()
+        json_data: dict[str, Any] = resp.json()
+        return json_data
+
+    async def get_audio_features(
+            self,
+            track_ids: Sequence[str]
+    ) -> list[Optional[dict[str, Any]]]:
+        """
+        Audio features of up to 100 tracks, in the order of `track_ids`;
+        None for tracks Spotify has no features for.
+        """
+        data = await self.get("/audio-features", {"ids": ",".join(track_ids)})
+        return data.get("audio_features") or [None] * len(track_ids)
+
+    async def _send(
+            self,
+            endpoint: str,
+            token: str,
+            params: Optional[dict] = None
+    ) -> httpx.Response:
+        return await self._http.get(
+            f"{self.base_url}{endpoint}",
+            headers={"Authorization": f"Bearer {token}"},
+            params=params
+        )
@@ -5,6 +5,7 @@ import os
 import logging
 
 from app.constants.routes import API_PREFIX
+from app.constants.spotify import SPOTIFY_API_BASE_URL, SPOTIFY_TOKEN_URL
 
 __all__ = ["settings"]
 
@@ -30,11 +31,115 @@ class Settings(BaseSettings):
     debug: bool = False
     secret_key: str = Field(..., min_length=16)
     algorithm: str = "HS256"
+    auth_claims_cache_size: int = Field(
+        10000, gt=0, description="Verified tokens remembered per process"
+    )
+    auth_principal_ttl_seconds: int = Field(
+        300, gt=0, description="Longest life of a cached user snapshot"
+    )
 
     # --- External APIs ---
     spotify_client_id: Optional[str] = None
     spotify_client_secret: Optional[str] = None
     spotify_redirect_uri: Optional[str] = None
+    # Point both at a stand-in server (scripts/mock_spotify_server.py) to
+    # test or benchmark without the real API.
+    spotify_api_base_url: str = SPOTIFY_API_BASE_URL
+    spotify_token_url: str = SPOTIFY_TOKEN_URL
+    spotify_token_refresh_margin_seconds: int = Field(
+        60, ge=0, description="Refresh app tokens this long before expiry"
+    )
+    spotify_max_retries: int = Field(
+        3, ge=0, description="Retries of a request answered with 429"
+    )
+
+    # --- Enrichment ---
+    enrich_max_in_flight: int = Field(
+        4, gt=0, description="Concurrent Spotify requests per enrichment job"
+    )
+
+    # --- Outbound HTTP (shared connection pool) ---
+    http_http2: bool = Field(True, description="Negotiate HTTP/2 when possible")
+    http_max_connections: int = Field(
+        100, gt=0, description="Open connections across all hosts"
+    )
+    http_max_keepalive_connections: int = Field(
+        20, ge=0, description="Idle connections kept alive for reuse"
+    )
+    http_keepalive_expiry_seconds: float = Field(30.0, gt=0)
+    http_timeout_seconds: float = Field(
+        10.0, gt=0, description="Read, write and pool timeout per request"
+    )
+    http_connect_timeout_seconds: float = Field(5.0, gt=0)
+
+    # --- Ingestion ---
+    # Statements of a chunk are split further where they would exceed
+    # Postgres's bind-parameter limit (app.db.batching).
+    ingest_chunk_size: int = Field(
+        2000, gt=0, description="Records written per bulk ingestion chunk"
+    )
+    ingest_max_reported_errors: int = Field(
+        100, ge=0, description="Invalid record indexes returned per upload"
+    )
+    ingest_spool_dir: str = "./data/raw/uploads"
+    worker_concurrency: int = Field(
+        4, gt=0, description="Processes of the default Celery worker (all tasks)"
+    )
+    ingest_job_ttl_seconds: int = 7 * 24 * 3600
+    ingest_parse_processes: Optional[int] = Field(
+        None, gt=0, description="Archive parser processes (default: CPU count)"
+    )
+    ingest_use_copy: bool = Field(
+        False, description="Load plays with COPY into a staging table"
+    )
+    ingest_copy_chunk_size: int = Field(
+        50000, gt=0, description="Records per COPY batch when ingest_use_copy"
+    )
+    history_count_ttl_seconds: int = Field(
+        300, gt=0, description="Lifetime of cached listening history totals"
+    )
+    response_cache_ttl_seconds: int = Field(
+        600, gt=0, description="Lifetime of cached stats and history responses"
+    )
+    export_batch_size: int = Field(
+        5000, gt=0, description="Rows fetched per round trip by history exports"
+    )
+    export_dir: str = "./data/exports"
+    export_compression: str = Field(
+        "zstd", description="Parquet codec: zstd, snappy, gzip or none"
+    )
+    partition_months_ahead: int = Field(
+        3, ge=0, description="Future listening_events partitions kept created"
+    )
+
+    # --- Analysis ---
+    genre_batch_users: int = Field(
+        500, gt=0, description="Users scored together by the genre engine"
+    )
+
+    similar_tracks_k: int = Field(
+        50, gt=0, description="Neighbours kept per track by the similarity index"
+    )
+    similar_tracks_min_listeners: int = Field(
+        2, gt=0, description="Listeners a track needs to enter the index"
+    )
+    similar_tracks_block_size: int = Field(
+        2000, gt=0, description="Tracks per block of the similarity build"
+    )
+    similar_tracks_reload_seconds: float = Field(
+        60.0, ge=0, description="How often the API checks for a rebuilt index"
+    )
+    audio_index_refresh_seconds: float = Field(
+        30.0, ge=0,
+        description="How often the API checks for newly enriched tracks"
+    )
+    audio_index_batch_size: int = Field(
+        50000, gt=0, description="Tracks per fetch when loading the audio-feature index"
+    )
+    audio_index_brute_force_limit: int = Field(
+        50000, gt=0,
+        description="Filtered candidates compared directly instead of via the tree"
+    )
 
     # --- ML / Model Config ---
     model_path: str = "./data/models/"
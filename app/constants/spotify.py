@@ -1,3 +1,30 @@
+import re
+import uuid
+
 SPOTIFY_API_BASE_URL = "https://api.spotify.com/v1"
 SPOTIFY_AUTH_URL = "https://accounts.spotify.com/authorize"
 SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+# Listening history files inside a Spotify "extended streaming history" export
+SPOTIFY_HISTORY_FILE_PATTERNS = (
+    "Streaming_History_Audio_*.json",
+    "endsong_*.json",
+)
+
+# Track columns filled from GET /audio-features
+SPOTIFY_AUDIO_FEATURES = (
+    "acousticness", "danceability", "energy", "instrumentalness", "liveness",
+    "loudness", "speechiness", "tempo", "valence",
+)
+# Most ids accepted by GET /audio-features per request
+SPOTIFY_AUDIO_FEATURES_BATCH_SIZE = 100
+SPOTIFY_TRACK_ID_LENGTH = 22
+
+# "spotify:track:<id>" as found in `spotify_track_uri`; the id is the
+# track's primary key.
+SPOTIFY_TRACK_URI_PATTERN = re.compile(
+    rf"^spotify:track:([0-9A-Za-z]{{{SPOTIFY_TRACK_ID_LENGTH}}})$"
+)
+
+# Namespace for deterministic ids of tracks known only by name
+TRACK_ID_NAMESPACE = uuid.UUID("7c2b8a4e-5f1d-4c36-9a0e-3b8f6d2e1c57")
@@ -0,0 +1,111 @@
+"""Time-decayed, duration-weighted genre preference scores."""
+from datetime import date, datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+SCORE_COLUMNS = ["user_id", "genre", "period", "preference_score"]
+
+
+class Period(NamedTuple):
+    name: str
+    # Plays older than this are ignored (None: the whole history).
+    window_days: Optional[int]
+    # A play this old counts half as much as one today.
+    half_life_days: float
+
+
+PERIODS = (
+    Period("short_term", 28, 7.0),
+    Period("medium_term", 182, 30.0),
+    Period("long_term", None, 365.0),
+)
+
+
+def compute_genre_scores(
+    plays: pd.DataFrame,
+    as_of: datetime,
+    periods: tuple[Period, ...] = PERIODS,
+) -> pd.DataFrame:
+    """
+    Genre scores for every user and period in `plays`.
+
+    `plays` has one row per user, artist and day: `user_id`, `day` (date),
+    `genres` (the artist's genre list) and `ms_played`. Time played is
+    split evenly across an artist's genres and decayed by the play's age;
+    each user's scores in a period sum to 1. Artists without genres are
+    left out.
+    """
+    if plays.empty:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    days = pd.to_datetime(plays["day"]).to_numpy("datetime64[D]")
+    today = np.datetime64(as_of.date(), "D")
+    age = (today - days).astype(np.float64)
+    genres = plays["genres"].map(lambda g: list(g) if g is not None else [])
+    counts = genres.map(len).to_numpy()
+
+    keep = counts > 0
+    if not keep.any():
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+    repeat = counts[keep]
+    # One row per (play, genre).
+    frame = pd.DataFrame({
+        "user_id": np.repeat(plays["user_id"].to_numpy()[keep], repeat),
+        "genre": np.concatenate(genres[keep].to_list()),
+        "age": np.repeat(age[keep], repeat),
+        "weight": np.repeat(
+            plays["ms_played"].to_numpy(np.float64)[keep] / repeat, repeat
+        ),
+    })
+
+    scores = []
+    for period in periods:
+        part = frame
+        if period.window_days is not None:
+            part = frame[frame["age"] < period.window_days]
+        if part.empty:
+            continue
+        decayed = part["weight"] * np.exp2(-part["age"] / period.half_life_days)
+        totals = (
+            decayed.groupby([part["user_id"], part["genre"]]).sum()
+            .rename("preference_score").reset_index()
+        )
+        totals["preference_score"] /= (
+            totals.groupby("user_id")["preference_score"].transform("sum")
+        )
+        totals["period"] = period.name
+        scores.append(totals[totals["preference_score"] > 0])
+
+    if not scores:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+    return pd.concat(scores, ignore_index=True)[SCORE_COLUMNS]
+
+
+def window_expiries(
+    plays: pd.DataFrame,
+    as_of: datetime,
+    periods: tuple[Period, ...] = PERIODS,
+) -> Dict[str, date]:
+    """
+    Per user in `plays`, the first day on which one of their plays leaves
+    a windowed period it counted in on `as_of`, i.e. when scores computed
+    on `as_of` go stale without any new data. Users with no play inside
+    any window are left out.
+    """
+    if plays.empty:
+        return {}
+    days = pd.to_datetime(plays["day"]).dt.date
+    today = as_of.date()
+    expiries: Dict[str, date] = {}
+    for period in periods:
+        if period.window_days is None:
+            continue
+        inside = days > today - timedelta(days=period.window_days)
+        oldest = days[inside].groupby(plays["user_id"][inside]).min()
+        for user_id, day in oldest.items():
+            expiry = day + timedelta(days=period.window_days)
+            if user_id not in expiries or expiry < expiries[user_id]:
+                expiries[user_id] = expiry
+    return expiries
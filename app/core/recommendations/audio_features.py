@@ -0,0 +1,195 @@
+"""Nearest-neighbour and range queries over track audio features."""
+import copy
+from typing import Dict, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from app.constants.spotify import SPOTIFY_AUDIO_FEATURES
+
+FEATURES = SPOTIFY_AUDIO_FEATURES
+
+# Fixed scales (not fitted to the data), so vectors added later are
+# normalized exactly like the ones already in the tree.
+FEATURE_RANGES: Dict[str, tuple[float, float]] = {
+    **{name: (0.0, 1.0) for name in FEATURES},
+    "loudness": (-60.0, 0.0),
+    "tempo": (0.0, 250.0),
+}
+_LOW = np.array([FEATURE_RANGES[name][0] for name in FEATURES], dtype=np.float32)
+_SPAN = np.array(
+    [FEATURE_RANGES[name][1] - FEATURE_RANGES[name][0] for name in FEATURES],
+    dtype=np.float32,
+)
+
+# feature -> (min, max), either end None for an open range
+Ranges = Mapping[str, tuple[Optional[float], Optional[float]]]
+
+
+class AudioMatch(NamedTuple):
+    track_id: str
+    distance: Optional[float]
+
+
+def normalize(features: np.ndarray) -> np.ndarray:
+    return np.clip((features - _LOW) / _SPAN, 0.0, 1.0)
+
+
+def parse_range(spec: str) -> tuple[str, tuple[Optional[float], Optional[float]]]:
+    """
+    "tempo:120:130" -> ("tempo", (120.0, 130.0)); either bound may be
+    empty ("energy:0.7:"). Raises ValueError for anything else.
+    """
+    name, _, bounds = spec.partition(":")
+    low, sep, high = bounds.partition(":")
+    if name not in FEATURE_RANGES or not sep:
+        raise ValueError(f"Invalid feature range {spec!r}")
+    return name, (float(low) if low else None, float(high) if high else None)
+
+
+class AudioFeatureIndex:
+    """
+    Audio-feature vectors of every enriched track. Tracks added after the
+    last build go to a small unindexed tail that is searched by brute
+    force; once the tail outgrows `max_tail_ratio` of the tree, the tree is
+    rebuilt over everything.
+
+    Queries whose range filters leave at most `brute_force_limit` candidates
+    compare against those directly, which beats walking the tree for
+    selective filters.
+    """
+    def __init__(
+        self,
+        leaf_size: int = 40,
+        max_tail_ratio: float = 0.1,
+        brute_force_limit: int = 50000
+    ):
+        self.leaf_size = leaf_size
+        self.max_tail_ratio = max_tail_ratio
+        self.brute_force_limit = brute_force_limit
+        self.track_ids = np.empty(0, dtype=object)
+        self.features = np.empty((0, len(FEATURES)), dtype=np.float32)
+        self.vectors = np.empty((0, len(FEATURES)), dtype=np.float32)
+        # False for rows superseded by a later update of the same track
+        self.live = np.empty(0, dtype=bool)
+        self._rows: Dict[str, int] = {}
+        self._tree: Optional[KDTree] = None
+        self._tree_size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, track_id: str) -> bool:
+        return track_id in self._rows
+
+    def added(
+        self,
+        track_ids: Sequence[str],
+        features: np.ndarray
+    ) -> "AudioFeatureIndex":
+        """
+        A copy with the tracks added or replaced. This index is left as it
+        is, so it can keep answering queries while the copy is built.
+        """
+        updated = copy.copy(self)
+        updated.live = self.live.copy()
+        updated._rows = dict(self._rows)
+        updated.add(track_ids, features)
+        return updated
+
+    def add(self, track_ids: Sequence[str], features: np.ndarray) -> None:
+        """Add or replace tracks; `features` is (n, 9) in FEATURES order"""
+        if not len(track_ids):
+            return
+        features = np.asarray(features, dtype=np.float32)
+        start = len(self.track_ids)
+        for track_id in track_ids:
+            old = self._rows.get(track_id)
+            if old is not None:
+                self.live[old] = False
+        self._rows.update(
+            (track_id, start + i) for i, track_id in enumerate(track_ids)
+        )
+        self.track_ids = np.concatenate(
+            [self.track_ids, np.asarray(track_ids, dtype=object)]
+        )
+        self.features = np.vstack([self.features, features])
+        self.vectors = np.vstack([self.vectors, normalize(features)])
+        self.live = np.concatenate([self.live, np.ones(len(track_ids), bool)])
+
+        tail = len(self.track_ids) - self._tree_size
+        if tail > self.max_tail_ratio * max(self._tree_size, 1):
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        keep = np.flatnonzero(self.live)
+        self.track_ids = self.track_ids[keep]
+        self.features = self.features[keep]
+        self.vectors = self.vectors[keep]
+        self.live = np.ones(keep.size, dtype=bool)
+        self._rows = {track_id: row for row, track_id in enumerate(self.track_ids)}
+        self._tree = KDTree(self.vectors, leaf_size=self.leaf_size)
+        self._tree_size = keep.size
+
+    def _mask(self, ranges: Ranges) -> np.ndarray:
+        mask = self.live.copy()
+        for name, (low, high) in ranges.items():
+            column = self.features[:, FEATURES.index(name)]
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+        return mask
+
+    def search(self, ranges: Ranges, limit: int = 100) -> list[AudioMatch]:
+        """Tracks whose raw feature values fall in every range"""
+        rows = np.flatnonzero(self._mask(ranges))[:limit]
+        return [AudioMatch(str(self.track_ids[row]), None) for row in rows]
+
+    def sounds_like(
+        self,
+        track_id: str,
+        k: int = 20,
+        ranges: Optional[Ranges] = None,
+    ) -> list[AudioMatch]:
+        """
+        The `k` tracks closest to `track_id` in normalized feature space,
+        restricted to `ranges`. Empty for tracks not in the index.
+        """
+        row = self._rows.get(track_id)
+        if row is None:
+            return []
+        target = self.vectors[row]
+        mask = self._mask(ranges or {})
+        mask[row] = False
+        candidates = np.flatnonzero(mask)
+        if candidates.size <= self.brute_force_limit or self._tree is None:
+            return self._closest(target, candidates, k)
+
+        # Plenty of candidates: walk the tree, widening the search until
+        # enough neighbours pass the filters, then add the tail's matches.
+        tail = candidates[candidates >= self._tree_size]
+        wanted = k
+        while True:
+            wanted = min(wanted * 4, self._tree_size)
+            _, found = self._tree.query(target[None, :], k=wanted)
+            found = found[0][mask[found[0]]]
+            if found.size >= k or wanted == self._tree_size:
+                break
+        return self._closest(target, np.concatenate([found[:k], tail]), k)
+
+    def _closest(
+        self,
+        target: np.ndarray,
+        rows: np.ndarray,
+        k: int
+    ) -> list[AudioMatch]:
+        distances = np.linalg.norm(self.vectors[rows] - target, axis=1)
+        if rows.size > k:
+            keep = np.argpartition(distances, k)[:k]
+            rows, distances = rows[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return [
+            AudioMatch(str(self.track_ids[rows[i]]), float(distances[i]))
+            for i in order
+        ]
@@ -0,0 +1,196 @@
+"""Item-item cosine similarity over co-listening, computed in blocks."""
+from pathlib import Path
+from typing import NamedTuple, Optional
+import os
+import threading
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def interaction_matrix(
+    user_codes: np.ndarray,
+    track_codes: np.ndarray,
+    plays: np.ndarray,
+    shape: tuple[int, int],
+) -> sp.csr_matrix:
+    """
+    User x track matrix of log-damped play counts, so that a few tracks on
+    repeat do not dominate a user's row.
+    """
+    return sp.csr_matrix(
+        (np.log1p(plays).astype(np.float32), (user_codes, track_codes)),
+        shape=shape,
+    )
+
+
+def top_k_neighbors(
+    matrix: sp.spmatrix,
+    k: int,
+    block_size: int = 2000,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The `k` most cosine-similar columns of `matrix` for every column, as
+    (neighbors, scores) arrays of shape (n_columns, k), best first. Missing
+    neighbours are -1 with score 0.
+
+    Similarities are computed for `block_size` columns at a time, so peak
+    memory is one block's rows of the item-item matrix rather than all of
+    it.
+    """
+    csc = sp.csc_matrix(matrix, dtype=np.float32)
+    norms = np.sqrt(np.asarray(csc.multiply(csc).sum(axis=0))).ravel()
+    norms[norms == 0] = 1.0
+    normalized = csc @ sp.diags(1.0 / norms, dtype=np.float32)
+    transposed = normalized.T.tocsr()
+
+    n_items = csc.shape[1]
+    neighbors = np.full((n_items, k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, k), dtype=np.float32)
+    for start in range(0, n_items, block_size):
+        stop = min(start + block_size, n_items)
+        block = (transposed[start:stop] @ normalized).tocsr()
+        # An item is not its own neighbour.
+        block.setdiag(0, k=start)
+        block.eliminate_zeros()
+        for row in range(stop - start):
+            lo, hi = block.indptr[row], block.indptr[row + 1]
+            if lo == hi:
+                continue
+            data = block.data[lo:hi]
+            cols = block.indices[lo:hi]
+            if hi - lo > k:
+                keep = np.argpartition(data, -k)[-k:]
+                data, cols = data[keep], cols[keep]
+            order = np.argsort(-data, kind="stable")
+            neighbors[start + row, :order.size] = cols[order]
+            scores[start + row, :order.size] = data[order]
+    return neighbors, scores
+
+
+class SimilarTrack(NamedTuple):
+    track_id: str
+    score: float
+
+
+class SimilarTracksIndex:
+    """Neighbour lists of every indexed track, held in memory"""
+    def __init__(
+        self,
+        track_ids: np.ndarray,
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+    ):
+        self.track_ids = track_ids
+        self.neighbors = neighbors
+        self.scores = scores
+        self._rows = {track_id: row for row, track_id in enumerate(track_ids)}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, track_id: str) -> bool:
+        return track_id in self._rows
+
+    def similar(self, track_id: str, limit: int = 20) -> list[SimilarTrack]:
+        """Best neighbours first; empty for tracks not in the index"""
+        row = self._rows.get(track_id)
+        if row is None:
+            return []
+        found = self.neighbors[row, :limit]
+        found = found[found >= 0]
+        return [
+            SimilarTrack(str(self.track_ids[n]), float(score))
+            for n, score in zip(found, self.scores[row, :found.size])
+        ]
+
+    def save(self, path: Path) -> None:
+        """Write atomically: readers see the old file or the new one"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                track_ids=np.asarray(self.track_ids, dtype=str),
+                neighbors=self.neighbors,
+                scores=self.scores,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SimilarTracksIndex":
+        with np.load(path) as data:
+            return cls(data["track_ids"], data["neighbors"], data["scores"])
+
+    @classmethod
+    def build(
+        cls,
+        user_codes: np.ndarray,
+        track_codes: np.ndarray,
+        plays: np.ndarray,
+        track_ids: np.ndarray,
+        k: int,
+        min_listeners: int = 2,
+        block_size: int = 2000,
+    ) -> "SimilarTracksIndex":
+        """
+        From (user, track, plays) triples, users and tracks given as
+        integer codes; `track_ids[code]` is a track's id. Tracks with fewer
+        than `min_listeners` distinct listeners are left out: their
+        similarities rest on one person's taste.
+        """
+        listeners = np.bincount(track_codes, minlength=len(track_ids))
+        kept = np.flatnonzero(listeners >= min_listeners)
+        remap = np.full(len(track_ids), -1, dtype=np.int64)
+        remap[kept] = np.arange(kept.size)
+        mask = remap[track_codes] >= 0
+
+        matrix = interaction_matrix(
+            user_codes[mask],
+            remap[track_codes[mask]],
+            plays[mask],
+            (int(user_codes.max(initial=-1)) + 1, kept.size),
+        )
+        neighbors, scores = top_k_neighbors(matrix, k, block_size)
+        return cls(np.asarray(track_ids, dtype=str)[kept], neighbors, scores)
+
+
+class IndexFile:
+    """
+    A process-wide copy of a saved index, reloaded when the file on disk
+    changes; the file is checked at most every `check_seconds`.
+    """
+    def __init__(self, path: Path, check_seconds: float = 60.0):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._index: Optional[SimilarTracksIndex] = None
+        self._mtime: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[SimilarTracksIndex]:
+        """The current index, or None while none has been built"""
+        now = time.monotonic()
+        if not self._is_due(now):
+            return self._index
+        with self._lock:
+            if self._is_due(now):
+                self._refresh()
+                self._checked_at = now
+        return self._index
+
+    def _is_due(self, now: float) -> bool:
+        return (
+            self._checked_at is None
+            or now - self._checked_at >= self.check_seconds
+        )
+
+    def _refresh(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            self._index = SimilarTracksIndex.load(self.path)
+            self._mtime = mtime
@@ -4,8 +4,6 @@ import jwt
 
 from app.config import settings
 
-SECRET_KEY = settings.secret_key
-ALGORYTHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 
@@ -21,7 +19,21 @@ def create_access_token(
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(
         to_encode,
-        SECRET_KEY,
-        algorithm=ALGORYTHM
+        settings.secret_key,
+        algorithm=settings.algorithm
     )
     return encoded_jwt
+
+
+def decode_access_token(token: str) -> dict[str, Any]:
+    """
+    Verify a token made by `create_access_token` and return its claims.
+    Raises jwt.PyJWTError if it is invalid, expired or lacks `sub`/`exp`.
+    """
+    claims: dict[str, Any] = jwt.decode(
+        token,
+        settings.secret_key,
+        algorithms=[settings.algorithm],
+        options={"require": ["exp", "sub"]}
+    )
+    return claims
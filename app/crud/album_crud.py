@@ -1,7 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from typing import Iterable
 from uuid import uuid4
 
+from app.db.batching import param_batches
 from app.models.album import Album
 
 
@@ -18,3 +21,46 @@ class AlbumCRUD:
         db.add(new_album)
         await db.flush()
         return new_album
+
+    @staticmethod
+    async def bulk_get_or_create(
+        db: AsyncSession,
+        keys: Iterable[tuple[str, str]]
+    ) -> dict[tuple[str, str], str]:
+        """
+        Resolve (album name, artist id) pairs to album ids, creating the
+        missing albums with multi-row INSERT ... ON CONFLICT statements.
+        """
+        unique_keys = sorted(set(keys))
+        if not unique_keys:
+            return {}
+
+        ids: dict[tuple[str, str], str] = {}
+        for batch in param_batches(unique_keys, 3):
+            result = await db.execute(
+                insert(Album)
+                .values([
+                    {"id": str(uuid4()), "name": name, "artist_id": artist_id}
+                    for name, artist_id in batch
+                ])
+                .on_conflict_do_nothing(
+                    index_elements=[Album.name, Album.artist_id]
+                )
+                .returning(Album.name, Album.artist_id, Album.id)
+            )
+            ids.update({
+                (name, artist_id): album_id
+                for name, artist_id, album_id in result.all()
+            })
+
+        missing = [key for key in unique_keys if key not in ids]
+        for batch in param_batches(missing, 2):
+            result = await db.execute(
+                select(Album.name, Album.artist_id, Album.id)
+                .where(tuple_(Album.name, Album.artist_id).in_(batch))
+            )
+            ids.update({
+                (name, artist_id): album_id
+                for name, artist_id, album_id in result.all()
+            })
+        return ids
@@ -1,7 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from typing import Iterable
 from uuid import uuid4
 
+from app.db.batching import param_batches
 from app.models.artist import Artist
 from app.schemas.artist import ArtistCreate
 
@@ -32,3 +35,34 @@ class ArtistCRUD:
         db.add(new_artist)
         await db.flush()
         return new_artist
+
+    @staticmethod
+    async def bulk_get_or_create_by_names(
+        db: AsyncSession,
+        names: Iterable[str]
+    ) -> dict[str, str]:
+        """
+        Resolve artist names to ids, creating the missing artists with
+        multi-row INSERT ... ON CONFLICT DO NOTHING statements.
+        """
+        unique_names = sorted(set(names))
+        if not unique_names:
+            return {}
+
+        ids: dict[str, str] = {}
+        for batch in param_batches(unique_names, 2):
+            result = await db.execute(
+                insert(Artist)
+                .values([{"id": str(uuid4()), "name": name} for name in batch])
+                .on_conflict_do_nothing(index_elements=[Artist.name])
+                .returning(Artist.name, Artist.id)
+            )
+            ids.update({name: artist_id for name, artist_id in result.all()})
+
+        missing = [name for name in unique_names if name not in ids]
+        for batch in param_batches(missing, 1):
+            result = await db.execute(
+                select(Artist.name, Artist.id).where(Artist.name.in_(batch))
+            )
+            ids.update({name: artist_id for name, artist_id in result.all()})
+        return ids
@@ -0,0 +1,51 @@
+from typing import Any, Iterable, Sequence
+from sqlalchemy import Row, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.artist import Artist
+from app.models.genre_preference import UserGenrePreference
+from app.models.listening_event import ListeningEvent
+from app.models.track import Track
+
+
+class GenrePreferenceCRUD:
+    @staticmethod
+    async def get_artist_day_plays(
+        db: AsyncSession,
+        user_ids: Sequence[str]
+    ) -> Sequence[Row]:
+        """
+        (user_id, day, genres, ms_played) per user, artist and UTC day:
+        the events of many users condensed to what genre scoring needs
+        """
+        day = func.date(func.timezone("UTC", ListeningEvent.played_at))
+        query = (
+            select(
+                ListeningEvent.user_id,
+                day.label("day"),
+                Artist.genres,
+                func.sum(ListeningEvent.duration_ms).label("ms_played"),
+            )
+            .join(Track, Track.id == ListeningEvent.track_id)
+            .join(Artist, Artist.id == Track.artist_id)
+            .where(ListeningEvent.user_id.in_(user_ids))
+            .group_by(ListeningEvent.user_id, Artist.id, day)
+        )
+        result = await db.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def replace_for_users(
+        db: AsyncSession,
+        user_ids: Sequence[str],
+        rows: Iterable[dict[str, Any]]
+    ) -> int:
+        """Swap the stored preferences of `user_ids` for `rows` (no commit)"""
+        await db.execute(
+            delete(UserGenrePreference)
+            .where(UserGenrePreference.user_id.in_(user_ids))
+        )
+        rows = list(rows)
+        if rows:
+            await db.execute(insert(UserGenrePreference), rows)
+        return len(rows)
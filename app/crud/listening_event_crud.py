@@ -1,10 +1,169 @@
-from typing import Sequence
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement, Row, RowMapping, Select, and_, case, func, select, text,
+    tuple_
+)
+from sqlalchemy.dialects.postgresql import insert
 
+from app.crud.user_daily_stats_crud import UserDailyStatsCRUD, utc_day
+from app.crud.user_entity_stats_crud import (
+    TrackPlays,
+    UserEntityStatsCRUD,
+    tally_plays,
+)
+from app.db.batching import param_batches
+from app.models.album import Album
+from app.models.artist import Artist
+from app.models.listening_coverage import ListeningHistoryCoverage
 from app.models.listening_event import ListeningEvent
+from app.models.track import Track
 from app.schemas.listening_event import ListeningEventCreate
 
+STAGING_TABLE = "listening_events_staging"
+STAGING_COLUMNS = (
+    "user_id", "track_id", "has_spotify_id", "track_name", "artist_name",
+    "album_name", "played_at", "ms_played"
+)
+
+# Session-local, emptied on commit; created per transaction if missing.
+CREATE_STAGING_SQL = text(f"""
+    CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+        user_id text NOT NULL,
+        track_id text NOT NULL,
+        has_spotify_id boolean NOT NULL,
+        track_name text NOT NULL,
+        artist_name text NOT NULL,
+        album_name text NOT NULL,
+        played_at timestamptz NOT NULL,
+        ms_played integer NOT NULL
+    ) ON COMMIT DELETE ROWS
+""")
+
+# Set-based merge of the staged plays: resolve or create every artist, album
+# and track referenced by the batch, then insert the events, collapsing
+# duplicate plays inside the batch and skipping ones already stored.
+MERGE_STAGING_SQL = (
+    text(f"""
+        INSERT INTO artists (id, name, genres, popularity, followers)
+        SELECT gen_random_uuid()::text, s.artist_name, '{{}}', 0, 0
+        FROM (SELECT DISTINCT artist_name FROM {STAGING_TABLE}) s
+        ORDER BY s.artist_name
+        ON CONFLICT (name) DO NOTHING
+    """),
+    text(f"""
+        INSERT INTO albums (id, name, artist_id)
+        SELECT gen_random_uuid()::text, s.album_name, a.id
+        FROM (
+            SELECT DISTINCT artist_name, album_name FROM {STAGING_TABLE}
+        ) s
+        JOIN artists a ON a.name = s.artist_name
+        ORDER BY s.album_name, a.id
+        ON CONFLICT (name, artist_id) DO NOTHING
+    """),
+    # Tracks with a Spotify id are keyed by it; the rest are created under
+    # their name-derived id unless a track with the same names exists.
+    text(f"""
+        INSERT INTO tracks (
+            id, name, artist_id, album_id, duration_ms, popularity, explicit
+        )
+        SELECT DISTINCT ON (s.track_id)
+               s.track_id, s.track_name, a.id, al.id, s.ms_played, 0, false
+        FROM {STAGING_TABLE} s
+        JOIN artists a ON a.name = s.artist_name
+        JOIN albums al ON al.name = s.album_name AND al.artist_id = a.id
+        WHERE s.has_spotify_id OR NOT EXISTS (
+            SELECT 1 FROM tracks t
+            WHERE t.name = s.track_name
+              AND t.artist_id = a.id AND t.album_id = al.id
+        )
+        ORDER BY s.track_id, s.ms_played DESC
+        ON CONFLICT (id) DO NOTHING
+    """),
+)
+# Returns per-track totals of the rows actually inserted.
+INSERT_STAGED_EVENTS_SQL = text(f"""
+    WITH inserted AS (
+        INSERT INTO listening_events (
+            user_id, track_id, played_at, duration_ms, progress_ms, skipped
+        )
+        SELECT DISTINCT ON (s.user_id, t.id, s.played_at)
+               s.user_id, t.id, s.played_at, s.ms_played, 0, false
+        FROM {STAGING_TABLE} s
+        JOIN artists a ON a.name = s.artist_name
+        JOIN albums al ON al.name = s.album_name AND al.artist_id = a.id
+        CROSS JOIN LATERAL (
+            SELECT CASE WHEN s.has_spotify_id THEN s.track_id ELSE (
+                SELECT min(t.id) FROM tracks t
+                WHERE t.name = s.track_name
+                  AND t.artist_id = a.id AND t.album_id = al.id
+            ) END AS id
+        ) t
+        ON CONFLICT (user_id, track_id, played_at) DO NOTHING
+        RETURNING track_id, played_at, duration_ms
+    )
+    SELECT track_id, count(*), sum(duration_ms), max(played_at)
+    FROM inserted
+    GROUP BY track_id
+""")
+STAGED_DAYS_SQL = text(
+    f"SELECT DISTINCT (played_at AT TIME ZONE 'UTC')::date FROM {STAGING_TABLE}"
+)
+
+
+def played_between(
+    start: datetime | None,
+    end: datetime | None
+) -> list[ColumnElement[bool]]:
+    """
+    Filters for start <= played_at < end. A bounded range lets the planner
+    prune listening_events partitions outside it.
+    """
+    filters: list[ColumnElement[bool]] = []
+    if start is not None:
+        filters.append(ListeningEvent.played_at >= start)
+    if end is not None:
+        filters.append(ListeningEvent.played_at < end)
+    return filters
+
+
+# Columns of a history export row, in output order.
+EXPORT_COLUMNS = (
+    ListeningEvent.played_at,
+    ListeningEvent.duration_ms,
+    ListeningEvent.progress_ms,
+    ListeningEvent.skipped,
+    ListeningEvent.context_type,
+    ListeningEvent.context_id,
+    ListeningEvent.track_id,
+    Track.name.label("track_name"),
+    Artist.id.label("artist_id"),
+    Artist.name.label("artist_name"),
+    Album.id.label("album_id"),
+    Album.name.label("album_name"),
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+# Everything a columnar (Parquet) export may project, by name.
+EXPORTABLE_COLUMNS = {
+    column.key: column
+    for column in (
+        ListeningEvent.id,
+        ListeningEvent.user_id,
+        *EXPORT_COLUMNS,
+        ListeningEvent.created_at,
+    )
+}
+
+
+def _with_catalog_names(query: Select) -> Select:
+    return (
+        query
+        .join(Track, Track.id == ListeningEvent.track_id)
+        .join(Artist, Artist.id == Track.artist_id)
+        .join(Album, Album.id == Track.album_id)
+    )
+
 
 class ListeningEventCRUD:
 
@@ -13,17 +172,103 @@ class ListeningEventCRUD:
             db: AsyncSession,
             user_id: str,
             limit: int,
-            offset: int
+            offset: int = 0,
+            start: datetime | None = None,
+            end: datetime | None = None,
+            after: tuple[datetime, int] | None = None
     ) -> Sequence[ListeningEvent]:
-        result = await db.execute(
+        """
+        Newest-first page of a user's events. `after` is the (played_at, id)
+        of the last row of the previous page; it seeks through the
+        (user_id, played_at, id) index instead of skipping rows.
+        """
+        query = (
             select(ListeningEvent)
-            .where(ListeningEvent.user_id == user_id)
-            .order_by(ListeningEvent.played_at.desc())
+            .where(
+                ListeningEvent.user_id == user_id,
+                *played_between(start, end)
+            )
+            .order_by(ListeningEvent.played_at.desc(), ListeningEvent.id.desc())
             .limit(limit)
-            .offset(offset)
         )
+        if after is not None:
+            query = query.where(
+                tuple_(ListeningEvent.played_at, ListeningEvent.id)
+                < tuple_(*after)
+            )
+        if offset:
+            query = query.offset(offset)
+        result = await db.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    async def stream_user_export(
+            db: AsyncSession,
+            user_id: str,
+            start: datetime | None = None,
+            end: datetime | None = None,
+            batch_size: int = 5000
+    ) -> AsyncIterator[RowMapping]:
+        """
+        A user's events, oldest first, joined with track, artist and album
+        names. Rows come from a server-side cursor `batch_size` at a time,
+        so memory does not grow with the history.
+        """
+        query = (
+            _with_catalog_names(select(*EXPORT_COLUMNS))
+            .where(
+                ListeningEvent.user_id == user_id,
+                *played_between(start, end)
+            )
+            .order_by(ListeningEvent.played_at, ListeningEvent.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db.stream(query)
+        async for row in result.mappings():
+            yield row
+
+    @staticmethod
+    async def get_finished_xid(db: AsyncSession) -> int:
+        """
+        The oldest transaction id still running: every transaction below it
+        has committed or rolled back, so its events are all visible now.
+        """
+        result = await db.execute(text(
+            "SELECT (pg_snapshot_xmin(pg_current_snapshot())::text)::bigint"
+        ))
+        return result.scalar_one()
+
+    @staticmethod
+    async def stream_event_batches(
+            db: AsyncSession,
+            fields: Sequence[str],
+            from_xid: int,
+            to_xid: int,
+            user_id: str | None = None,
+            batch_size: int = 5000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Events inserted by transactions from_xid <= xid < to_xid, in id
+        order, projected to `fields` (names from EXPORTABLE_COLUMNS),
+        `batch_size` rows at a time from a server-side cursor.
+        """
+        query = (
+            _with_catalog_names(
+                select(*(EXPORTABLE_COLUMNS[field] for field in fields))
+            )
+            .where(
+                ListeningEvent.created_xid >= from_xid,
+                ListeningEvent.created_xid < to_xid
+            )
+            .order_by(ListeningEvent.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if user_id is not None:
+            query = query.where(ListeningEvent.user_id == user_id)
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield rows
+
     @staticmethod
     async def get_event_by_id(
         db: AsyncSession, 
@@ -40,7 +285,161 @@ class ListeningEventCRUD:
         event_data: ListeningEventCreate
     ) -> ListeningEvent:
         event = ListeningEvent(**event_data.model_dump())
+        await UserDailyStatsCRUD.lock_users(db, [event.user_id])
         db.add(event)
+        await db.flush()
+        await UserDailyStatsCRUD.refresh_days(
+            db, event.user_id, [utc_day(event.played_at)]
+        )
+        await UserEntityStatsCRUD.add_plays(db, event.user_id, [TrackPlays(
+            event.track_id, 1, event.duration_ms, event.played_at
+        )])
         await db.commit()
         await db.refresh(event)
         return event
+
+    @staticmethod
+    async def bulk_create_events(
+        db: AsyncSession,
+        events: Sequence[dict[str, Any]]
+    ) -> int:
+        """
+        Insert a chunk of events with multi-row INSERTs, refresh the
+        daily rollups of the days it touched and add the new plays to the
+        per-entity totals (no commit). Events already stored under the
+        natural key are skipped; returns the number of rows actually
+        inserted.
+        """
+        if not events:
+            return 0
+        # Before inserting, so that the day refresh below sees the events
+        # of every other chunk for the same users.
+        await UserDailyStatsCRUD.lock_users(
+            db, (event["user_id"] for event in events)
+        )
+        events = list(events)
+        inserted = []
+        for batch in param_batches(events, len(events[0])):
+            result = await db.execute(
+                insert(ListeningEvent)
+                .values(list(batch))
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        ListeningEvent.user_id,
+                        ListeningEvent.track_id,
+                        ListeningEvent.played_at,
+                    ]
+                )
+                .returning(
+                    ListeningEvent.user_id,
+                    ListeningEvent.track_id,
+                    ListeningEvent.played_at,
+                    ListeningEvent.duration_ms
+                )
+            )
+            inserted.extend(result.all())
+        by_user: dict[str, list[tuple[str, datetime, int]]] = {}
+        for user_id, track_id, played_at, duration_ms in inserted:
+            by_user.setdefault(user_id, []).append(
+                (track_id, played_at, duration_ms)
+            )
+        for user_id, rows in by_user.items():
+            await UserDailyStatsCRUD.refresh_days(
+                db, user_id, {utc_day(played_at) for _, played_at, _ in rows}
+            )
+            await UserEntityStatsCRUD.add_plays(db, user_id, tally_plays(rows))
+        return len(inserted)
+
+    @staticmethod
+    async def copy_plays(
+        db: AsyncSession,
+        user_id: str,
+        plays: Iterable[tuple[str, bool, str, str, str, datetime, int]]
+    ) -> int:
+        """
+        Load (track_id, has_spotify_id, track_name, artist_name, album_name,
+        played_at, ms_played) plays with binary COPY into a staging table
+        and merge them into listening_events in SQL, updating the rollups
+        like `bulk_create_events` (no commit).
+        """
+        # Going through SQLAlchemy first makes the driver open the session's
+        # transaction, so the raw COPY below runs inside it.
+        await db.execute(CREATE_STAGING_SQL)
+        await db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            STAGING_TABLE,
+            records=((user_id, *play) for play in plays),
+            columns=STAGING_COLUMNS,
+        )
+
+        for statement in MERGE_STAGING_SQL:
+            await db.execute(statement)
+        await UserDailyStatsCRUD.lock_users(db, [user_id])
+        result = await db.execute(INSERT_STAGED_EVENTS_SQL)
+        plays = [TrackPlays._make(row) for row in result.all()]
+        if plays:
+            days = await db.execute(STAGED_DAYS_SQL)
+            await UserDailyStatsCRUD.refresh_days(
+                db, user_id, days.scalars().all()
+            )
+            await UserEntityStatsCRUD.add_plays(db, user_id, plays)
+        return sum(play.plays for play in plays)
+
+    @staticmethod
+    async def get_covered_range(
+        db: AsyncSession,
+        user_id: str
+    ) -> tuple[datetime, datetime] | None:
+        result = await db.execute(
+            select(
+                ListeningHistoryCoverage.covered_from,
+                ListeningHistoryCoverage.covered_to
+            ).where(ListeningHistoryCoverage.user_id == user_id)
+        )
+        row = result.one_or_none()
+        return (row.covered_from, row.covered_to) if row else None
+
+    @staticmethod
+    async def extend_covered_range(
+        db: AsyncSession,
+        user_id: str,
+        covered_from: datetime,
+        covered_to: datetime
+    ) -> None:
+        """
+        Record that [covered_from, covered_to] is fully ingested (no commit).
+        An overlapping span is merged into the stored one; a disjoint span
+        replaces it only if it is more recent, so the stored span never
+        claims a gap that was not ingested.
+        """
+        current = ListeningHistoryCoverage.__table__.c
+        stmt = insert(ListeningHistoryCoverage).values(
+            user_id=user_id, covered_from=covered_from, covered_to=covered_to
+        )
+        new = stmt.excluded
+        overlaps = and_(
+            new.covered_from <= current.covered_to,
+            new.covered_to >= current.covered_from
+        )
+        newer = new.covered_to > current.covered_to
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ListeningHistoryCoverage.user_id],
+                set_={
+                    "covered_from": case(
+                        (overlaps, func.least(current.covered_from, new.covered_from)),
+                        (newer, new.covered_from),
+                        else_=current.covered_from
+                    ),
+                    "covered_to": case(
+                        (overlaps, func.greatest(current.covered_to, new.covered_to)),
+                        (newer, new.covered_to),
+                        else_=current.covered_to
+                    ),
+                    "updated_at": func.now(),
+                }
+            )
+        )
@@ -1,10 +1,19 @@
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Sequence
+from sqlalchemy import Row, any_, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from typing import Any, AsyncIterator, Iterable, Sequence
 
+from app.constants.spotify import SPOTIFY_AUDIO_FEATURES, SPOTIFY_TRACK_ID_LENGTH
+from app.db.batching import param_batches
 from app.models.track import Track
 from app.schemas.track import TrackCreate
 
+# Columns written by the bulk path; audio features stay NULL until known.
+BULK_INSERT_FIELDS = {
+    "id", "name", "artist_id", "album_id", "duration_ms", "popularity", "explicit"
+}
+
 
 class TrackCRUD:
     @staticmethod
@@ -34,14 +43,149 @@ class TrackCRUD:
         db: AsyncSession,
         track_data: TrackCreate
     ) -> Track:
+        """Find a track by id, then by name/artist/album, else create it"""
+        track = await TrackCRUD.get_track_by_id(db, track_data.id)
+        if track:
+            return track
         result = await db.execute(
             select(Track).where(
                 Track.name == track_data.name,
                 Track.artist_id == track_data.artist_id,
                 Track.album_id == track_data.album_id
-            )
+            ).order_by(Track.id).limit(1)
         )
         track = result.scalar_one_or_none()
         if track:
             return track
         return await TrackCRUD.create_track(db, track_data)
+
+    @staticmethod
+    async def bulk_create_missing_tracks(
+        db: AsyncSession,
+        tracks: Iterable[TrackCreate]
+    ) -> None:
+        """
+        Ensure tracks with known ids exist: one `id = ANY(...)` lookup, then
+        INSERT ... ON CONFLICT DO NOTHING for the missing ones.
+        """
+        by_id = {track.id: track for track in tracks}
+        if not by_id:
+            return
+        result = await db.execute(
+            select(Track.id).where(Track.id == any_(list(by_id)))
+        )
+        missing = sorted(set(by_id) - set(result.scalars().all()))
+        for batch in param_batches(missing, len(BULK_INSERT_FIELDS)):
+            await db.execute(
+                insert(Track)
+                .values([
+                    by_id[track_id].model_dump(include=BULK_INSERT_FIELDS)
+                    for track_id in batch
+                ])
+                .on_conflict_do_nothing(index_elements=[Track.id])
+            )
+
+    @staticmethod
+    async def bulk_get_or_create_tracks(
+        db: AsyncSession,
+        tracks: Iterable[TrackCreate]
+    ) -> dict[tuple[str, str, str], str]:
+        """
+        Resolve tracks by (name, artist id, album id), the fallback for
+        records without a Spotify id. Missing tracks are created with the id
+        they were built with, which is deterministic, so concurrent
+        uploads converge on one row.
+        """
+        by_key: dict[tuple[str, str, str], TrackCreate] = {}
+        for track in tracks:
+            by_key.setdefault((track.name, track.artist_id, track.album_id), track)
+        if not by_key:
+            return {}
+
+        ids: dict[tuple[str, str, str], str] = {}
+        for batch in param_batches(list(by_key), 3):
+            result = await db.execute(
+                select(
+                    Track.name, Track.artist_id, Track.album_id,
+                    func.min(Track.id)
+                )
+                .where(
+                    tuple_(Track.name, Track.artist_id, Track.album_id)
+                    .in_(batch)
+                )
+                .group_by(Track.name, Track.artist_id, Track.album_id)
+            )
+            ids.update({
+                (name, artist_id, album_id): track_id
+                for name, artist_id, album_id, track_id in result.all()
+            })
+
+        missing = sorted(key for key in by_key if key not in ids)
+        for batch in param_batches(missing, len(BULK_INSERT_FIELDS)):
+            await db.execute(
+                insert(Track)
+                .values([
+                    by_key[key].model_dump(include=BULK_INSERT_FIELDS)
+                    for key in batch
+                ])
+                .on_conflict_do_nothing(index_elements=[Track.id])
+            )
+        ids.update({key: by_key[key].id for key in missing})
+        return ids
+
+    @staticmethod
+    async def get_tracks_missing_audio_features(
+        db: AsyncSession,
+        limit: int,
+        after: str | None = None
+    ) -> list[str]:
+        """
+        Ids of Spotify tracks whose audio features were never requested, in
+        id order starting after `after`. Name-derived ids are skipped.
+        """
+        query = (
+            select(Track.id)
+            .where(
+                Track.audio_features_checked_at.is_(None),
+                func.length(Track.id) == SPOTIFY_TRACK_ID_LENGTH
+            )
+            .order_by(Track.id)
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(Track.id > after)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def bulk_update_tracks(
+        db: AsyncSession,
+        rows: Sequence[dict[str, Any]]
+    ) -> None:
+        """
+        UPDATE many tracks by primary key in one executemany (no commit).
+        Every row holds an `id` plus the columns to set.
+        """
+        if rows:
+            await db.execute(update(Track), list(rows))
+
+    @staticmethod
+    async def stream_audio_features(
+        db: AsyncSession,
+        checked_since: datetime | None = None,
+        batch_size: int = 50000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        (id, *SPOTIFY_AUDIO_FEATURES) of every track with all features
+        known, `batch_size` rows at a time from a server-side cursor. With
+        `checked_since`, only tracks whose features were fetched since then.
+        """
+        features = [getattr(Track, name) for name in SPOTIFY_AUDIO_FEATURES]
+        query = select(Track.id, *features).where(
+            *(feature.is_not(None) for feature in features)
+        )
+        if checked_since is not None:
+            query = query.where(Track.audio_features_checked_at >= checked_since)
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
@@ -1,9 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import func, select, and_
+from sqlalchemy.orm.interfaces import ORMOption
 from datetime import datetime, timedelta, timezone
+from typing import Sequence
 
 from app.models.social_account import SocialAccount
 from app.models.user import User
+from app.models.user_daily_stats import UserDailyStats
 from app.schemas.user import UserCreate
 
 
@@ -64,10 +67,29 @@ class UserCRUD:
         return user
 
     @staticmethod
-    async def get_user_by_id(db: AsyncSession, user_id: str) -> User | None:
-        result = await db.execute(select(User).where(User.id == user_id))
+    async def get_user_by_id(
+        db: AsyncSession,
+        user_id: str,
+        options: Sequence[ORMOption] = ()
+    ) -> User | None:
+        """
+        Fetch a user; relationships are only loaded when requested through
+        `options` (e.g. `selectinload(User.social_accounts)`).
+        """
+        result = await db.execute(
+            select(User).where(User.id == user_id).options(*options)
+        )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def count_listening_events(db: AsyncSession, user_id: str) -> int:
+        """Total plays of a user, summed from the daily rollups"""
+        result = await db.execute(
+            select(func.coalesce(func.sum(UserDailyStats.plays), 0))
+            .where(UserDailyStats.user_id == user_id)
+        )
+        return int(result.scalar_one())
+
     @staticmethod
     async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         user = User(**user_data.model_dump())
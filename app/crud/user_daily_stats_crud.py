@@ -0,0 +1,181 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Iterable, Sequence
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.listening_event import ListeningEvent
+from app.models.user_daily_stats import UserDailyStats
+
+# Recompute whole days from the events table, so the rollup stays exact
+# (including distinct track counts) however the day's events arrived.
+REFRESH_DAYS_SQL = text("""
+    INSERT INTO user_daily_stats (
+        user_id, day, plays, ms_played, distinct_tracks,
+        first_played, last_played
+    )
+    SELECT e.user_id, d.day, count(*), sum(e.duration_ms),
+           count(DISTINCT e.track_id), min(e.played_at), max(e.played_at)
+    FROM unnest(CAST(:days AS date[])) AS d(day)
+    JOIN listening_events e
+      ON e.user_id = :user_id
+     AND e.played_at >= d.day::timestamp AT TIME ZONE 'UTC'
+     AND e.played_at < (d.day + 1)::timestamp AT TIME ZONE 'UTC'
+    GROUP BY e.user_id, d.day
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        plays = excluded.plays,
+        ms_played = excluded.ms_played,
+        distinct_tracks = excluded.distinct_tracks,
+        first_played = excluded.first_played,
+        last_played = excluded.last_played
+""")
+
+# Held until the end of the transaction by everything that adds a user's
+# events. REFRESH_DAYS_SQL sees only its own snapshot, so two transactions
+# adding plays to the same day would otherwise each write totals missing
+# the other's events.
+LOCK_USER_SQL = text("SELECT pg_advisory_xact_lock(hashtext(CAST(:user_id AS text)))")
+
+
+def utc_day(value: datetime) -> date:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, timezone.utc)
+
+
+class UserDailyStatsCRUD:
+    @staticmethod
+    async def lock_users(db: AsyncSession, user_ids: Iterable[str]) -> None:
+        """
+        Wait for other writers of these users' events to commit; the locks
+        are taken in a fixed order so that multi-user chunks cannot deadlock
+        """
+        for user_id in sorted(set(user_ids)):
+            await db.execute(LOCK_USER_SQL, {"user_id": user_id})
+
+    @staticmethod
+    async def refresh_days(
+        db: AsyncSession,
+        user_id: str,
+        days: Iterable[date]
+    ) -> None:
+        """Rewrite the rollup rows for the given UTC days (no commit)"""
+        days = sorted(set(days))
+        if days:
+            await db.execute(REFRESH_DAYS_SQL, {"user_id": user_id, "days": days})
+
+    @staticmethod
+    async def rebuild_user(db: AsyncSession, user_id: str) -> int:
+        """Recompute every day of a user's history (no commit)"""
+        await UserDailyStatsCRUD.lock_users(db, [user_id])
+        result = await db.execute(
+            select(func.distinct(func.date(
+                func.timezone("UTC", ListeningEvent.played_at)
+            ))).where(ListeningEvent.user_id == user_id)
+        )
+        days = list(result.scalars().all())
+        await UserDailyStatsCRUD.refresh_days(db, user_id, days)
+        return len(days)
+
+    @staticmethod
+    async def get_days(
+        db: AsyncSession,
+        user_id: str,
+        start: date | None = None,
+        end: date | None = None
+    ) -> Sequence[UserDailyStats]:
+        query = select(UserDailyStats).where(UserDailyStats.user_id == user_id)
+        if start is not None:
+            query = query.where(UserDailyStats.day >= start)
+        if end is not None:
+            query = query.where(UserDailyStats.day < end)
+        result = await db.execute(query.order_by(UserDailyStats.day))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_range_totals(
+        db: AsyncSession,
+        user_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None
+    ) -> dict[str, Any]:
+        """
+        Listening totals for start <= played_at < end. Whole days are summed
+        from the rollup; the partial days at either edge of the range are
+        read from the events table.
+        """
+        start = _as_utc(start) if start is not None else None
+        end = _as_utc(end) if end is not None else None
+
+        first_day = None
+        if start is not None:
+            first_day = start.date()
+            if start != _midnight(first_day):
+                first_day += timedelta(days=1)
+        last_day = end.date() if end is not None else None
+
+        parts: list[tuple[int, int, datetime | None, datetime | None]] = []
+        if first_day is not None and last_day is not None and first_day >= last_day:
+            parts.append(await _event_totals(db, user_id, start, end))
+        else:
+            query = select(
+                func.coalesce(func.sum(UserDailyStats.plays), 0),
+                func.coalesce(func.sum(UserDailyStats.ms_played), 0),
+                func.min(UserDailyStats.first_played),
+                func.max(UserDailyStats.last_played)
+            ).where(UserDailyStats.user_id == user_id)
+            if first_day is not None:
+                query = query.where(UserDailyStats.day >= first_day)
+            if last_day is not None:
+                query = query.where(UserDailyStats.day < last_day)
+            plays, ms_played, first, last = (await db.execute(query)).one()
+            parts.append((plays, ms_played, first, last))
+
+            if start is not None and first_day is not None:
+                if start < _midnight(first_day):
+                    parts.append(await _event_totals(
+                        db, user_id, start, _midnight(first_day)
+                    ))
+            if end is not None and last_day is not None:
+                if end > _midnight(last_day):
+                    parts.append(await _event_totals(
+                        db, user_id, _midnight(last_day), end
+                    ))
+
+        firsts = [first for _, _, first, _ in parts if first is not None]
+        lasts = [last for _, _, _, last in parts if last is not None]
+        return {
+            "total_listens": sum(int(plays) for plays, _, _, _ in parts),
+            "total_played_ms": sum(int(ms or 0) for _, ms, _, _ in parts),
+            "first_played": min(firsts) if firsts else None,
+            "last_played": max(lasts) if lasts else None,
+        }
+
+
+async def _event_totals(
+    db: AsyncSession,
+    user_id: str,
+    start: datetime | None,
+    end: datetime | None
+) -> tuple[int, int, datetime | None, datetime | None]:
+    query = select(
+        func.count(),
+        func.coalesce(func.sum(ListeningEvent.duration_ms), 0),
+        func.min(ListeningEvent.played_at),
+        func.max(ListeningEvent.played_at)
+    ).where(ListeningEvent.user_id == user_id)
+    if start is not None:
+        query = query.where(ListeningEvent.played_at >= start)
+    if end is not None:
+        query = query.where(ListeningEvent.played_at < end)
+    plays, ms_played, first, last = (await db.execute(query)).one()
+    return plays, ms_played, first, last
@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import AsyncIterator, Iterable, NamedTuple, Sequence
+from sqlalchemy import Row, delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.album import Album
+from app.models.artist import Artist
+from app.models.listening_event import ListeningEvent
+from app.models.track import Track
+from app.models.user_entity_stats import (
+    UserAlbumStats,
+    UserArtistStats,
+    UserTrackStats,
+)
+
+
+class TrackPlays(NamedTuple):
+    """Plays of one track added to a user's history by one write"""
+    track_id: str
+    plays: int
+    ms_played: int
+    last_played: datetime
+
+
+_NEW_PLAYS = """
+    unnest(
+        CAST(:track_ids AS text[]), CAST(:plays AS integer[]),
+        CAST(:ms_played AS bigint[]), CAST(:last_played AS timestamptz[])
+    ) AS p(track_id, plays, ms_played, last_played)
+"""
+
+
+def _increment_sql(table: str, key: str, source: str) -> str:
+    return f"""
+        INSERT INTO {table} (user_id, {key}, play_count, ms_played, last_played)
+        {source}
+        ON CONFLICT (user_id, {key}) DO UPDATE SET
+            play_count = {table}.play_count + excluded.play_count,
+            ms_played = {table}.ms_played + excluded.ms_played,
+            last_played = greatest({table}.last_played, excluded.last_played)
+    """
+
+
+def _grouped_by_track_column(column: str) -> str:
+    return f"""
+        SELECT :user_id, t.{column}, sum(p.plays), sum(p.ms_played),
+               max(p.last_played)
+        FROM {_NEW_PLAYS}
+        JOIN tracks t ON t.id = p.track_id
+        GROUP BY t.{column}
+        ORDER BY t.{column}
+    """
+
+
+# Rows are written in key order so concurrent jobs for one user take the
+# row locks in the same order.
+INCREMENT_STATS_SQL = (
+    text(_increment_sql("user_track_stats", "track_id", f"""
+        SELECT :user_id, p.track_id, p.plays, p.ms_played, p.last_played
+        FROM {_NEW_PLAYS}
+        ORDER BY p.track_id
+    """)),
+    text(_increment_sql(
+        "user_artist_stats", "artist_id", _grouped_by_track_column("artist_id")
+    )),
+    text(_increment_sql(
+        "user_album_stats", "album_id", _grouped_by_track_column("album_id")
+    )),
+)
+
+# entity -> (stats model, its entity key column, entity model)
+TOP_ENTITIES = {
+    "tracks": (UserTrackStats, UserTrackStats.track_id, Track),
+    "artists": (UserArtistStats, UserArtistStats.artist_id, Artist),
+    "albums": (UserAlbumStats, UserAlbumStats.album_id, Album),
+}
+
+
+def tally_plays(
+    rows: Iterable[tuple[str, datetime, int]]
+) -> list[TrackPlays]:
+    """Collapse (track_id, played_at, duration_ms) rows into per-track totals"""
+    totals: dict[str, list] = {}
+    for track_id, played_at, duration_ms in rows:
+        total = totals.get(track_id)
+        if total is None:
+            totals[track_id] = [1, duration_ms, played_at]
+        else:
+            total[0] += 1
+            total[1] += duration_ms
+            if played_at > total[2]:
+                total[2] = played_at
+    return [TrackPlays(track_id, *total) for track_id, total in totals.items()]
+
+
+class UserEntityStatsCRUD:
+    @staticmethod
+    async def add_plays(
+        db: AsyncSession,
+        user_id: str,
+        plays: Sequence[TrackPlays]
+    ) -> None:
+        """
+        Add newly inserted plays to the user's track, artist and album
+        totals (no commit). Each track may appear only once in `plays`.
+        """
+        if not plays:
+            return
+        params = {
+            "user_id": user_id,
+            "track_ids": [p.track_id for p in plays],
+            "plays": [p.plays for p in plays],
+            "ms_played": [p.ms_played for p in plays],
+            "last_played": [p.last_played for p in plays],
+        }
+        for statement in INCREMENT_STATS_SQL:
+            await db.execute(statement, params)
+
+    @staticmethod
+    async def rebuild_user(db: AsyncSession, user_id: str) -> int:
+        """
+        Recompute a user's totals from the events table (no commit).
+        Returns the number of distinct tracks.
+        """
+        for model in (UserTrackStats, UserArtistStats, UserAlbumStats):
+            await db.execute(delete(model).where(model.user_id == user_id))
+        result = await db.execute(
+            select(
+                ListeningEvent.track_id,
+                func.count(),
+                func.sum(ListeningEvent.duration_ms),
+                func.max(ListeningEvent.played_at)
+            )
+            .where(ListeningEvent.user_id == user_id)
+            .group_by(ListeningEvent.track_id)
+        )
+        plays = [TrackPlays._make(row) for row in result.all()]
+        await UserEntityStatsCRUD.add_plays(db, user_id, plays)
+        return len(plays)
+
+    @staticmethod
+    async def get_top(
+        db: AsyncSession,
+        user_id: str,
+        entity: str,
+        limit: int
+    ) -> Sequence[Row]:
+        """
+        The user's most played tracks, artists or albums as (id, name,
+        play_count, ms_played, last_played) rows, most played first.
+        """
+        stats, key, model = TOP_ENTITIES[entity]
+        result = await db.execute(
+            select(
+                key.label("id"),
+                model.name,
+                stats.play_count,
+                stats.ms_played,
+                stats.last_played
+            )
+            .join(model, model.id == key)
+            .where(stats.user_id == user_id)
+            .order_by(stats.play_count.desc(), key)
+            .limit(limit)
+        )
+        return result.all()
+
+    @staticmethod
+    async def stream_track_plays(
+        db: AsyncSession,
+        batch_size: int = 50000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Every (user_id, track_id, play_count), `batch_size` rows at a time
+        from a server-side cursor
+        """
+        result = await db.stream(
+            select(
+                UserTrackStats.user_id,
+                UserTrackStats.track_id,
+                UserTrackStats.play_count
+            ).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
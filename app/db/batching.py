@@ -0,0 +1,18 @@
+"""Splitting multi-row statements under Postgres's bind-parameter limit."""
+from typing import Iterator, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# The wire protocol counts parameters in 16 bits; asyncpg rejects more.
+MAX_BIND_PARAMS = 32767
+
+
+def param_batches(
+    rows: Sequence[T],
+    params_per_row: int,
+    max_params: int = MAX_BIND_PARAMS
+) -> Iterator[Sequence[T]]:
+    """Consecutive slices of `rows` whose parameters fit in one statement"""
+    size = max(max_params // max(params_per_row, 1), 1)
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
@@ -0,0 +1,210 @@
+"""Monthly range partitions of the listening_events table."""
+import logging
+import re
+import time
+from datetime import date, datetime, timezone
+from typing import Iterable, Iterator, NamedTuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "listening_events"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+# Partitions this process has seen committed, with when it last did; lets
+# hot paths skip the catalog lookup. Entries are trusted for
+# KNOWN_PARTITION_SECONDS only, so detaches by other processes are noticed.
+_known_partitions: dict[str, float] = {}
+KNOWN_PARTITION_SECONDS = 300.0
+# session.info key: partitions created in the session's open transaction
+_CREATED_PARTITIONS = "created_partitions"
+
+
+class Partition(NamedTuple):
+    name: str
+    month: date
+
+
+def month_start(value: date | datetime) -> date:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        value = value.date()
+    return value.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    if month.month == 12:
+        return date(month.year + 1, 1, 1)
+    return date(month.year, month.month + 1, 1)
+
+
+def iter_months(start: date | datetime, end: date | datetime) -> Iterator[date]:
+    """Months from the one containing `start` to the one containing `end`"""
+    month, last = month_start(start), month_start(end)
+    while month <= last:
+        yield month
+        month = next_month(month)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def _remember(names: Iterable[str]) -> None:
+    now = time.monotonic()
+    _known_partitions.update((name, now) for name in names)
+
+
+def _is_known(name: str) -> bool:
+    seen = _known_partitions.get(name)
+    return seen is not None and time.monotonic() - seen < KNOWN_PARTITION_SECONDS
+
+
+# Partitions created in a transaction only exist once it commits.
+@event.listens_for(Session, "after_commit")
+def _remember_created_partitions(session: Session) -> None:
+    created = session.info.pop(_CREATED_PARTITIONS, None)
+    if created:
+        _remember(created)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_created_partitions(session: Session) -> None:
+    session.info.pop(_CREATED_PARTITIONS, None)
+
+
+async def list_partitions(db: AsyncSession) -> list[Partition]:
+    """Attached monthly partitions, oldest first (the default one excluded)"""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": PARENT_TABLE}
+    )
+    partitions = []
+    for name in result.scalars().all():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append(Partition(name, month))
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+async def ensure_partitions(
+    db: AsyncSession,
+    start: date | datetime,
+    end: date | datetime
+) -> list[str]:
+    """
+    Create the monthly partitions covering [start, end] that do not exist
+    yet (no commit). Rows already sitting in the default partition for a
+    new month are moved into it. Returns the names of created partitions.
+    """
+    months = [
+        month for month in iter_months(start, end)
+        if not _is_known(partition_name(month))
+    ]
+    if not months:
+        return []
+
+    # Serialize partition DDL between concurrent ingestion jobs.
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+        {"key": PARENT_TABLE}
+    )
+    existing = {partition.name for partition in await list_partitions(db)}
+    _remember(existing)
+
+    created = []
+    for month in months:
+        name = partition_name(month)
+        if name in existing:
+            continue
+        bounds = {
+            "lower": datetime.combine(month, datetime.min.time(), timezone.utc),
+            "upper": datetime.combine(
+                next_month(month), datetime.min.time(), timezone.utc
+            ),
+        }
+        in_range = "played_at >= :lower AND played_at < :upper"
+        # Build the table detached, move any rows for its range out of the
+        # default partition, then attach it; attaching fails while the
+        # default partition still holds rows for the range.
+        await db.execute(text(
+            f"CREATE TABLE {name} (LIKE {PARENT_TABLE} "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        await db.execute(
+            text(
+                f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} "
+                f"WHERE {in_range}"
+            ),
+            bounds
+        )
+        await db.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"),
+            bounds
+        )
+        await db.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{next_month(month).isoformat()} 00:00:00+00')"
+        ))
+        created.append(name)
+        logger.info("Created partition %s", name)
+
+    db.info.setdefault(_CREATED_PARTITIONS, set()).update(created)
+    return created
+
+
+async def ensure_upcoming_partitions(
+    db: AsyncSession,
+    months_ahead: int
+) -> list[str]:
+    """Create partitions from the current month to `months_ahead` months on"""
+    month = month_start(datetime.now(timezone.utc))
+    last = month
+    for _ in range(months_ahead):
+        last = next_month(last)
+    return await ensure_partitions(db, month, last)
+
+
+async def detach_partitions(
+    db: AsyncSession,
+    before: date,
+    archive_schema: str = "archive",
+    drop: bool = False
+) -> list[str]:
+    """
+    Detach monthly partitions for months before `before` (no commit) and
+    either move them to `archive_schema` or drop them. Moving them out of
+    the default schema keeps their names free if those months are ever
+    re-ingested. Returns the names of detached partitions.
+    """
+    if not drop:
+        await db.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+
+    detached = []
+    for partition in await list_partitions(db):
+        if partition.month >= month_start(before):
+            break
+        await db.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition.name}"
+        ))
+        if drop:
+            await db.execute(text(f"DROP TABLE {partition.name}"))
+        else:
+            await db.execute(text(
+                f'ALTER TABLE {partition.name} SET SCHEMA "{archive_schema}"'
+            ))
+        _known_partitions.pop(partition.name, None)
+        detached.append(partition.name)
+        logger.info("Detached partition %s", partition.name)
+    return detached
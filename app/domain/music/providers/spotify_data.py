@@ -2,24 +2,24 @@ import httpx
 from typing import List
 from app.domain.music.interfaces.music_data_provider import IMusicDataProvider
 
-from app.constants.spotify import SPOTIFY_API_BASE_URL
+from app.clients.http import get_http_client
+from app.config import settings
 from app.models.user import User
 from app.schemas.track import Track
 
 
 class SpotifyMusicDataProvider(IMusicDataProvider):
-    BASE_URL = SPOTIFY_API_BASE_URL
-
-    def __init__(self, token: str):
+    def __init__(self, token: str, http: httpx.AsyncClient | None = None):
         self.token = token
+        self.base_url = settings.spotify_api_base_url
+        self.http = http or get_http_client()
 
     async def _get(self, endpoint: str, params: dict | None = None) -> dict:
         headers = {"Authorization": f"Bearer {self.token}"}
-        url = f"{self.BASE_URL}{endpoint}"
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=headers, params=params)
-            resp.raise_for_status()
-            return resp.json()
+        url = f"{self.base_url}{endpoint}"
+        resp = await self.http.get(url, headers=headers, params=params)
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_user_top_tracks(self, user: User) -> List[Track]:
         # Normally: token = user.spotify_access_token
@@ -2,18 +2,18 @@ import httpx
 from urllib.parse import urlencode
 from typing import Any
 
+from app.clients.http import get_http_client
 from app.config import settings
-from app.constants.spotify import (
-    SPOTIFY_AUTH_URL, 
-    SPOTIFY_TOKEN_URL, 
-    SPOTIFY_API_BASE_URL,
-)
+from app.constants.spotify import SPOTIFY_AUTH_URL
 from app.domain.music.interfaces.music_provider import IMusicProvider
 
 
 class SpotifyOAuthService(IMusicProvider):
     SCOPE = "user-read-private user-read-email"
 
+    def __init__(self, http: httpx.AsyncClient | None = None):
+        self.http = http or get_http_client()
+
     def get_login_url(self, state: str) -> str:
         params = {
             "client_id": settings.spotify_client_id,
@@ -34,16 +34,18 @@ class SpotifyOAuthService(IMusicProvider):
         }
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(SPOTIFY_TOKEN_URL, data=data, headers=headers)
-            resp.raise_for_status()
-            token_data: dict[str, Any] = resp.json()
-            return token_data
+        resp = await self.http.post(
+            settings.spotify_token_url, data=data, headers=headers
+        )
+        resp.raise_for_status()
+        token_data: dict[str, Any] = resp.json()
+        return token_data
 
     async def get_user_profile(self, access_token: str) -> dict[str, Any]:
         headers = {"Authorization": f"Bearer {access_token}"}
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{SPOTIFY_API_BASE_URL}/me", headers=headers)
-            resp.raise_for_status()
-            return dict(resp.json())
+        resp = await self.http.get(
+            f"{settings.spotify_api_base_url}/me", headers=headers
+        )
+        resp.raise_for_status()
+        return dict(resp.json())
@@ -1,10 +1,13 @@
+import asyncio
 import datetime
 from contextlib import asynccontextmanager
 from collections.abc import AsyncGenerator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
+from app.api.deps import audio_feature_index
 from app.api.routes import api_router
+from app.clients.http import close_http_client, start_http_client
 # from app.api.routes import data, analysis, visualization
 
 
@@ -15,7 +18,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     for route in app.routes:
         if isinstance(route, APIRoute):
             print(f"{route.path} -> {route.name}")
-    yield
+    await start_http_client()
+    # In the background: the API serves other requests while it loads.
+    warm_up = asyncio.create_task(audio_feature_index.warm())
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        await close_http_client()
 
 
 app = FastAPI(
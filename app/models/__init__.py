@@ -4,4 +4,7 @@ from .album import Album
 from .track import Track
 from .playlist import Playlist, playlist_track_association
 from .listening_event import ListeningEvent
+from .listening_coverage import ListeningHistoryCoverage
+from .user_daily_stats import UserDailyStats
+from .user_entity_stats import UserAlbumStats, UserArtistStats, UserTrackStats
 from .genre_preference import UserGenrePreference
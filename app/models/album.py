@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import (
+    Column, String, Integer, DateTime, ForeignKey, UniqueConstraint
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -17,3 +19,7 @@ class Album(Base):
     
     artist = relationship("Artist", back_populates="albums")
     tracks = relationship("Track", back_populates="album")
+
+    __table_args__ = (
+        UniqueConstraint("name", "artist_id", name="uq_album_name_artist"),
+    )
@@ -8,7 +8,7 @@ class Artist(Base):
     __tablename__ = 'artists'
 
     id = Column(String, primary_key=True)
-    name = Column(String, index=True, nullable=False)
+    name = Column(String, unique=True, index=True, nullable=False)
     genres = Column(ARRAY(String), default=[])
     popularity = Column(Integer, default=0)
     followers = Column(Integer, default=0)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class ListeningHistoryCoverage(Base):
+    """
+    Span of a user's history known to be fully ingested. Plays inside
+    [covered_from, covered_to] can be skipped on re-upload without a lookup.
+    """
+    __tablename__ = "listening_history_coverage"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    covered_from = Column(DateTime(timezone=True), nullable=False)
+    covered_to = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
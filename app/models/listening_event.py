@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import (
+    DDL, BigInteger, Column, Integer, String, DateTime, Boolean, ForeignKey,
+    Index, UniqueConstraint, event, text
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -7,12 +10,13 @@ from app.db.database import Base
 class ListeningEvent(Base):
     __tablename__ = 'listening_events'
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    # The primary key must include the partition key (played_at).
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     track_id = Column(String, ForeignKey("tracks.id"), nullable=False)
 
     # Listening details
-    played_at = Column(DateTime(timezone=True), nullable=False)
+    played_at = Column(DateTime(timezone=True), primary_key=True)
     duration_ms = Column(Integer, nullable=False)  # Duration of the listening event in milliseconds
     progress_ms = Column(Integer, nullable=False)  # How far into the track
     skipped = Column(Boolean, default=False)  # Whether the track was skipped
@@ -22,6 +26,40 @@ class ListeningEvent(Base):
     context_id = Column(String, nullable=True)  # ID of the context (e.g., playlist ID)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Id of the inserting transaction: the incremental Parquet export's
+    # watermark (ids and created_at say nothing about commit order).
+    created_xid = Column(
+        BigInteger,
+        nullable=False,
+        server_default=text("(pg_current_xact_id()::text)::bigint")
+    )
 
     user = relationship("User", back_populates="listening_events")
     track = relationship("Track", back_populates="listening_events")
+
+    # Natural key: the same play uploaded twice is stored once.
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "track_id", "played_at",
+            name="uq_listening_event_user_track_played_at"
+        ),
+        # Serves keyset pagination of a user's history, newest first.
+        Index(
+            "ix_listening_event_user_played_at_id",
+            "user_id", played_at.desc(), id.desc()
+        ),
+        Index("ix_listening_event_created_xid", "created_xid"),
+        # Monthly partitions are managed by app.db.partitions
+        {"postgresql_partition_by": "RANGE (played_at)"},
+    )
+
+
+# Catches rows outside every monthly partition until one is created for them.
+event.listen(
+    ListeningEvent.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS listening_events_default "
+        "PARTITION OF listening_events DEFAULT"
+    ).execute_if(dialect="postgresql")
+)
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import (
+    Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Index
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -7,7 +9,8 @@ from app.db.database import Base
 class Track(Base):
     __tablename__ = 'tracks'
 
-    id = Column(String, primary_key=True)  # Spotify track ID
+    # Spotify track ID, or a name-derived uuid5 for records without a URI
+    id = Column(String, primary_key=True)
     name = Column(String, nullable=False)
     artist_id = Column(String, ForeignKey('artists.id'), nullable=False)
     album_id = Column(String, ForeignKey('albums.id'), nullable=False)
@@ -25,6 +28,8 @@ class Track(Base):
     speechiness = Column(Float)
     tempo = Column(Float)
     valence = Column(Float)
+    # Set once features were requested, even if Spotify had none.
+    audio_features_checked_at = Column(DateTime(timezone=True))
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -32,3 +37,16 @@ class Track(Base):
     album = relationship("Album", back_populates="tracks")
     listening_events = relationship("ListeningEvent", back_populates="track")
     playlists = relationship("Playlist", secondary="playlist_track_association", back_populates="tracks")
+
+    # Only used to match records without a track URI. Not unique: distinct
+    # Spotify tracks may share a title, artist and album name.
+    __table_args__ = (
+        Index("ix_track_name_artist_album", "name", "artist_id", "album_id"),
+        Index(
+            "ix_track_audio_features_pending",
+            "id",
+            postgresql_where=audio_features_checked_at.is_(None)
+        ),
+        # Newly enriched tracks, read by the audio-feature index.
+        Index("ix_track_audio_features_checked_at", "audio_features_checked_at"),
+    )
@@ -15,10 +15,12 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Can be hundreds of thousands of rows: never loaded implicitly. Query
+    # listening_events (or the rollups) directly instead.
     listening_events = relationship(
         "ListeningEvent",
         back_populates="user",
-        lazy="selectin"
+        lazy="raise"
     )
     playlists = relationship("Playlist", back_populates="user")
     genre_preferences = relationship("UserGenrePreference", back_populates="user")
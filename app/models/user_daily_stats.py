@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, BigInteger, String
+
+from app.db.database import Base
+
+
+class UserDailyStats(Base):
+    """
+    Per-user, per-day (UTC) listening rollup, rewritten from
+    listening_events for every day an ingestion chunk touches.
+    """
+    __tablename__ = "user_daily_stats"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    plays = Column(Integer, nullable=False)
+    ms_played = Column(BigInteger, nullable=False)
+    distinct_tracks = Column(Integer, nullable=False)
+    first_played = Column(DateTime(timezone=True), nullable=False)
+    last_played = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,48 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.db.database import Base
+
+
+# Running per-user totals, incremented from newly inserted listening events.
+# The (user_id, play_count) indexes make a top-N read an index range scan.
+
+class UserTrackStats(Base):
+    __tablename__ = "user_track_stats"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    track_id = Column(String, ForeignKey("tracks.id"), primary_key=True)
+    play_count = Column(Integer, nullable=False)
+    ms_played = Column(BigInteger, nullable=False)
+    last_played = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_track_stats_top", "user_id", play_count.desc(), "track_id"),
+    )
+
+
+class UserArtistStats(Base):
+    __tablename__ = "user_artist_stats"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    artist_id = Column(String, ForeignKey("artists.id"), primary_key=True)
+    play_count = Column(Integer, nullable=False)
+    ms_played = Column(BigInteger, nullable=False)
+    last_played = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_artist_stats_top", "user_id", play_count.desc(), "artist_id"),
+    )
+
+
+class UserAlbumStats(Base):
+    __tablename__ = "user_album_stats"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    album_id = Column(String, ForeignKey("albums.id"), primary_key=True)
+    play_count = Column(Integer, nullable=False)
+    ms_played = Column(BigInteger, nullable=False)
+    last_played = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_album_stats_top", "user_id", play_count.desc(), "album_id"),
+    )
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable
 
 from app.crud.album_crud import AlbumCRUD
 from app.models.album import Album
@@ -14,6 +15,13 @@ class AlbumRepository(ABC):
     ) -> Album:
         pass
 
+    @abstractmethod
+    async def bulk_get_or_create(
+        self,
+        keys: Iterable[tuple[str, str]]
+    ) -> dict[tuple[str, str], str]:
+        pass
+
 
 class SQLAlchemyAlbumRepository(AlbumRepository):
     def __init__(self, session: AsyncSession) -> None:
@@ -30,3 +38,9 @@ class SQLAlchemyAlbumRepository(AlbumRepository):
             name, 
             artist_id
         )
+
+    async def bulk_get_or_create(
+        self,
+        keys: Iterable[tuple[str, str]]
+    ) -> dict[tuple[str, str], str]:
+        return await self.crud.bulk_get_or_create(self.session, keys)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable
 
 from app.crud.artist_crud import ArtistCRUD
 from app.models.artist import Artist
@@ -11,6 +12,14 @@ class ArtistRepository(ABC):
         """Fetch or create an artist by their name."""
         pass
 
+    @abstractmethod
+    async def bulk_get_or_create_by_names(
+        self,
+        names: Iterable[str]
+    ) -> dict[str, str]:
+        """Resolve many artist names to ids, creating missing artists."""
+        pass
+
 
 class SQLAlchemyArtistRepository(ArtistRepository):
     def __init__(self, session: AsyncSession) -> None:
@@ -20,3 +29,9 @@ class SQLAlchemyArtistRepository(ArtistRepository):
 
     async def get_or_create_by_name(self, name: str) -> Artist:
         return await self.crud.get_or_create_by_name(self.session, name)
+
+    async def bulk_get_or_create_by_names(
+        self,
+        names: Iterable[str]
+    ) -> dict[str, str]:
+        return await self.crud.bulk_get_or_create_by_names(self.session, names)
@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Iterable, Sequence
+
+from app.crud.genre_preference_crud import GenrePreferenceCRUD
+from app.models.user import User
+
+
+class GenrePreferenceRepository(ABC):
+    @abstractmethod
+    async def get_user_ids(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    async def get_artist_day_plays(
+        self,
+        user_ids: Sequence[str]
+    ) -> Sequence[Row]:
+        """(user_id, day, genres, ms_played) per user, artist and day"""
+        pass
+
+    @abstractmethod
+    async def replace_for_users(
+        self,
+        user_ids: Sequence[str],
+        rows: Iterable[dict[str, Any]]
+    ) -> int:
+        pass
+
+
+class SQLAlchemyGenrePreferenceRepository(GenrePreferenceRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.crud = GenrePreferenceCRUD()
+
+    async def get_user_ids(self) -> list[str]:
+        result = await self.session.execute(select(User.id).order_by(User.id))
+        return list(result.scalars().all())
+
+    async def get_artist_day_plays(
+        self,
+        user_ids: Sequence[str]
+    ) -> Sequence[Row]:
+        return await self.crud.get_artist_day_plays(self.session, user_ids)
+
+    async def replace_for_users(
+        self,
+        user_ids: Sequence[str],
+        rows: Iterable[dict[str, Any]]
+    ) -> int:
+        written = await self.crud.replace_for_users(self.session, user_ids, rows)
+        await self.session.commit()
+        return written
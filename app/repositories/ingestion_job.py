@@ -0,0 +1,61 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from redis import Redis
+from typing import Any
+
+from app.config import settings
+
+JOB_KEY_PREFIX = "ingest:job:"
+
+
+class IngestionJobRepository(ABC):
+    @abstractmethod
+    def create(self, job_id: str, user_id: str, bytes_total: int) -> None:
+        """Register a queued job."""
+        pass
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Overwrite some fields of an existing job."""
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict[str, str] | None:
+        """Fetch the raw job record."""
+        pass
+
+
+class RedisIngestionJobRepository(IngestionJobRepository):
+    """Job records live in Redis hashes so the API and workers share them."""
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    def _key(self, job_id: str) -> str:
+        return f"{JOB_KEY_PREFIX}{job_id}"
+
+    def create(self, job_id: str, user_id: str, bytes_total: int) -> None:
+        key = self._key(job_id)
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping={
+            "id": job_id,
+            "user_id": user_id,
+            "status": "queued",
+            "bytes_total": bytes_total,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        pipe.expire(key, settings.ingest_job_ttl_seconds)
+        pipe.execute()
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        mapping = {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in fields.items()
+            if value is not None
+        }
+        if mapping:
+            self.redis.hset(self._key(job_id), mapping=mapping)
+
+    def get(self, job_id: str) -> dict[str, str] | None:
+        record: dict[str, str] = self.redis.hgetall(self._key(job_id))
+        return record or None
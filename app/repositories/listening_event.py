@@ -1,12 +1,18 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
-from sqlalchemy import select, func
+from datetime import date, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any, Sequence
+from sqlalchemy import Row, RowMapping
+from typing import Any, AsyncIterator, Iterable, Literal, Sequence
 
 from app.schemas.listening_event import ListeningEventCreate
 from app.models.listening_event import ListeningEvent
+from app.models.user_daily_stats import UserDailyStats
 from app.crud.listening_event_crud import ListeningEventCRUD
+from app.crud.user_daily_stats_crud import UserDailyStatsCRUD
+from app.crud.user_entity_stats_crud import UserEntityStatsCRUD
+from app.db import partitions
+
+TopEntity = Literal["tracks", "artists", "albums"]
 
 
 class ListeningEventRepository(ABC):
@@ -21,15 +27,144 @@ class ListeningEventRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_user_stats(self, user_id: str) -> dict[str, Any]:
+    async def bulk_create_events(
+        self,
+        user_id: str,
+        events: Sequence[tuple[str, datetime, int]]
+    ) -> int:
+        """
+        Insert (track_id, played_at, duration_ms) events in one transaction,
+        skipping ones already stored. Returns the number inserted.
+        """
+        pass
+
+    @abstractmethod
+    async def copy_plays(
+        self,
+        user_id: str,
+        plays: Iterable[tuple[str, bool, str, str, str, datetime, int]]
+    ) -> int:
+        """
+        Bulk-load (track_id, has_spotify_id, track_name, artist_name,
+        album_name, played_at, ms_played) plays, resolving artists, albums
+        and tracks on the database side. Plays without a Spotify id are
+        matched to existing tracks by name before `track_id` is used.
+        """
+        pass
+
+    @abstractmethod
+    async def get_covered_range(
+        self,
+        user_id: str
+    ) -> tuple[datetime, datetime] | None:
+        """Span of the user's history known to be fully ingested"""
+        pass
+
+    @abstractmethod
+    async def extend_covered_range(
+        self,
+        user_id: str,
+        covered_from: datetime,
+        covered_to: datetime
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def ensure_partitions(self, start: datetime, end: datetime) -> None:
+        """Make sure monthly partitions exist for plays in [start, end]"""
+        pass
+
+    @abstractmethod
+    async def get_user_stats(
+        self,
+        user_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None
+    ) -> dict[str, Any]:
         pass
 
     @abstractmethod
     async def get_user_listening_history(
-        self, user_id: str, limit: int, offset: int
+        self,
+        user_id: str,
+        limit: int,
+        offset: int = 0,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: tuple[datetime, int] | None = None
     ) -> Sequence[ListeningEvent]:
         pass
 
+    @abstractmethod
+    def stream_user_export(
+        self,
+        user_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[RowMapping]:
+        """All of a user's events, oldest first, with catalog names"""
+        pass
+
+    @abstractmethod
+    async def get_finished_xid(self) -> int:
+        """Transaction id below which every transaction has finished"""
+        pass
+
+    @abstractmethod
+    def stream_event_batches(
+        self,
+        fields: Sequence[str],
+        from_xid: int,
+        to_xid: int,
+        user_id: str | None = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Events of transactions from_xid <= xid < to_xid in id order,
+        projected to `fields`, a batch at a time
+        """
+        pass
+
+    @abstractmethod
+    def stream_track_plays(
+        self,
+        batch_size: int = 50000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """All users' (user_id, track_id, play_count), a batch at a time"""
+        pass
+
+    @abstractmethod
+    async def count_user_events(
+        self,
+        user_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None
+    ) -> int:
+        pass
+
+    @abstractmethod
+    async def get_daily_stats(
+        self,
+        user_id: str,
+        start: date | None = None,
+        end: date | None = None
+    ) -> Sequence[UserDailyStats]:
+        pass
+
+    @abstractmethod
+    async def get_top(
+        self,
+        user_id: str,
+        entity: TopEntity,
+        limit: int
+    ) -> Sequence[Row]:
+        """
+        Most played tracks, artists or albums as (id, name, play_count,
+        ms_played, last_played) rows
+        """
+        pass
+
 
 class SQLAlchemyListeningEventRepository(ListeningEventRepository):
     def __init__(self, session: AsyncSession):
@@ -52,32 +187,139 @@ class SQLAlchemyListeningEventRepository(ListeningEventRepository):
             skipped=False
         )
         return await self.crud.create_event(self.session, event_data)
-    
-    async def get_user_stats(self, user_id: str) -> dict[str, Any]:
-        result = await self.session.execute(
-            select(
-                func.count(ListeningEvent.id),
-                func.sum(ListeningEvent.duration_ms),
-                func.min(ListeningEvent.played_at),
-                func.max(ListeningEvent.played_at)
-            ).where(ListeningEvent.user_id == user_id)
-        )
 
-        total_count, total_duration, first_play, last_play = (
-            result.one_or_none() or (0, 0, None, None)
+    async def bulk_create_events(
+        self,
+        user_id: str,
+        events: Sequence[tuple[str, datetime, int]]
+    ) -> int:
+        inserted = await self.crud.bulk_create_events(
+            self.session,
+            [
+                {
+                    "user_id": user_id,
+                    "track_id": track_id,
+                    "played_at": played_at,
+                    "duration_ms": duration_ms,
+                    "progress_ms": 0,
+                    "skipped": False,
+                }
+                for track_id, played_at, duration_ms in events
+            ]
         )
+        await self.session.commit()
+        return inserted
 
-        return {
-            "total_listens": total_count,
-            "total_played_ms": total_duration or 0,
-            "first_played": first_play,
-            "last_played": last_play
-        }
+    async def copy_plays(
+        self,
+        user_id: str,
+        plays: Iterable[tuple[str, bool, str, str, str, datetime, int]]
+    ) -> int:
+        inserted = await self.crud.copy_plays(self.session, user_id, plays)
+        await self.session.commit()
+        return inserted
+
+    async def get_covered_range(
+        self,
+        user_id: str
+    ) -> tuple[datetime, datetime] | None:
+        return await self.crud.get_covered_range(self.session, user_id)
+
+    async def extend_covered_range(
+        self,
+        user_id: str,
+        covered_from: datetime,
+        covered_to: datetime
+    ) -> None:
+        await self.crud.extend_covered_range(
+            self.session, user_id, covered_from, covered_to
+        )
+        await self.session.commit()
     
+    async def ensure_partitions(self, start: datetime, end: datetime) -> None:
+        await partitions.ensure_partitions(self.session, start, end)
+        await self.session.commit()
+
+    async def get_user_stats(
+        self,
+        user_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None
+    ) -> dict[str, Any]:
+        return await UserDailyStatsCRUD.get_range_totals(
+            self.session, user_id, start, end
+        )
+
     async def get_user_listening_history(
-        self, user_id: str, limit: int, offset: int
+        self,
+        user_id: str,
+        limit: int,
+        offset: int = 0,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: tuple[datetime, int] | None = None
     ) -> Sequence[ListeningEvent]:
-        from app.crud.listening_event_crud import ListeningEventCRUD
-        return await ListeningEventCRUD().get_user_listening_history(
-            self.session, user_id, limit, offset
+        return await self.crud.get_user_listening_history(
+            self.session, user_id, limit, offset, start, end, after
+        )
+
+    def stream_user_export(
+        self,
+        user_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[RowMapping]:
+        return self.crud.stream_user_export(
+            self.session, user_id, start, end, batch_size
+        )
+
+    async def get_finished_xid(self) -> int:
+        return await self.crud.get_finished_xid(self.session)
+
+    def stream_event_batches(
+        self,
+        fields: Sequence[str],
+        from_xid: int,
+        to_xid: int,
+        user_id: str | None = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[Sequence[Row]]:
+        return self.crud.stream_event_batches(
+            self.session, fields, from_xid, to_xid, user_id, batch_size
+        )
+
+    def stream_track_plays(
+        self,
+        batch_size: int = 50000
+    ) -> AsyncIterator[Sequence[Row]]:
+        return UserEntityStatsCRUD.stream_track_plays(self.session, batch_size)
+
+    async def count_user_events(
+        self,
+        user_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None
+    ) -> int:
+        totals = await UserDailyStatsCRUD.get_range_totals(
+            self.session, user_id, start, end
+        )
+        return totals["total_listens"]
+
+    async def get_daily_stats(
+        self,
+        user_id: str,
+        start: date | None = None,
+        end: date | None = None
+    ) -> Sequence[UserDailyStats]:
+        return await UserDailyStatsCRUD.get_days(self.session, user_id, start, end)
+
+    async def get_top(
+        self,
+        user_id: str,
+        entity: TopEntity,
+        limit: int
+    ) -> Sequence[Row]:
+        return await UserEntityStatsCRUD.get_top(
+            self.session, user_id, entity, limit
         )
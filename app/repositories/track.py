@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from sqlalchemy import select
+from datetime import datetime
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Iterable, Sequence
 
 from app.crud.track_crud import TrackCRUD
 from app.schemas.track import TrackCreate
@@ -11,6 +13,19 @@ class TrackRepository(ABC):
     @abstractmethod
     async def get_or_create(self, track_data: TrackCreate) -> TrackModel:
         pass
+
+    @abstractmethod
+    async def bulk_get_or_create(
+        self,
+        tracks: Iterable[TrackCreate]
+    ) -> dict[tuple[str, str, str], str]:
+        """Resolve tracks by (name, artist id, album id)"""
+        pass
+
+    @abstractmethod
+    async def bulk_create_missing(self, tracks: Iterable[TrackCreate]) -> None:
+        """Ensure tracks whose ids are known (Spotify ids) exist"""
+        pass
     
     @abstractmethod
     async def get_by_id(self, track_id: str) -> TrackModel | None:
@@ -20,6 +35,29 @@ class TrackRepository(ABC):
     async def get_by_artist_id(self, artist_id: str) -> list[TrackModel]:
         pass
 
+    @abstractmethod
+    async def get_missing_audio_features(
+        self,
+        limit: int,
+        after: str | None = None
+    ) -> list[str]:
+        """Spotify track ids, in order, whose features were never fetched"""
+        pass
+
+    @abstractmethod
+    async def bulk_update(self, rows: Sequence[dict[str, Any]]) -> None:
+        """Update tracks by id; each row is an `id` plus the new values"""
+        pass
+
+    @abstractmethod
+    def stream_audio_features(
+        self,
+        checked_since: datetime | None = None,
+        batch_size: int = 50000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Batches of (id, *audio features) of tracks with all features"""
+        pass
+
 
 class SQLAlchemyTrackRepository(TrackRepository):
     def __init__(self, session: AsyncSession) -> None:
@@ -28,6 +66,15 @@ class SQLAlchemyTrackRepository(TrackRepository):
 
     async def get_or_create(self, track_data: TrackCreate) -> TrackModel:
         return await self.crud.get_or_create_track(self.session, track_data)
+
+    async def bulk_get_or_create(
+        self,
+        tracks: Iterable[TrackCreate]
+    ) -> dict[tuple[str, str, str], str]:
+        return await self.crud.bulk_get_or_create_tracks(self.session, tracks)
+
+    async def bulk_create_missing(self, tracks: Iterable[TrackCreate]) -> None:
+        await self.crud.bulk_create_missing_tracks(self.session, tracks)
     
     async def get_by_id(self, track_id: str) -> TrackModel | None:
         result = await self.session.execute(
@@ -40,3 +87,25 @@ class SQLAlchemyTrackRepository(TrackRepository):
             select(TrackModel).where(TrackModel.artist_id == artist_id)
         )
         return list(result.scalars().all())
+
+    async def get_missing_audio_features(
+        self,
+        limit: int,
+        after: str | None = None
+    ) -> list[str]:
+        return await self.crud.get_tracks_missing_audio_features(
+            self.session, limit, after
+        )
+
+    async def bulk_update(self, rows: Sequence[dict[str, Any]]) -> None:
+        await self.crud.bulk_update_tracks(self.session, rows)
+        await self.session.commit()
+
+    def stream_audio_features(
+        self,
+        checked_since: datetime | None = None,
+        batch_size: int = 50000
+    ) -> AsyncIterator[Sequence[Row]]:
+        return self.crud.stream_audio_features(
+            self.session, checked_since, batch_size
+        )
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import ORMOption
+from typing import Sequence
 
 from app.crud.user_crud import UserCRUD
 from app.models.user import User
@@ -8,8 +10,17 @@ from app.schemas.user import UserCreate
 
 class UserRepository(ABC):
     @abstractmethod
-    async def get_by_id(self, user_id: str) -> User | None:
-        """Fetch a user by their ID."""
+    async def get_by_id(
+        self,
+        user_id: str,
+        options: Sequence[ORMOption] = ()
+    ) -> User | None:
+        """Fetch a user by their ID, loading only the requested relationships."""
+        pass
+
+    @abstractmethod
+    async def count_listening_events(self, user_id: str) -> int:
+        """Total number of plays stored for a user."""
         pass
 
     @abstractmethod
@@ -41,8 +52,15 @@ class SQLAlchemyUserRepository(UserRepository):
         self.session = session
         self.crud = UserCRUD()
 
-    async def get_by_id(self, user_id: str) -> User | None:
-        return await self.crud.get_user_by_id(self.session, user_id)
+    async def get_by_id(
+        self,
+        user_id: str,
+        options: Sequence[ORMOption] = ()
+    ) -> User | None:
+        return await self.crud.get_user_by_id(self.session, user_id, options)
+
+    async def count_listening_events(self, user_id: str) -> int:
+        return await self.crud.count_listening_events(self.session, user_id)
     
     async def get_by_provider_user_id(
         self, provider: str, provider_user_id: str
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Json
+from datetime import datetime
+from typing import List, Optional
+
+
+class IngestionJobStatus(BaseModel):
+    id: str
+    user_id: str
+    status: str  # queued, running, completed, failed
+    processed: int = 0
+    inserted: int = 0  # new listening events
+    duplicates: int = 0  # valid plays that were already stored
+    skipped: int = 0
+    bytes_total: int = 0
+    bytes_read: int = 0
+    invalid_records: Json[List[int]] = []
+    files_total: int = 0
+    files_done: int = 0
+    failed_files: Json[List[str]] = []
+    records_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
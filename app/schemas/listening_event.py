@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class ListeningEventBase(BaseModel):
@@ -24,3 +24,14 @@ class ListeningEvent(ListeningEventBase):
     user_id: str
     track_id: str
     created_at: datetime
+
+
+class ListeningHistoryPage(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: str
+    events: List[ListeningEvent]
+    total: int
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
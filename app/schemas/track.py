@@ -33,3 +33,14 @@ class Track(TrackBase):
     artist_id: str
     album_id: str
     created_at: datetime
+
+
+class SimilarTrack(BaseModel):
+    track_id: str
+    score: float
+
+
+class AudioFeatureMatch(BaseModel):
+    track_id: str
+    # Distance in normalized feature space; None for plain range searches
+    distance: Optional[float] = None
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import date, datetime
+
+
+class UserDailyStats(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    day: date
+    plays: int
+    ms_played: int
+    distinct_tracks: int
+    first_played: datetime
+    last_played: datetime
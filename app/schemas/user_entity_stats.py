@@ -0,0 +1,13 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+
+
+class TopEntry(BaseModel):
+    """One of a user's most played tracks, artists or albums"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    name: str
+    play_count: int
+    ms_played: int
+    last_played: datetime
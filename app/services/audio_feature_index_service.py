@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from redis import Redis, RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncContextManager, Callable, Optional
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.core.recommendations.audio_features import AudioFeatureIndex
+from app.repositories.track import SQLAlchemyTrackRepository
+from app.services.response_cache import CATALOG_SCOPE, VERSION_KEY_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# Enrichment stamps audio_features_checked_at before its transaction
+# commits; re-reading a margin before the last load keeps such tracks from
+# being missed. Tracks read twice simply replace themselves.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class AudioFeatureIndexService:
+    """
+    The API process's audio-feature index. The first request loads every
+    enriched track; afterwards, whenever the catalog's data version has
+    changed (checked at most every `refresh_seconds`), only tracks enriched
+    since the previous load are read and added.
+
+    Updated indexes are built in a worker thread next to the one serving
+    queries and swapped in when done, so the event loop is never blocked
+    by a tree build; requests arriving meanwhile get the current index.
+    """
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        redis: Redis,
+        refresh_seconds: float = settings.audio_index_refresh_seconds,
+        brute_force_limit: int = settings.audio_index_brute_force_limit,
+        batch_size: int = settings.audio_index_batch_size
+    ):
+        self.session_factory = session_factory
+        self.redis = redis
+        self.refresh_seconds = refresh_seconds
+        self.batch_size = batch_size
+        self.index = AudioFeatureIndex(brute_force_limit=brute_force_limit)
+        self._version: Optional[str] = None
+        self._watermark: Optional[datetime] = None
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> AudioFeatureIndex:
+        if not self._is_due(time.monotonic()):
+            return self.index
+        if self._lock.locked() and self._checked_at is not None:
+            # Being refreshed; the current index is only slightly behind.
+            return self.index
+        async with self._lock:
+            now = time.monotonic()
+            if self._is_due(now):
+                await self._refresh()
+                self._checked_at = now
+        return self.index
+
+    async def warm(self) -> None:
+        """Load the index ahead of the first request (run at startup)"""
+        try:
+            await self.get()
+        except Exception:
+            logger.exception("Could not load the audio-feature index")
+
+    def _is_due(self, now: float) -> bool:
+        return (
+            self._checked_at is None
+            or now - self._checked_at >= self.refresh_seconds
+        )
+
+    async def _refresh(self) -> None:
+        try:
+            version = self.redis.get(f"{VERSION_KEY_PREFIX}{CATALOG_SCOPE}")
+        except RedisError as e:
+            # Without the version, look for new tracks on every check.
+            logger.warning("Catalog version unavailable: %s", e)
+            version = None
+        if version is not None and version == self._version:
+            return
+
+        started = datetime.now(timezone.utc)
+        since = None if self._watermark is None else self._watermark - WATERMARK_OVERLAP
+        track_ids: list[str] = []
+        features: list[list[float]] = []
+        async with self.session_factory() as session:
+            repo = SQLAlchemyTrackRepository(session)
+            async for rows in repo.stream_audio_features(since, self.batch_size):
+                for track_id, *values in rows:
+                    track_ids.append(track_id)
+                    features.append(values)
+        self.index = await asyncio.to_thread(
+            self._updated, self.index, track_ids, features
+        )
+        self._version = version
+        self._watermark = started
+        logger.info(
+            "Audio-feature index: %s tracks read, %s indexed",
+            len(track_ids), len(self.index)
+        )
+
+    @staticmethod
+    def _updated(
+        index: AudioFeatureIndex,
+        track_ids: list[str],
+        features: list[list[float]]
+    ) -> AudioFeatureIndex:
+        if not track_ids:
+            return index
+        return index.added(track_ids, np.array(features, dtype=np.float32))
@@ -1,19 +1,62 @@
-from jose import jwt, JWTError
+from collections import OrderedDict
+from typing import Any
+import time
+
+import jwt
 from fastapi import HTTPException, status
+
 from app.config import settings
+from app.core.security import decode_access_token
+
+
+class _ClaimsCache:
+    """Verified claims by token, kept no longer than the token is valid"""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        claims = self._entries.get(token)
+        if claims is None:
+            return None
+        if claims["exp"] <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return claims
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        self._entries[token] = claims
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_claims_cache = _ClaimsCache(settings.auth_claims_cache_size)
 
 
 class AuthService:
-    def decode_token(self, token: str) -> str:
+    def verify_token(self, token: str) -> dict[str, Any]:
+        """
+        Claims of a valid access token. Signature checks are done once per
+        token and process; later calls only re-check the expiry.
+        """
+        claims = _claims_cache.get(token)
+        if claims is not None:
+            return claims
         try:
-            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-            user_id: str = payload.get("sub")
-            if not user_id:
-                raise ValueError("Missing 'sub' in token")
-            return user_id
-        except JWTError as e:
+            claims = decode_access_token(token)
+        except jwt.PyJWTError as e:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             ) from e
+        _claims_cache.put(token, claims)
+        return claims
+
+    def decode_token(self, token: str) -> str:
+        return str(self.verify_token(token)["sub"])
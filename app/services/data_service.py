@@ -1,10 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import Dict, List, Any
+from datetime import datetime
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, Sequence
+)
 import logging
 
+from app.config import settings
+from app.schemas.track import TrackCreate
 from app.schemas.user import UserCreate, User as UserSchema
-from app.services.spotify_ingestion_service import SpotifyIngestionService
+from app.services.spotify_ingestion_service import (
+    ParsedPlay,
+    SpotifyIngestionService,
+)
 from app.repositories.user import UserRepository
 from app.repositories.artist import ArtistRepository
 from app.repositories.album import AlbumRepository
@@ -15,6 +23,45 @@ from app.models.listening_event import ListeningEvent
 logger = logging.getLogger(__name__)
 
 
+class _Upload:
+    """Running counts and played_at span of one upload"""
+    def __init__(self, covered: tuple[datetime, datetime] | None):
+        self.covered = covered
+        self.processed = 0
+        self.inserted = 0
+        self.first_played: datetime | None = None
+        self.last_played: datetime | None = None
+
+    def fresh(self, plays: Sequence[ParsedPlay]) -> Sequence[ParsedPlay]:
+        """Count a chunk of valid plays; return those not covered yet"""
+        if not plays:
+            return plays
+        self.processed += len(plays)
+        first = min(play.played_at for play in plays)
+        last = max(play.played_at for play in plays)
+        if self.first_played is None or first < self.first_played:
+            self.first_played = first
+        if self.last_played is None or last > self.last_played:
+            self.last_played = last
+
+        if self.covered is None:
+            return plays
+        covered_from, covered_to = self.covered
+        if first > covered_to or last < covered_from:
+            return plays
+        return [
+            play for play in plays
+            if not covered_from <= play.played_at <= covered_to
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "duplicates": self.processed - self.inserted,
+        }
+
+
 class DataService:
     """Service for handling data operations"""
     def __init__(
@@ -37,55 +84,214 @@ class DataService:
             self,
             data: List[Dict[str, Any]],
             user_id: str,
-    ) -> Dict[str, int]:
-        """Process Spotify listening history data"""
+    ) -> Dict[str, Any]:
+        """Process Spotify listening history data in bulk chunks"""
+        async def records() -> AsyncIterator[Dict[str, Any]]:
+            for item in data:
+                yield item
+
+        return await self.process_spotify_stream(records(), user_id)
+
+    async def process_spotify_stream(
+            self,
+            records: AsyncIterable[Any],
+            user_id: str,
+            on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Consume records as they are parsed and write them in chunks of
+        `ingest_chunk_size`, so at most one chunk is held in memory.
+        `on_progress` receives the running (processed, skipped) counts after
+        every committed chunk.
+        """
+        skipped = 0
+        invalid_records: list[int] = []
+        chunk_size = self._chunk_size()
+        chunk: list[Any] = []
+        offset = 0
+        owner_id: str | None = None
+        upload: _Upload | None = None
+
+        async def flush() -> None:
+            nonlocal skipped, offset, chunk, owner_id, upload
+            if owner_id is None or upload is None:
+                owner_id, upload = await self._start_upload(user_id)
+            plays, invalid = self.ingestion.parse_plays(chunk)
+            await self._write_new_plays(upload, plays, owner_id)
+            skipped += len(invalid)
+            room = settings.ingest_max_reported_errors - len(invalid_records)
+            invalid_records.extend(offset + i for i in invalid[:max(room, 0)])
+            offset += len(chunk)
+            chunk = []
+            if on_progress is not None:
+                await on_progress(upload.processed, skipped)
+
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+
+        if owner_id is not None and upload is not None:
+            await self._finish_upload(upload, owner_id)
+        counts = upload.counts() if upload else _Upload(None).counts()
+        return {
+            **counts,
+            "skipped": skipped,
+            "invalid_records": invalid_records,
+        }
+
+    async def _get_or_create_user_id(self, user_id: str) -> str:
         user = await self.user_repo.get_by_id(user_id)
         if not user:
             user = await self.user_repo.create(
                 UserCreate(id=user_id, username=user_id)
             )
+        return str(user.id)
 
-        processed, skipped = 0, 0
-
-        for item in data:
-            if not self.ingestion.is_valid_record(item):
-                skipped += 1
-                continue
-
-            try:
-                artist = await self.artist_repo.get_or_create_by_name(
-                    item["master_metadata_album_artist_name"]
-                )
-                album = await self.album_repo.get_or_create_by_name_and_artist(
-                    item["master_metadata_album_album_name"], 
-                    str(artist.id)
-                )
-                track_data, played_at, ms_played = self.ingestion.parse_record(
-                    item,
-                    str(artist.id),
-                    str(album.id)
-                )
-
-                track = await self.track_repo.get_or_create(track_data)
-
-                await self.event_repo.create_event(
-                    str(user.id),
-                    str(track.id),
-                    played_at,
-                    ms_played
-                )
-                processed += 1
-            except Exception:
-                logger.exception("Error processing item: %s", item)
-                skipped += 1
-        return {"processed": processed, "skipped": skipped}
-
-    async def get_user_stats(self, user_id: str) -> dict[str, Any] | None:
+    async def ingest_plays(
+            self,
+            plays: Sequence[ParsedPlay],
+            user_id: str,
+    ) -> Dict[str, int]:
+        """
+        Write already parsed plays (e.g. one file of an export archive) in
+        chunks. Returns processed, inserted and duplicate counts.
+        """
+        owner_id, upload = await self._start_upload(user_id)
+        chunk_size = self._chunk_size()
+        for start in range(0, len(plays), chunk_size):
+            await self._write_new_plays(
+                upload, plays[start:start + chunk_size], owner_id
+            )
+        await self._finish_upload(upload, owner_id)
+        return upload.counts()
+
+    @staticmethod
+    def _chunk_size() -> int:
+        if settings.ingest_use_copy:
+            return settings.ingest_copy_chunk_size
+        return settings.ingest_chunk_size
+
+    async def _start_upload(self, user_id: str) -> tuple[str, _Upload]:
+        owner_id = await self._get_or_create_user_id(user_id)
+        covered = await self.event_repo.get_covered_range(owner_id)
+        return owner_id, _Upload(covered)
+
+    async def _write_new_plays(
+            self,
+            upload: _Upload,
+            plays: Sequence[ParsedPlay],
+            user_id: str,
+    ) -> None:
+        """
+        Write the plays of one chunk that fall outside the already covered
+        span; the rest are counted as duplicates without a database round
+        trip.
+        """
+        fresh = upload.fresh(plays)
+        if fresh:
+            await self.event_repo.ensure_partitions(
+                min(play.played_at for play in fresh),
+                max(play.played_at for play in fresh)
+            )
+        upload.inserted += await self._write_plays(fresh, user_id)
+
+    async def _finish_upload(self, upload: _Upload, user_id: str) -> None:
+        """Mark the upload's span as covered once all of it is written"""
+        if upload.first_played is not None and upload.last_played is not None:
+            await self.event_repo.extend_covered_range(
+                user_id, upload.first_played, upload.last_played
+            )
+
+    async def _write_plays(
+            self,
+            plays: Sequence[ParsedPlay],
+            user_id: str,
+    ) -> int:
+        """
+        Write one chunk with set-based lookups: every distinct artist, album
+        and track is resolved (or created) by a single statement per entity
+        type, and all events go in one multi-row INSERT and one commit.
+        With `ingest_use_copy` the whole chunk is COPYed to a staging table
+        and resolved in SQL instead.
+        """
+        if not plays:
+            return 0
+        if settings.ingest_use_copy:
+            return await self.event_repo.copy_plays(
+                user_id,
+                [
+                    (
+                        self.ingestion.track_id(play),
+                        play.spotify_track_id is not None,
+                        play.track_name,
+                        play.artist_name,
+                        play.album_name,
+                        play.played_at,
+                        play.ms_played,
+                    )
+                    for play in plays
+                ]
+            )
+
+        artist_ids = await self.artist_repo.bulk_get_or_create_by_names(
+            play.artist_name for play in plays
+        )
+        album_ids = await self.album_repo.bulk_get_or_create(
+            (play.album_name, artist_ids[play.artist_name]) for play in plays
+        )
+
+        # One TrackCreate per distinct track rather than per play. Tracks
+        # with a Spotify id are resolved by primary key; the rest by name.
+        by_id: dict[str, TrackCreate] = {}
+        by_name: dict[tuple[str, str, str], TrackCreate] = {}
+        refs: list[str | tuple[str, str, str]] = []
+        for play in plays:
+            artist_id = artist_ids[play.artist_name]
+            album_id = album_ids[(play.album_name, artist_id)]
+            if play.spotify_track_id:
+                ref: str | tuple[str, str, str] = play.spotify_track_id
+                if ref not in by_id:
+                    by_id[ref] = self.ingestion.build_track(
+                        play, artist_id, album_id
+                    )
+            else:
+                ref = (play.track_name, artist_id, album_id)
+                if ref not in by_name:
+                    by_name[ref] = self.ingestion.build_track(
+                        play, artist_id, album_id
+                    )
+            refs.append(ref)
+
+        track_ids: dict[str | tuple[str, str, str], str] = {}
+        if by_id:
+            await self.track_repo.bulk_create_missing(by_id.values())
+            track_ids.update((track_id, track_id) for track_id in by_id)
+        if by_name:
+            track_ids.update(
+                await self.track_repo.bulk_get_or_create(by_name.values())
+            )
+        return await self.event_repo.bulk_create_events(
+            user_id,
+            [
+                (track_ids[ref], play.played_at, play.ms_played)
+                for ref, play in zip(refs, plays)
+            ]
+        )
+
+    async def get_user_stats(
+            self,
+            user_id: str,
+            start: datetime | None = None,
+            end: datetime | None = None
+    ) -> dict[str, Any] | None:
         user = await self.user_repo.get_by_id(user_id)
         if user is None:
             return None
         
-        stats = await self.event_repo.get_user_stats(user_id)
+        stats = await self.event_repo.get_user_stats(user_id, start, end)
 
         return {
             "user": UserSchema.model_validate(user),
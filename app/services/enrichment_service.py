@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import logging
+
+import httpx
+
+from app.clients.spotify import SpotifyClient
+from app.config import settings
+from app.constants.spotify import (
+    SPOTIFY_AUDIO_FEATURES,
+    SPOTIFY_AUDIO_FEATURES_BATCH_SIZE,
+)
+from app.repositories.track import TrackRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AudioFeaturesEnrichmentService:
+    """Fills in the audio-feature columns of tracks from the Spotify API"""
+    def __init__(
+        self,
+        spotify: SpotifyClient,
+        track_repo: TrackRepository,
+        max_in_flight: int = settings.enrich_max_in_flight,
+        batch_size: int = SPOTIFY_AUDIO_FEATURES_BATCH_SIZE
+    ):
+        self.spotify = spotify
+        self.track_repo = track_repo
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def run(self, max_tracks: Optional[int] = None) -> Dict[str, int]:
+        """
+        Enrich every track whose features were never requested (or the
+        first `max_tracks` of them). Ids are read a page at a time, fetched
+        in batches of `batch_size` with at most `max_in_flight` requests
+        running, and each page is written back with one bulk UPDATE.
+        Batches that fail are logged and left for the next run.
+        """
+        counts = {"requested": 0, "enriched": 0, "unavailable": 0, "failed": 0}
+        page_size = self.batch_size * self.max_in_flight
+        after: Optional[str] = None
+        while max_tracks is None or counts["requested"] < max_tracks:
+            limit = page_size
+            if max_tracks is not None:
+                limit = min(limit, max_tracks - counts["requested"])
+            track_ids = await self.track_repo.get_missing_audio_features(
+                limit, after
+            )
+            if not track_ids:
+                break
+            after = track_ids[-1]
+            counts["requested"] += len(track_ids)
+
+            batches = [
+                track_ids[i:i + self.batch_size]
+                for i in range(0, len(track_ids), self.batch_size)
+            ]
+            results = await asyncio.gather(
+                *(self._fetch(batch) for batch in batches),
+                return_exceptions=True
+            )
+
+            checked_at = datetime.now(timezone.utc)
+            rows: List[Dict[str, Any]] = []
+            for batch, result in zip(batches, results):
+                if isinstance(result, BaseException):
+                    if not isinstance(result, httpx.HTTPError):
+                        raise result
+                    logger.warning(
+                        "Audio features batch starting at %s failed: %s",
+                        batch[0], result
+                    )
+                    counts["failed"] += len(batch)
+                    continue
+                for track_id, features in zip(batch, result):
+                    row: Dict[str, Any] = {
+                        "id": track_id, "audio_features_checked_at": checked_at
+                    }
+                    if features:
+                        row.update({
+                            name: features.get(name)
+                            for name in SPOTIFY_AUDIO_FEATURES
+                        })
+                        counts["enriched"] += 1
+                    else:
+                        counts["unavailable"] += 1
+                    rows.append(row)
+            if rows:
+                await self.track_repo.bulk_update(rows)
+        return counts
+
+    async def _fetch(
+        self,
+        track_ids: Sequence[str]
+    ) -> List[Optional[Dict[str, Any]]]:
+        async with self._in_flight:
+            return await self.spotify.get_audio_features(track_ids)
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from redis import Redis
+from typing import Dict, Optional
+
+import pandas as pd
+
+from app.config import settings
+from app.core.analysis.genre_preferences import (
+    compute_genre_scores,
+    window_expiries,
+)
+from app.repositories.genre_preference import GenrePreferenceRepository
+from app.services.response_cache import VERSION_KEY_PREFIX, user_scope
+
+# user id -> "<data version>@<expiry day>": the version their stored
+# preferences were computed from and the day a play first leaves one of the
+# windowed periods ("<data version>" alone when none will).
+COMPUTED_VERSIONS_KEY = "genre_prefs:versions"
+
+PLAY_COLUMNS = ["user_id", "day", "genres", "ms_played"]
+
+
+class GenrePreferenceService:
+    """
+    Fills user_genre_preferences. Users are scored `batch_users` at a time
+    with one query and one vectorized computation per batch, and only when
+    their data version (bumped by every ingestion) moved since the last run
+    or a play has since aged out of the short or medium term window.
+    """
+    def __init__(
+        self,
+        repo: GenrePreferenceRepository,
+        redis: Redis,
+        batch_users: int = settings.genre_batch_users
+    ):
+        self.repo = repo
+        self.redis = redis
+        self.batch_users = batch_users
+
+    async def run(
+        self,
+        force: bool = False,
+        as_of: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        as_of = as_of or datetime.now(timezone.utc)
+        counts = {"users": 0, "unchanged": 0, "scores": 0}
+        user_ids = await self.repo.get_user_ids()
+        for i in range(0, len(user_ids), self.batch_users):
+            batch = user_ids[i:i + self.batch_users]
+            versions = self.redis.mget(
+                [f"{VERSION_KEY_PREFIX}{user_scope(u)}" for u in batch]
+            )
+            current = {u: version or "0" for u, version in zip(batch, versions)}
+            computed = self.redis.hmget(COMPUTED_VERSIONS_KEY, batch)
+            stale = [
+                u for u, done in zip(batch, computed)
+                if force or self._is_stale(done, current[u], as_of)
+            ]
+            counts["unchanged"] += len(batch) - len(stale)
+            if not stale:
+                continue
+
+            plays = pd.DataFrame(
+                await self.repo.get_artist_day_plays(stale), columns=PLAY_COLUMNS
+            )
+            scores = compute_genre_scores(plays, as_of)
+            scores["calculated_at"] = as_of
+            counts["scores"] += await self.repo.replace_for_users(
+                stale, scores.to_dict("records")
+            )
+            expiries = window_expiries(plays, as_of)
+            # Versions read before scoring: an ingestion finishing meanwhile
+            # leaves its users stale for the next run.
+            self.redis.hset(COMPUTED_VERSIONS_KEY, mapping={
+                u: f"{current[u]}@{expiries[u].isoformat()}"
+                if u in expiries else current[u]
+                for u in stale
+            })
+            counts["users"] += len(stale)
+        return counts
+
+    @staticmethod
+    def _is_stale(computed: Optional[str], version: str, as_of: datetime) -> bool:
+        if computed is None:
+            return True
+        done, _, expires = computed.partition("@")
+        if done != version:
+            return True
+        # ISO dates compare correctly as strings.
+        return bool(expires) and expires <= as_of.date().isoformat()
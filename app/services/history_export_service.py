@@ -0,0 +1,60 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncContextManager, AsyncIterator, Callable, Literal
+
+from app.config import settings
+from app.crud.listening_event_crud import EXPORT_FIELDS
+from app.repositories.listening_event import SQLAlchemyListeningEventRepository
+from app.utils.export_stream import gzip_chunks, iter_csv, iter_ndjson
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class HistoryExportService:
+    """
+    Streams a user's whole listening history. Each export opens its own
+    session: the body is produced after the request's dependencies (and
+    their session) have been closed.
+    """
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncContextManager[AsyncSession]]
+    ):
+        self.session_factory = session_factory
+
+    async def export(
+            self,
+            user_id: str,
+            fmt: ExportFormat = "ndjson",
+            compress: bool = False,
+            start: datetime | None = None,
+            end: datetime | None = None,
+    ) -> AsyncIterator[bytes]:
+        chunks = self._encode(user_id, fmt, start, end)
+        if compress:
+            chunks = gzip_chunks(chunks)
+        async for chunk in chunks:
+            yield chunk
+
+    async def _encode(
+            self,
+            user_id: str,
+            fmt: ExportFormat,
+            start: datetime | None,
+            end: datetime | None,
+    ) -> AsyncIterator[bytes]:
+        async with self.session_factory() as session:
+            rows = SQLAlchemyListeningEventRepository(session).stream_user_export(
+                user_id, start, end, settings.export_batch_size
+            )
+            if fmt == "csv":
+                chunks = iter_csv(rows, EXPORT_FIELDS)
+            else:
+                chunks = iter_ndjson(rows)
+            async for chunk in chunks:
+                yield chunk
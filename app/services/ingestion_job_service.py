@@ -0,0 +1,219 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict
+from uuid import uuid4
+import asyncio
+import json
+import logging
+import os
+import zipfile
+
+from app.config import settings
+from app.repositories.ingestion_job import IngestionJobRepository
+from app.schemas.ingestion_job import IngestionJobStatus
+from app.services.data_service import DataService
+from app.services.spotify_ingestion_service import (
+    list_history_members,
+    parse_archive_member,
+)
+from app.utils.json_stream import JSONStreamError, iter_json_array
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionJobService:
+    """Tracks background ingestion jobs and runs them on the worker"""
+    def __init__(self, job_repo: IngestionJobRepository):
+        self.job_repo = job_repo
+
+    def create_job(self, user_id: str, bytes_total: int) -> str:
+        job_id = str(uuid4())
+        self.job_repo.create(job_id, user_id, bytes_total)
+        return job_id
+
+    def get_status(self, job_id: str) -> IngestionJobStatus | None:
+        record = self.job_repo.get(job_id)
+        if record is None:
+            return None
+
+        job = IngestionJobStatus.model_validate(record)
+        if not job.started_at:
+            return job
+
+        now = datetime.now(timezone.utc)
+        elapsed = ((job.finished_at or now) - job.started_at).total_seconds()
+        if elapsed > 0:
+            job.records_per_second = (job.processed + job.skipped) / elapsed
+            if job.status == "running" and job.bytes_read:
+                bytes_per_second = job.bytes_read / elapsed
+                job.eta_seconds = (
+                    max(job.bytes_total - job.bytes_read, 0) / bytes_per_second
+                )
+        if job.status == "completed":
+            job.eta_seconds = 0.0
+        return job
+
+    async def run_job(
+            self,
+            job_id: str,
+            user_id: str,
+            path: str,
+            data_service: DataService,
+    ) -> Dict[str, Any] | None:
+        """Stream a spooled upload into the database, recording progress"""
+        self.job_repo.update(
+            job_id,
+            status="running",
+            started_at=datetime.now(timezone.utc)
+        )
+        bytes_read = 0
+
+        with open(path, "rb") as fh:
+            async def read(size: int) -> bytes:
+                nonlocal bytes_read
+                data = fh.read(size)
+                bytes_read += len(data)
+                return data
+
+            async def on_progress(processed: int, skipped: int) -> None:
+                self.job_repo.update(
+                    job_id,
+                    processed=processed,
+                    skipped=skipped,
+                    bytes_read=bytes_read
+                )
+
+            try:
+                result = await data_service.process_spotify_stream(
+                    iter_json_array(read),
+                    user_id,
+                    on_progress=on_progress
+                )
+            except JSONStreamError as e:
+                self._fail(job_id, f"Could not decode JSON: {e}")
+                return None
+            except Exception as e:
+                logger.exception("Ingestion job %s failed", job_id)
+                self._fail(job_id, str(e))
+                raise
+
+        self.job_repo.update(
+            job_id,
+            status="completed",
+            processed=result["processed"],
+            inserted=result["inserted"],
+            duplicates=result["duplicates"],
+            skipped=result["skipped"],
+            invalid_records=json.dumps(result["invalid_records"]),
+            bytes_read=bytes_read,
+            finished_at=datetime.now(timezone.utc)
+        )
+        return result
+
+    async def run_archive_job(
+            self,
+            job_id: str,
+            user_id: str,
+            path: str,
+            data_service: DataService,
+    ) -> Dict[str, Any] | None:
+        """
+        Import a Spotify export archive. Member files are decompressed and
+        parsed in a process pool; each parsed file is written to the
+        database as soon as it is ready, while the pool keeps parsing.
+        """
+        try:
+            members = list_history_members(path)
+        except zipfile.BadZipFile as e:
+            self._fail(job_id, f"Invalid ZIP archive: {e}")
+            return None
+        if not members:
+            self._fail(job_id, "No streaming history files found in archive")
+            return None
+
+        sizes = {info.filename: info.file_size for info in members}
+        self.job_repo.update(
+            job_id,
+            status="running",
+            started_at=datetime.now(timezone.utc),
+            bytes_total=sum(sizes.values()),
+            files_total=len(sizes)
+        )
+
+        processes = settings.ingest_parse_processes or os.cpu_count() or 1
+        loop = asyncio.get_running_loop()
+        queue = list(reversed(sizes))
+        pending: dict[asyncio.Future[Any], str] = {}
+        processed, inserted, skipped, bytes_read = 0, 0, 0, 0
+        failed_files: list[str] = []
+
+        try:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                def submit() -> None:
+                    # Keep the pool busy, but don't let finished results
+                    # pile up faster than the database can take them.
+                    while queue and len(pending) < 2 * processes:
+                        member = queue.pop()
+                        future = loop.run_in_executor(
+                            pool, parse_archive_member, path, member
+                        )
+                        pending[future] = member
+
+                submit()
+                while pending:
+                    done, _ = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        member = pending.pop(future)
+                        submit()
+                        bytes_read += sizes[member]
+                        try:
+                            plays, invalid = future.result()
+                        except (ValueError, zipfile.BadZipFile) as e:
+                            logger.warning("Skipping %s: %s", member, e)
+                            failed_files.append(member)
+                            continue
+                        skipped += invalid
+                        counts = await data_service.ingest_plays(
+                            plays, user_id
+                        )
+                        processed += counts["processed"]
+                        inserted += counts["inserted"]
+
+                    self.job_repo.update(
+                        job_id,
+                        processed=processed,
+                        inserted=inserted,
+                        duplicates=processed - inserted,
+                        skipped=skipped,
+                        bytes_read=bytes_read,
+                        files_done=len(sizes) - len(queue) - len(pending)
+                    )
+        except Exception as e:
+            logger.exception("Ingestion job %s failed", job_id)
+            self._fail(job_id, str(e))
+            raise
+
+        result = {
+            "processed": processed,
+            "inserted": inserted,
+            "duplicates": processed - inserted,
+            "skipped": skipped,
+            "failed_files": failed_files,
+        }
+        self.job_repo.update(
+            job_id,
+            status="completed",
+            failed_files=json.dumps(failed_files),
+            finished_at=datetime.now(timezone.utc)
+        )
+        return result
+
+    def _fail(self, job_id: str, error: str) -> None:
+        self.job_repo.update(
+            job_id,
+            status="failed",
+            error=error,
+            finished_at=datetime.now(timezone.utc)
+        )
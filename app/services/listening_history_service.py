@@ -0,0 +1,113 @@
+from datetime import datetime
+from pydantic import TypeAdapter
+from redis import Redis
+import logging
+
+from app.config import settings
+from app.repositories.listening_event import ListeningEventRepository
+from app.schemas.listening_event import ListeningHistoryPage
+from app.utils.cursor import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+COUNT_KEY_PREFIX = "history:count:"
+
+_PAGE = TypeAdapter(ListeningHistoryPage)
+
+
+def count_cache_key(user_id: str) -> str:
+    return f"{COUNT_KEY_PREFIX}{user_id}"
+
+
+def invalidate_history_counts(redis: Redis, user_id: str) -> None:
+    """Drop cached history totals after a user's events change"""
+    redis.delete(count_cache_key(user_id))
+
+
+class ListeningHistoryService:
+    """Pages through listening history with keyset cursors"""
+    def __init__(self, event_repo: ListeningEventRepository, redis: Redis):
+        self.event_repo = event_repo
+        self.redis = redis
+
+    async def get_page(
+            self,
+            user_id: str,
+            limit: int,
+            cursor: str | None = None,
+            offset: int = 0,
+            start: datetime | None = None,
+            end: datetime | None = None,
+    ) -> ListeningHistoryPage:
+        """
+        One newest-first page plus an opaque `next_cursor` (None on the last
+        page). Raises InvalidCursor for a malformed cursor. `offset` is kept for
+        old clients; it is ignored when a cursor is given.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        events = list(await self.event_repo.get_user_listening_history(
+            user_id,
+            limit + 1,
+            0 if after else offset,
+            start,
+            end,
+            after
+        ))
+        next_cursor = None
+        if len(events) > limit:
+            events = events[:limit]
+            last = events[-1]
+            next_cursor = encode_cursor(last.played_at, last.id)
+
+        # Validated straight from the ORM rows in one pass.
+        return _PAGE.validate_python(
+            {
+                "user_id": user_id,
+                "events": events,
+                "total": await self.count(user_id, start, end),
+                "limit": limit,
+                "offset": offset,
+                "next_cursor": next_cursor,
+            },
+            from_attributes=True
+        )
+
+    async def get_page_json(
+            self,
+            user_id: str,
+            limit: int,
+            cursor: str | None = None,
+            offset: int = 0,
+            start: datetime | None = None,
+            end: datetime | None = None,
+    ) -> bytes:
+        """`get_page` serialized to JSON bytes"""
+        return _PAGE.dump_json(
+            await self.get_page(user_id, limit, cursor, offset, start, end)
+        )
+
+    async def count(
+            self,
+            user_id: str,
+            start: datetime | None = None,
+            end: datetime | None = None,
+    ) -> int:
+        """
+        Total events in the range, cached per user and range for
+        `history_count_ttl_seconds` and dropped when ingestion adds events.
+        """
+        key = count_cache_key(user_id)
+        field = (
+            f"{start.isoformat() if start else ''}|"
+            f"{end.isoformat() if end else ''}"
+        )
+        cached = self.redis.hget(key, field)
+        if cached is not None:
+            return int(cached)
+
+        total = await self.event_repo.count_user_events(user_id, start, end)
+        pipe = self.redis.pipeline()
+        pipe.hset(key, field, total)
+        pipe.expire(key, settings.history_count_ttl_seconds)
+        pipe.execute()
+        return total
@@ -0,0 +1,246 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+from urllib.parse import quote
+import json
+import logging
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.config import settings
+from app.crud.listening_event_crud import EXPORTABLE_COLUMNS
+from app.repositories.listening_event import ListeningEventRepository
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "_export_state.json"
+DATASET_NAME = "listening_events"
+
+# Always written: `id` identifies the event, `played_at` is the partition
+# key.
+REQUIRED_FIELDS = ("id", "played_at")
+
+ARROW_TYPES: Dict[str, pa.DataType] = {
+    "id": pa.int64(),
+    "user_id": pa.string(),
+    "played_at": pa.timestamp("us", tz="UTC"),
+    "duration_ms": pa.int32(),
+    "progress_ms": pa.int32(),
+    "skipped": pa.bool_(),
+    "context_type": pa.string(),
+    "context_id": pa.string(),
+    "track_id": pa.string(),
+    "track_name": pa.string(),
+    "artist_id": pa.string(),
+    "artist_name": pa.string(),
+    "album_id": pa.string(),
+    "album_name": pa.string(),
+    "created_at": pa.timestamp("us", tz="UTC"),
+}
+
+
+def dataset_dir(export_dir: str, user_id: Optional[str] = None) -> Path:
+    """Global exports and each user's own export are separate datasets"""
+    root = Path(export_dir)
+    if user_id is None:
+        return root / DATASET_NAME
+    return root / "users" / quote(user_id, safe="") / DATASET_NAME
+
+
+def export_fields(columns: Optional[Sequence[str]] = None) -> list[str]:
+    """The projection to write; raises ValueError for unknown columns"""
+    if columns is None:
+        return list(EXPORTABLE_COLUMNS)
+    unknown = set(columns) - EXPORTABLE_COLUMNS.keys()
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(sorted(unknown))}")
+    return [
+        field for field in EXPORTABLE_COLUMNS
+        if field in REQUIRED_FIELDS or field in columns
+    ]
+
+
+class _MonthlyParts:
+    """
+    One new Parquet file per played_at month touched by an export, written
+    under hidden names and only made visible by `publish`.
+    """
+    def __init__(
+        self,
+        root: Path,
+        schema: pa.Schema,
+        compression: str,
+        row_group_size: int,
+        run_id: str
+    ):
+        self.root = root
+        self.schema = schema
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.run_id = run_id
+        self._buffers: Dict[str, list[pa.Table]] = {}
+        self._buffered: Dict[str, int] = {}
+        self._writers: Dict[str, pq.ParquetWriter] = {}
+
+    def _path(self, month: str, hidden: bool) -> Path:
+        name = f"part-{self.run_id}.parquet"
+        return self.root / f"month={month}" / (f".{name}" if hidden else name)
+
+    def remove_superseded(self, prefix: str) -> int:
+        """
+        Delete published parts named `prefix*` other than this run's: the
+        output of an earlier run over the same range whose state was never
+        saved, and whose rows this run has written again.
+        """
+        published = {self._path(month, False) for month in self._writers}
+        stale = [
+            path for path in self.root.glob(f"month=*/{prefix}*.parquet")
+            if path not in published
+        ]
+        for path in stale:
+            path.unlink()
+        return len(stale)
+
+    def add(self, table: pa.Table) -> None:
+        months = pc.strftime(table["played_at"], format="%Y-%m")
+        for month in pc.unique(months).to_pylist():
+            part = table.filter(pc.equal(months, month))
+            self._buffers.setdefault(month, []).append(part)
+            self._buffered[month] = self._buffered.get(month, 0) + part.num_rows
+            if self._buffered[month] >= self.row_group_size:
+                self._flush(month)
+
+    def _flush(self, month: str) -> None:
+        parts = self._buffers.pop(month, [])
+        self._buffered.pop(month, None)
+        if not parts:
+            return
+        writer = self._writers.get(month)
+        if writer is None:
+            path = self._path(month, hidden=True)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(
+                path, self.schema, compression=self.compression
+            )
+            self._writers[month] = writer
+        writer.write_table(pa.concat_tables(parts))
+
+    def publish(self) -> int:
+        """Close every file and rename it into place; returns the count"""
+        for month in list(self._buffers):
+            self._flush(month)
+        for month, writer in self._writers.items():
+            writer.close()
+            os.replace(self._path(month, True), self._path(month, False))
+        return len(self._writers)
+
+    def discard(self) -> None:
+        for month, writer in self._writers.items():
+            writer.close()
+            self._path(month, hidden=True).unlink(missing_ok=True)
+
+
+class ParquetExportService:
+    """
+    Incrementally exports listening events to a Parquet dataset partitioned
+    by played_at month (`month=YYYY-MM/part-*.parquet`). Each run appends
+    one file per month it touches, holding only the events committed since
+    the previous run.
+    """
+    def __init__(
+        self,
+        event_repo: ListeningEventRepository,
+        export_dir: str = settings.export_dir,
+        compression: str = settings.export_compression,
+        batch_size: int = settings.export_batch_size
+    ):
+        self.event_repo = event_repo
+        self.export_dir = export_dir
+        self.compression = compression
+        self.batch_size = batch_size
+
+    async def export(
+        self,
+        user_id: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Append events committed since the last export of the same dataset
+        (all users, or only `user_id`) projected to `columns`. A dataset
+        keeps the projection it was first written with; asking for another
+        one raises ValueError.
+
+        The watermark is the inserting transaction's id. Each run takes the
+        transactions from the previous run's watermark up to the oldest one
+        still running; all of those have finished, so no event of an open
+        transaction is passed over, however long it stays open.
+        """
+        root = dataset_dir(self.export_dir, user_id)
+        state = self._load_state(root)
+        fields = export_fields(columns)
+        if state and state["columns"] != fields:
+            raise ValueError(
+                f"{root} is exported with columns {state['columns']}; "
+                "use another export_dir for a different projection"
+            )
+        if state and "last_xid" not in state:
+            raise ValueError(
+                f"{root} was written with id watermarks; "
+                "use another export_dir to export by transaction"
+            )
+        last_xid = state["last_xid"] if state else 0
+
+        now = datetime.now(timezone.utc)
+        up_to_xid = await self.event_repo.get_finished_xid()
+        schema = pa.schema([(field, ARROW_TYPES[field]) for field in fields])
+        # Named by transaction range. A rerun after a crash starts at the
+        # same watermark, so its parts replace the crashed run's.
+        prefix = f"part-{last_xid}-"
+        parts = _MonthlyParts(
+            root, schema, self.compression, self.batch_size,
+            run_id=f"{last_xid}-{up_to_xid}"
+        )
+        rows = 0
+        try:
+            async for batch in self.event_repo.stream_event_batches(
+                fields, last_xid, up_to_xid, user_id, self.batch_size
+            ):
+                parts.add(pa.Table.from_pydict(
+                    dict(zip(fields, map(list, zip(*batch)))), schema=schema
+                ))
+                rows += len(batch)
+            if not rows:
+                # Nothing new: the next run rescans this range.
+                return {"rows": 0, "files": 0, "last_xid": last_xid}
+            files = parts.publish()
+        except BaseException:
+            parts.discard()
+            raise
+
+        replaced = parts.remove_superseded(prefix)
+        if replaced:
+            logger.warning("Replaced %s parts of an interrupted export", replaced)
+        self._save_state(root, {
+            "columns": fields,
+            "last_xid": up_to_xid,
+            "exported_at": now.isoformat(),
+        })
+        logger.info("Exported %s events to %s (%s files)", rows, root, files)
+        return {"rows": rows, "files": files, "last_xid": up_to_xid}
+
+    @staticmethod
+    def _load_state(root: Path) -> Optional[Dict[str, Any]]:
+        path = root / STATE_FILE
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    @staticmethod
+    def _save_state(root: Path, state: Dict[str, Any]) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = root / f".{STATE_FILE}"
+        tmp.write_text(json.dumps(state, indent=2))
+        os.replace(tmp, root / STATE_FILE)
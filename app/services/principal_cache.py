@@ -0,0 +1,86 @@
+from redis import Redis, RedisError
+from sqlalchemy import Connection, event
+from sqlalchemy.orm import Mapper, Session
+from typing import Any
+import logging
+import time
+
+from app.config import settings
+from app.db.database import redis_client
+from app.models.user import User
+from app.schemas.user import User as Principal
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_KEY_PREFIX = "auth:principal:"
+_CHANGED_USERS = "changed_user_ids"
+
+
+def principal_key(user_id: str) -> str:
+    return f"{PRINCIPAL_KEY_PREFIX}{user_id}"
+
+
+def invalidate_principals(redis: Redis, *user_ids: str) -> None:
+    try:
+        redis.delete(*(principal_key(user_id) for user_id in user_ids))
+    except RedisError as e:
+        logger.warning("Could not invalidate cached principals: %s", e)
+
+
+class PrincipalCache:
+    """
+    Snapshots of authenticated users in Redis, so that authenticating a
+    request does not need the database. A snapshot never outlives the
+    token it was cached for, nor `auth_principal_ttl_seconds`.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        ttl_seconds: int = settings.auth_principal_ttl_seconds
+    ):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, user_id: str) -> Principal | None:
+        try:
+            cached = self.redis.get(principal_key(user_id))
+        except RedisError as e:
+            logger.warning("Principal cache unavailable: %s", e)
+            return None
+        return Principal.model_validate_json(cached) if cached else None
+
+    def put(self, principal: Principal, expires_at: float) -> None:
+        ttl = int(min(self.ttl_seconds, expires_at - time.time()))
+        if ttl <= 0:
+            return
+        try:
+            self.redis.set(
+                principal_key(principal.id), principal.model_dump_json(), ex=ttl
+            )
+        except RedisError as e:
+            logger.warning("Could not cache principal %s: %s", principal.id, e)
+
+
+# Drop snapshots of users changed through the ORM once the change commits.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _remember_changed_user(
+    mapper: Mapper[Any],
+    connection: Connection,
+    target: User
+) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    user_ids = session.info.pop(_CHANGED_USERS, None)
+    if user_ids:
+        invalidate_principals(redis_client, *user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1,127 @@
+from fastapi.encoders import jsonable_encoder
+from redis import Redis, RedisError
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+import hashlib
+import json
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY_PREFIX = "cache:version:"
+ENTRY_KEY_PREFIX = "cache:entry:"
+METRICS_KEY = "cache:metrics"
+
+# Scope of data shared by all users (artists, albums, tracks).
+CATALOG_SCOPE = "catalog"
+
+
+def user_scope(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def bump_data_version(redis: Redis, *scopes: str) -> None:
+    """
+    Invalidate every cached response of the given scopes. Entries are keyed
+    by the scope's version, so old ones are simply never read again and
+    expire on their own.
+    """
+    pipe = redis.pipeline(transaction=False)
+    for scope in scopes:
+        pipe.incr(f"{VERSION_KEY_PREFIX}{scope}")
+    pipe.execute()
+
+
+class ResponseCache:
+    """
+    JSON response cache in Redis, shared by every API process. Entries are
+    keyed by namespace, scope, the scope's data version and the request
+    parameters.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        ttl_seconds: int = settings.response_cache_ttl_seconds
+    ):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+
+    def entry_key(
+        self,
+        namespace: str,
+        scope: str,
+        version: int,
+        params: Mapping[str, Any]
+    ) -> str:
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{ENTRY_KEY_PREFIX}{namespace}:{scope}:v{version}:{digest}"
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        scope: str,
+        params: Mapping[str, Any],
+        load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        The cached JSON-compatible value, or the result of `load()` stored
+        for later requests. None results are not cached; errors from
+        `load` propagate. When Redis is unavailable the value is loaded.
+        """
+        async def load_json() -> Optional[bytes]:
+            value = jsonable_encoder(await load())
+            return None if value is None else json.dumps(value).encode()
+
+        raw = await self.get_or_load_json(namespace, scope, params, load_json)
+        return None if raw is None else json.loads(raw)
+
+    async def get_or_load_json(
+        self,
+        namespace: str,
+        scope: str,
+        params: Mapping[str, Any],
+        load: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[bytes]:
+        """
+        Like `get_or_load`, for loaders that already produce JSON bytes; the
+        cached body is returned as is, without decoding it.
+        """
+        try:
+            version = int(self.redis.get(f"{VERSION_KEY_PREFIX}{scope}") or 0)
+            key = self.entry_key(namespace, scope, version, params)
+            cached = self.redis.get(key)
+        except RedisError as e:
+            logger.warning("Response cache unavailable: %s", e)
+            return await load()
+
+        hit = cached is not None
+        self._record(namespace, hit)
+        if hit:
+            return cached.encode() if isinstance(cached, str) else cached
+
+        value = await load()
+        if value is not None:
+            try:
+                self.redis.set(key, value, ex=self.ttl_seconds)
+            except RedisError as e:
+                logger.warning("Could not cache %s: %s", key, e)
+        return value
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counts per namespace, across all processes"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for field, value in self.redis.hgetall(METRICS_KEY).items():
+            namespace, _, outcome = field.rpartition(":")
+            counts.setdefault(namespace, {"hits": 0, "misses": 0})[outcome] = int(value)
+        return counts
+
+    def _record(self, namespace: str, hit: bool) -> None:
+        try:
+            self.redis.hincrby(
+                METRICS_KEY, f"{namespace}:{'hits' if hit else 'misses'}", 1
+            )
+        except RedisError as e:
+            logger.warning("Could not record cache metrics: %s", e)
@@ -1,9 +1,43 @@
 from datetime import datetime
-from uuid import uuid4
-from typing import Any, Dict
+from fnmatch import fnmatch
+from uuid import uuid5
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+import json
+import posixpath
+import zipfile
 
+import numpy as np
+import pandas as pd
+
+from app.constants.spotify import (
+    SPOTIFY_HISTORY_FILE_PATTERNS,
+    SPOTIFY_TRACK_URI_PATTERN,
+    TRACK_ID_NAMESPACE,
+)
 from app.schemas.track import TrackCreate
 
+
+class ParsedPlay(NamedTuple):
+    """A validated history record, before any database ids are known"""
+    track_name: str
+    artist_name: str
+    album_name: str
+    played_at: datetime
+    ms_played: int
+    spotify_track_id: Optional[str] = None
+
+
+# Raw export field -> ParsedPlay field
+RECORD_COLUMNS = {
+    "master_metadata_track_name": "track_name",
+    "master_metadata_album_artist_name": "artist_name",
+    "master_metadata_album_album_name": "album_name",
+    "ts": "played_at",
+    "ms_played": "ms_played",
+    "spotify_track_uri": "spotify_track_id",
+}
+
+
 class SpotifyIngestionService:
     """Handles parsing and validating raw Spotify JSON data"""
     def is_valid_record(self, record: Dict[str, Any]) -> bool:
@@ -14,22 +48,149 @@ class SpotifyIngestionService:
             record.get("master_metadata_album_artist_name") and
             record.get("master_metadata_album_album_name")
         )
-    
-    def parse_record(
-            self, 
-            record: Dict[str, Any],
+
+    def parse_play(self, record: Dict[str, Any]) -> ParsedPlay:
+        uri = record.get("spotify_track_uri")
+        match = SPOTIFY_TRACK_URI_PATTERN.match(uri) if isinstance(uri, str) else None
+        return ParsedPlay(
+            track_name=record["master_metadata_track_name"],
+            artist_name=record["master_metadata_album_artist_name"],
+            album_name=record["master_metadata_album_album_name"],
+            played_at=datetime.fromisoformat(record["ts"].replace("Z", "+00:00")),
+            ms_played=int(record["ms_played"]),
+            spotify_track_id=match.group(1) if match else None,
+        )
+
+    def parse_batch(self, records: Sequence[Any]) -> pd.DataFrame:
+        """
+        Validate and parse a chunk of raw records column-wise.
+
+        Returns one row per input record (same positions) with the
+        ParsedPlay columns plus a boolean `valid` mask; values in invalid
+        rows are undefined. Timestamps are parsed in a single vectorized
+        pass into UTC `datetime64` values.
+        """
+        raw = pd.DataFrame(
+            [record if isinstance(record, dict) else {} for record in records],
+            columns=list(RECORD_COLUMNS),
+        )
+        frame = raw.rename(columns=RECORD_COLUMNS)
+
+        is_text = {
+            column: frame[column].map(type) == str
+            for column in (
+                "track_name", "artist_name", "album_name", "played_at",
+                "spotify_track_id",
+            )
+        }
+        frame["spotify_track_id"] = (
+            frame["spotify_track_id"]
+            .where(is_text["spotify_track_id"])
+            .astype(object)
+            .str.extract(SPOTIFY_TRACK_URI_PATTERN.pattern, expand=False)
+        )
+        frame["played_at"] = pd.to_datetime(
+            frame["played_at"].where(is_text["played_at"]),
+            utc=True,
+            format="ISO8601",
+            errors="coerce",
+        )
+        ms_played = pd.to_numeric(frame["ms_played"], errors="coerce")
+
+        valid = frame["played_at"].notna() & (ms_played > 0)
+        for column in ("track_name", "artist_name", "album_name"):
+            valid &= is_text[column] & (frame[column] != "")
+
+        frame["ms_played"] = ms_played.where(valid, 0).astype(np.int64)
+        frame["valid"] = valid.to_numpy(dtype=bool)
+        return frame
+
+    @staticmethod
+    def plays_from_frame(frame: pd.DataFrame) -> List[ParsedPlay]:
+        """Materialize the valid rows of a `parse_batch` frame"""
+        rows = frame[frame["valid"]]
+        return list(map(ParsedPlay._make, zip(
+            rows["track_name"].tolist(),
+            rows["artist_name"].tolist(),
+            rows["album_name"].tolist(),
+            pd.DatetimeIndex(rows["played_at"]).to_pydatetime().tolist(),
+            rows["ms_played"].tolist(),
+            rows["spotify_track_id"].astype(object)
+            .where(rows["spotify_track_id"].notna(), None).tolist(),
+        )))
+
+    def parse_plays(
+            self,
+            records: Iterable[Any]
+    ) -> tuple[List[ParsedPlay], List[int]]:
+        """Validate and parse many records; also returns invalid positions"""
+        frame = self.parse_batch(list(records))
+        invalid = np.flatnonzero(~frame["valid"].to_numpy()).tolist()
+        return self.plays_from_frame(frame), invalid
+
+    @staticmethod
+    def track_id(play: ParsedPlay) -> str:
+        """
+        The Spotify track id when the record has a track URI; otherwise a
+        deterministic id derived from the names, so the same unidentified
+        track gets the same id for every user and upload.
+        """
+        if play.spotify_track_id:
+            return play.spotify_track_id
+        return str(uuid5(
+            TRACK_ID_NAMESPACE,
+            "\x1f".join((play.artist_name, play.album_name, play.track_name))
+        ))
+
+    def build_track(
+            self,
+            play: ParsedPlay,
             artist_id: str,
             album_id: str
-    ) -> tuple[TrackCreate, datetime, int]:
-        played_at = datetime.fromisoformat(record["ts"].replace("Z", "+00:00"))
-        ms_played = int(record["ms_played"])
-        track_name = record["master_metadata_track_name"]
-
-        track_data = TrackCreate(
-            id=str(uuid4()),
-            name=track_name,
-            duration_ms=ms_played,
+    ) -> TrackCreate:
+        return TrackCreate(
+            id=self.track_id(play),
+            name=play.track_name,
+            duration_ms=play.ms_played,
             artist_id=artist_id,
             album_id=album_id,
         )
-        return track_data, played_at, ms_played
+
+    def parse_record(
+            self,
+            record: Dict[str, Any],
+            artist_id: str,
+            album_id: str
+    ) -> tuple[TrackCreate, datetime, int]:
+        play = self.parse_play(record)
+        track_data = self.build_track(play, artist_id, album_id)
+        return track_data, play.played_at, play.ms_played
+
+
+def list_history_members(archive_path: str) -> List[zipfile.ZipInfo]:
+    """Streaming history files inside a Spotify data export archive"""
+    with zipfile.ZipFile(archive_path) as archive:
+        return [
+            info for info in archive.infolist()
+            if not info.is_dir() and any(
+                fnmatch(posixpath.basename(info.filename), pattern)
+                for pattern in SPOTIFY_HISTORY_FILE_PATTERNS
+            )
+        ]
+
+
+def parse_archive_member(
+        archive_path: str,
+        member: str
+) -> tuple[List[ParsedPlay], int]:
+    """
+    Decompress, decode and parse one archive member. Runs in a worker
+    process, so it opens the archive itself and returns plain tuples.
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        with archive.open(member) as fh:
+            records = json.load(fh)
+    if not isinstance(records, list):
+        raise ValueError(f"{member} does not contain a JSON array")
+    plays, invalid = SpotifyIngestionService().parse_plays(records)
+    return plays, len(invalid)
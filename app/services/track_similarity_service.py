@@ -0,0 +1,63 @@
+from array import array
+from pathlib import Path
+from typing import Dict
+import logging
+
+import numpy as np
+
+from app.config import settings
+from app.core.recommendations.item_similarity import IndexFile, SimilarTracksIndex
+from app.repositories.listening_event import ListeningEventRepository
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_TRACKS_PATH = Path(settings.model_path) / "similar_tracks.npz"
+
+# The API's in-memory copy, picked up again whenever a build replaces the file.
+similar_tracks_file = IndexFile(
+    SIMILAR_TRACKS_PATH, settings.similar_tracks_reload_seconds
+)
+
+
+class TrackSimilarityService:
+    """Rebuilds the co-listening "similar tracks" index from play counts"""
+    def __init__(
+        self,
+        event_repo: ListeningEventRepository,
+        path: Path = SIMILAR_TRACKS_PATH,
+        k: int = settings.similar_tracks_k,
+        min_listeners: int = settings.similar_tracks_min_listeners,
+        block_size: int = settings.similar_tracks_block_size
+    ):
+        self.event_repo = event_repo
+        self.path = path
+        self.k = k
+        self.min_listeners = min_listeners
+        self.block_size = block_size
+
+    async def rebuild(self) -> Dict[str, int]:
+        """
+        Read every user's per-track play counts (the user_track_stats
+        rollup) as compact integer codes, compute top-k neighbours block by
+        block and replace the saved index.
+        """
+        users: Dict[str, int] = {}
+        tracks: Dict[str, int] = {}
+        user_codes, track_codes, plays = array("q"), array("q"), array("d")
+        async for rows in self.event_repo.stream_track_plays():
+            for user_id, track_id, play_count in rows:
+                user_codes.append(users.setdefault(user_id, len(users)))
+                track_codes.append(tracks.setdefault(track_id, len(tracks)))
+                plays.append(play_count)
+
+        index = SimilarTracksIndex.build(
+            np.frombuffer(user_codes, dtype=np.int64),
+            np.frombuffer(track_codes, dtype=np.int64),
+            np.frombuffer(plays, dtype=np.float64),
+            np.array(list(tracks), dtype=str),
+            self.k,
+            self.min_listeners,
+            self.block_size,
+        )
+        index.save(self.path)
+        return {"users": len(users), "tracks": len(index), "pairs": len(plays)}
@@ -0,0 +1,30 @@
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.db.database import redis_client
+from app.repositories.genre_preference import SQLAlchemyGenrePreferenceRepository
+from app.services.genre_preference_service import GenrePreferenceService
+from app.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+async def _compute_genre_preferences(force: bool) -> dict[str, int]:
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            service = GenrePreferenceService(
+                SQLAlchemyGenrePreferenceRepository(session), redis_client
+            )
+            return await service.run(force)
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(name="analysis.compute_genre_preferences")
+def compute_genre_preferences(force: bool = False) -> None:
+    counts = asyncio.run(_compute_genre_preferences(force))
+    logger.info("Genre preference run finished: %s", counts)
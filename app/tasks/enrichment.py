@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.clients.http import create_http_client
+from app.clients.spotify import SpotifyClient
+from app.config import settings
+from app.db.database import redis_client
+from app.repositories.track import SQLAlchemyTrackRepository
+from app.services.enrichment_service import AudioFeaturesEnrichmentService
+from app.services.response_cache import CATALOG_SCOPE, bump_data_version
+from app.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+async def _enrich_audio_features(max_tracks: int | None) -> dict[str, int]:
+    # Own engine and HTTP client: each task runs in a fresh event loop.
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    try:
+        async with create_http_client() as http:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                service = AudioFeaturesEnrichmentService(
+                    SpotifyClient(settings, http=http, redis=redis_client),
+                    SQLAlchemyTrackRepository(session),
+                )
+                return await service.run(max_tracks)
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(name="enrichment.enrich_audio_features")
+def enrich_audio_features(max_tracks: int | None = None) -> None:
+    counts = asyncio.run(_enrich_audio_features(max_tracks))
+    if counts["enriched"]:
+        # Cached track data is stale and the API's audio-feature indexes
+        # pick up the new tracks.
+        bump_data_version(redis_client, CATALOG_SCOPE)
+    logger.info("Audio features enrichment finished: %s", counts)
@@ -0,0 +1,29 @@
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.repositories.listening_event import SQLAlchemyListeningEventRepository
+from app.services.parquet_export_service import ParquetExportService
+from app.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+async def _export_listening_events(user_id: str | None) -> dict:
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            service = ParquetExportService(
+                SQLAlchemyListeningEventRepository(session)
+            )
+            return await service.export(user_id)
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(name="export.export_listening_events")
+def export_listening_events(user_id: str | None = None) -> None:
+    result = asyncio.run(_export_listening_events(user_id))
+    logger.info("Parquet export finished: %s", result)
@@ -0,0 +1,78 @@
+import asyncio
+import os
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.db.database import redis_client
+from app.repositories.album import SQLAlchemyAlbumRepository
+from app.repositories.artist import SQLAlchemyArtistRepository
+from app.repositories.ingestion_job import RedisIngestionJobRepository
+from app.repositories.listening_event import SQLAlchemyListeningEventRepository
+from app.repositories.track import SQLAlchemyTrackRepository
+from app.repositories.user import SQLAlchemyUserRepository
+from app.services.data_service import DataService
+from app.services.ingestion_job_service import IngestionJobService
+from app.services.listening_history_service import invalidate_history_counts
+from app.services.response_cache import (
+    CATALOG_SCOPE,
+    bump_data_version,
+    user_scope,
+)
+from app.services.spotify_ingestion_service import SpotifyIngestionService
+from app.worker import celery_app
+
+
+def build_data_service(session: AsyncSession) -> DataService:
+    return DataService(
+        user_repo=SQLAlchemyUserRepository(session),
+        artist_repo=SQLAlchemyArtistRepository(session),
+        album_repo=SQLAlchemyAlbumRepository(session),
+        track_repo=SQLAlchemyTrackRepository(session),
+        event_repo=SQLAlchemyListeningEventRepository(session),
+        ingestion=SpotifyIngestionService(),
+    )
+
+
+async def _run_ingestion(
+    job_id: str,
+    user_id: str,
+    path: str,
+    archive: bool = False
+) -> None:
+    # Each task gets its own event loop, so connections must not be pooled
+    # across tasks.
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    jobs = IngestionJobService(RedisIngestionJobRepository(redis_client))
+    run = jobs.run_archive_job if archive else jobs.run_job
+    try:
+        async with session_factory() as session:
+            await run(job_id, user_id, path, build_data_service(session))
+    finally:
+        # Even a failed job may have written some events.
+        invalidate_history_counts(redis_client, user_id)
+        bump_data_version(redis_client, user_scope(user_id), CATALOG_SCOPE)
+        await engine.dispose()
+
+
+@celery_app.task(name="ingestion.ingest_spotify_upload")
+def ingest_spotify_upload(job_id: str, user_id: str, path: str) -> None:
+    try:
+        asyncio.run(_run_ingestion(job_id, user_id, path))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@celery_app.task(name="ingestion.ingest_spotify_archive")
+def ingest_spotify_archive(job_id: str, user_id: str, path: str) -> None:
+    try:
+        asyncio.run(_run_ingestion(job_id, user_id, path, archive=True))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,30 @@
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.db.partitions import ensure_upcoming_partitions
+from app.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+async def _ensure_partitions() -> list[str]:
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            created = await ensure_upcoming_partitions(
+                session, settings.partition_months_ahead
+            )
+            await session.commit()
+            return created
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(name="maintenance.ensure_listening_event_partitions")
+def ensure_listening_event_partitions() -> None:
+    created = asyncio.run(_ensure_partitions())
+    if created:
+        logger.info("Created listening_events partitions: %s", created)
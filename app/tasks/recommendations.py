@@ -0,0 +1,29 @@
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.repositories.listening_event import SQLAlchemyListeningEventRepository
+from app.services.track_similarity_service import TrackSimilarityService
+from app.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+async def _rebuild_similar_tracks() -> dict[str, int]:
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            service = TrackSimilarityService(
+                SQLAlchemyListeningEventRepository(session)
+            )
+            return await service.rebuild()
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(name="recommendations.rebuild_similar_tracks")
+def rebuild_similar_tracks() -> None:
+    counts = asyncio.run(_rebuild_similar_tracks())
+    logger.info("Similar tracks index rebuilt: %s", counts)
@@ -0,0 +1,24 @@
+"""Opaque keyset-pagination cursors."""
+import base64
+import binascii
+from datetime import datetime
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was not produced by `encode_cursor`."""
+
+
+def encode_cursor(played_at: datetime, event_id: int) -> str:
+    """Encode the sort key of the last row of a page."""
+    raw = f"{played_at.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of `encode_cursor`; raises InvalidCursor for malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        played_at, event_id = raw.decode().split("|")
+        return datetime.fromisoformat(played_at), int(event_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor("Invalid cursor") from e
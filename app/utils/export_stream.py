@@ -0,0 +1,69 @@
+"""Incremental NDJSON/CSV encoding of async row streams."""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator, Mapping, Sequence
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def iter_ndjson(
+    rows: AsyncIterable[Mapping[str, Any]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """One JSON object per line, yielded in chunks of about `chunk_size`."""
+    buf: list[str] = []
+    size = 0
+    async for row in rows:
+        line = json.dumps(
+            {key: _plain(value) for key, value in row.items()},
+            ensure_ascii=False,
+        ) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(buf).encode("utf-8")
+            buf.clear()
+            size = 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+async def iter_csv(
+    rows: AsyncIterable[Mapping[str, Any]],
+    fields: Sequence[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """A header line then one line per row, yielded in chunks."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    async for row in rows:
+        writer.writerow([_plain(row[field]) for field in fields])
+        if out.tell() >= chunk_size:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode("utf-8")
+
+
+async def gzip_chunks(
+    chunks: AsyncIterable[bytes],
+    level: int = 6,
+) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member as it is produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,101 @@
+"""Incremental parsing of top-level JSON arrays from async byte streams."""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+DEFAULT_READ_SIZE = 64 * 1024
+DEFAULT_MAX_RECORD_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class JSONStreamError(ValueError):
+    """Raised when a streamed JSON array cannot be decoded."""
+
+    def __init__(self, message: str, index: int) -> None:
+        super().__init__(f"{message} (record {index})")
+        self.index = index
+
+
+async def iter_json_array(
+    read: Callable[[int], Awaitable[bytes]],
+    read_size: int = DEFAULT_READ_SIZE,
+    max_record_size: int = DEFAULT_MAX_RECORD_SIZE,
+) -> AsyncIterator[Any]:
+    """
+    Yield the elements of a JSON array while it is being read.
+
+    Only the current read window and one partially received element are held
+    in memory, so memory use does not grow with the size of the input.
+    `read` is an async callable such as `UploadFile.read`.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buf = ""
+    pos = 0
+    eof = False
+    index = 0
+
+    async def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        data = await read(read_size)
+        try:
+            text = decoder.decode(data, final=not data)
+        except UnicodeDecodeError as e:
+            raise JSONStreamError("Invalid UTF-8 in JSON stream", index) from e
+        eof = not data
+        buf = buf[pos:] + text
+        pos = 0
+        return True
+
+    async def skip_whitespace() -> bool:
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()  # type: ignore[union-attr]
+            if pos < len(buf):
+                return True
+            if not await fill():
+                return False
+
+    if not await skip_whitespace() or buf[pos] != "[":
+        raise JSONStreamError("Expected a JSON array", index)
+    pos += 1
+
+    if not await skip_whitespace():
+        raise JSONStreamError("Unterminated JSON array", index)
+    if buf[pos] == "]":
+        pos += 1
+    else:
+        while True:
+            while True:
+                try:
+                    value, end = _decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as e:
+                    if len(buf) - pos > max_record_size or not await fill():
+                        raise JSONStreamError(e.msg, index) from e
+                    continue
+                # A scalar ending exactly at the buffer edge may be truncated.
+                if end == len(buf) and not eof:
+                    await fill()
+                    continue
+                break
+            pos = end
+            yield value
+            index += 1
+
+            if not await skip_whitespace():
+                raise JSONStreamError("Unterminated JSON array", index)
+            if buf[pos] == "]":
+                pos += 1
+                break
+            if buf[pos] != ",":
+                raise JSONStreamError("Expected ',' or ']'", index)
+            pos += 1
+            if not await skip_whitespace():
+                raise JSONStreamError("Unterminated JSON array", index)
+
+    if await skip_whitespace():
+        raise JSONStreamError("Extra data after JSON array", index)
@@ -0,0 +1,29 @@
+"""Helpers for handing uploaded files over to background workers."""
+import os
+import shutil
+from typing import BinaryIO
+from uuid import uuid4
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def spool_upload(src: BinaryIO, directory: str, suffix: str = "") -> tuple[str, int]:
+    """
+    Copy an upload into `directory` (which must be shared with the workers)
+    and return the new path and its size in bytes. Blocking; run it in a
+    thread pool from async code.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid4().hex}{suffix}")
+    src.seek(0)
+    with open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+    return path, os.path.getsize(path)
+
+
+def looks_like_json_array(src: BinaryIO, sniff_size: int = 64) -> bool:
+    """Cheap pre-check that a file starts with a JSON array."""
+    src.seek(0)
+    head = src.read(sniff_size)
+    src.seek(0)
+    return head.removeprefix(b"\xef\xbb\xbf").lstrip().startswith(b"[")
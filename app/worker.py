@@ -0,0 +1,52 @@
+from celery import Celery
+from celery.schedules import crontab
+
+from app.config import settings
+
+celery_app = Celery(
+    "music_analysis",
+    broker=settings.redis_url,
+    backend=settings.redis_url,
+    include=[
+        "app.tasks.analysis",
+        "app.tasks.enrichment",
+        "app.tasks.export",
+        "app.tasks.ingestion",
+        "app.tasks.maintenance",
+        "app.tasks.recommendations",
+    ],
+)
+celery_app.conf.update(
+    worker_concurrency=settings.worker_concurrency,
+    # Jobs are long and uneven in size; don't let one process hoard them.
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    # Archive imports start their own process pool, which prefork pool
+    # children (daemonic processes) may not do; they get a dedicated queue
+    # served by a thread-pool worker.
+    task_routes={
+        "ingestion.ingest_spotify_archive": {"queue": "ingest_archives"},
+    },
+    beat_schedule={
+        "ensure-listening-event-partitions": {
+            "task": "maintenance.ensure_listening_event_partitions",
+            "schedule": crontab(minute=0, hour=3),
+        },
+        "enrich-track-audio-features": {
+            "task": "enrichment.enrich_audio_features",
+            "schedule": crontab(minute=30),
+        },
+        "compute-genre-preferences": {
+            "task": "analysis.compute_genre_preferences",
+            "schedule": crontab(minute=0, hour=5),
+        },
+        "rebuild-similar-tracks": {
+            "task": "recommendations.rebuild_similar_tracks",
+            "schedule": crontab(minute=30, hour=5),
+        },
+        "export-listening-events": {
+            "task": "export.export_listening_events",
+            "schedule": crontab(minute=0, hour=4),
+        },
+    },
+)
@@ -0,0 +1,115 @@
+"""Bulk backfill of Spotify listening history for many users via COPY"""
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import time
+import zipfile
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import (
+    AsyncSession, async_sessionmaker, create_async_engine
+)
+
+import app.models.social_account  # noqa: F401  (registers the mapper)
+from app.config import settings
+from app.db.database import redis_client
+from app.services.listening_history_service import invalidate_history_counts
+from app.services.response_cache import (
+    CATALOG_SCOPE,
+    bump_data_version,
+    user_scope,
+)
+from app.services.spotify_ingestion_service import (
+    ParsedPlay,
+    SpotifyIngestionService,
+    list_history_members,
+    parse_archive_member,
+)
+from app.tasks.ingestion import build_data_service
+
+
+def load_plays(path: str) -> tuple[list[ParsedPlay], int]:
+    """Parse a history JSON file or a whole export archive"""
+    if zipfile.is_zipfile(path):
+        plays: list[ParsedPlay] = []
+        invalid = 0
+        for member in list_history_members(path):
+            member_plays, member_invalid = parse_archive_member(
+                path, member.filename
+            )
+            plays.extend(member_plays)
+            invalid += member_invalid
+        return plays, invalid
+
+    with open(path, "rb") as fh:
+        records = json.load(fh)
+    plays, invalid_positions = SpotifyIngestionService().parse_plays(records)
+    return plays, len(invalid_positions)
+
+
+async def backfill_user(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: str,
+    path: str
+) -> None:
+    started = time.perf_counter()
+    plays, invalid = await asyncio.to_thread(load_plays, path)
+    async with session_factory() as session:
+        try:
+            counts = await build_data_service(session).ingest_plays(
+                plays, user_id
+            )
+        finally:
+            invalidate_history_counts(redis_client, user_id)
+            bump_data_version(redis_client, user_scope(user_id), CATALOG_SCOPE)
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ {user_id}: {counts['inserted']} new events, "
+        f"{counts['duplicates']} duplicates, {invalid} skipped "
+        f"in {elapsed:.1f}s"
+    )
+
+
+async def run_backfill(jobs: list[tuple[str, str]], concurrency: int) -> None:
+    settings.ingest_use_copy = True
+    engine = create_async_engine(
+        settings.database_url, pool_size=concurrency, max_overflow=0
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(user_id: str, path: str) -> None:
+        async with semaphore:
+            try:
+                await backfill_user(session_factory, user_id, path)
+            except Exception as e:
+                print(f"❌ {user_id}: {e}")
+
+    try:
+        await asyncio.gather(*(run_one(u, p) for u, p in jobs))
+    finally:
+        await engine.dispose()
+
+
+def parse_job(value: str) -> tuple[str, str]:
+    user_id, sep, path = value.partition("=")
+    if not sep or not user_id or not path:
+        raise argparse.ArgumentTypeError("expected USER_ID=PATH")
+    return user_id, path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "jobs", nargs="+", type=parse_job, metavar="USER_ID=PATH",
+        help="History JSON file or export .zip to load for a user"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4,
+        help="Users loaded in parallel (one connection each)"
+    )
+    args = parser.parse_args()
+    asyncio.run(run_backfill(args.jobs, args.concurrency))
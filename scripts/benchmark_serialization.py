@@ -0,0 +1,137 @@
+"""
+Compare the old per-row response serialization (a model per row, then
+FastAPI's generic encoder) with the batch TypeAdapter path the list
+endpoints use, on in-memory ORM rows. No database needed.
+"""
+import sys
+from pathlib import Path
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+import app.models.social_account  # noqa: F401  (registers the mapper)
+from app.models import ListeningEvent as ListeningEventModel
+from app.models import Track as TrackModel
+from app.schemas.listening_event import ListeningEvent, ListeningHistoryPage
+from app.schemas.track import Track
+
+
+def make_events(n: int) -> list[ListeningEventModel]:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        ListeningEventModel(
+            id=i,
+            user_id="user-1",
+            track_id=f"{i % 500:022d}",
+            played_at=now - timedelta(minutes=3 * i),
+            duration_ms=180_000,
+            progress_ms=0,
+            skipped=i % 7 == 0,
+            context_type="playlist",
+            context_id="37i9dQZF1DXcBWIGoYBM5M",
+            created_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def make_tracks(n: int) -> list[TrackModel]:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        TrackModel(
+            id=f"{i:022d}",
+            name=f"Track {i}",
+            artist_id="artist-1",
+            album_id=f"album-{i % 20}",
+            duration_ms=200_000 + i,
+            popularity=i % 100,
+            explicit=False,
+            acousticness=0.1,
+            danceability=0.5,
+            energy=0.7,
+            instrumentalness=0.0,
+            liveness=0.2,
+            loudness=-6.5,
+            speechiness=0.04,
+            tempo=120.0,
+            valence=0.6,
+            created_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def history_per_row(events: list) -> bytes:
+    page = {
+        "user_id": "user-1",
+        "events": [ListeningEvent.model_validate(ev) for ev in events],
+        "total": len(events), "limit": len(events), "offset": 0,
+        "next_cursor": None,
+    }
+    return json.dumps(jsonable_encoder(page)).encode()
+
+
+_PAGE = TypeAdapter(ListeningHistoryPage)
+
+
+def history_batch(events: list) -> bytes:
+    return _PAGE.dump_json(_PAGE.validate_python({
+        "user_id": "user-1", "events": events,
+        "total": len(events), "limit": len(events), "offset": 0,
+        "next_cursor": None,
+    }, from_attributes=True))
+
+
+def tracks_per_row(tracks: list) -> bytes:
+    models = [Track.model_validate(track) for track in tracks]
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+_TRACKS = TypeAdapter(list[Track])
+
+
+def tracks_batch(tracks: list) -> bytes:
+    return _TRACKS.dump_json(
+        _TRACKS.validate_python(tracks, from_attributes=True)
+    )
+
+
+def measure(
+    name: str,
+    func: Callable[[list[Any]], Any],
+    rows: list[Any],
+    repeat: int
+) -> float:
+    func(rows)  # warm up
+    best = min(timeit.repeat(lambda: func(rows), number=1, repeat=repeat))
+    print(f"  {name:<10} {best * 1000:8.2f} ms")
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    routes = {
+        "listening-history": (
+            make_events(args.rows), history_per_row, history_batch
+        ),
+        "artist-tracks": (make_tracks(args.rows), tracks_per_row, tracks_batch),
+    }
+    for route, (rows, per_row, batch) in routes.items():
+        if json.loads(per_row(rows)) != json.loads(batch(rows)):
+            print(f"❌ {route}: outputs differ")
+            continue
+        print(f"{route}: {args.rows} rows, best of {args.repeat}")
+        old = measure("per-row", per_row, rows, args.repeat)
+        new = measure("batch", batch, rows, args.repeat)
+        print(f"✅ {old / new:.1f}x faster")
@@ -0,0 +1,125 @@
+"""
+Measure throughput and latency of the Spotify client layer against the
+mock server (scripts/mock_spotify_server.py) or any compatible endpoint.
+"""
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import time
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from app.clients.http import create_http_client
+from app.clients.spotify import SpotifyClient
+from app.config import settings
+
+ENDPOINTS = {
+    "audio-features": lambda n: (
+        "/audio-features", {"ids": ",".join(f"{n + i:022d}" for i in range(100))}
+    ),
+    "tracks": lambda n: (
+        "/tracks", {"ids": ",".join(f"{n + i:022d}" for i in range(50))}
+    ),
+    "track": lambda n: (f"/tracks/{n:022d}", None),
+    "categories": lambda n: ("/browse/categories", {"limit": 20}),
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings.spotify_api_base_url = f"{args.base_url}/v1"
+    settings.spotify_token_url = f"{args.base_url}/api/token"
+    settings.spotify_client_id = settings.spotify_client_id or "benchmark"
+    settings.spotify_client_secret = settings.spotify_client_secret or "benchmark"
+    settings.http_http2 = args.http2
+    settings.http_max_connections = args.max_connections
+    settings.http_max_keepalive_connections = args.max_keepalive
+    settings.spotify_max_retries = args.max_retries
+
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    make_request = ENDPOINTS[args.endpoint]
+
+    async with create_http_client() as http:
+        client = SpotifyClient(settings, http=http)
+
+        async def one(n: int) -> None:
+            endpoint, params = make_request(n)
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await client.get(endpoint, params)
+                except httpx.HTTPStatusError as e:
+                    key = str(e.response.status_code)
+                    errors[key] = errors.get(key, 0) + 1
+                    return
+                except httpx.HTTPError as e:
+                    key = type(e).__name__
+                    errors[key] = errors.get(key, 0) + 1
+                    return
+                latencies.append(time.perf_counter() - started)
+
+        # Warm up the token and the connection pool.
+        await asyncio.gather(*(one(n) for n in range(args.concurrency)))
+        latencies.clear()
+        errors.clear()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"{args.endpoint}: {args.requests} requests, concurrency "
+        f"{args.concurrency}, max connections {args.max_connections}, "
+        f"http2={'on' if args.http2 else 'off'}"
+    )
+    print(f"  throughput  {len(latencies) / elapsed:10.1f} req/s")
+    if latencies:
+        ms = [latency * 1000 for latency in latencies]
+        print(f"  mean        {statistics.fmean(ms):10.2f} ms")
+        for pct in (50, 90, 99, 99.9):
+            print(f"  p{pct:<10} {percentile(ms, pct):10.2f} ms")
+        print(f"  max         {max(ms):10.2f} ms")
+    if errors:
+        print(f"❌ errors: {errors}")
+    else:
+        print("✅ no errors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8900")
+    parser.add_argument(
+        "--endpoint", choices=sorted(ENDPOINTS), default="audio-features"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.enrich_max_in_flight,
+        help="Requests in flight"
+    )
+    parser.add_argument(
+        "--max-connections", type=int, default=settings.http_max_connections
+    )
+    parser.add_argument(
+        "--max-keepalive", type=int,
+        default=settings.http_max_keepalive_connections
+    )
+    parser.add_argument(
+        "--max-retries", type=int, default=settings.spotify_max_retries,
+        help="Retries of 429 responses"
+    )
+    parser.add_argument(
+        "--http2", action=argparse.BooleanOptionalAction,
+        default=settings.http_http2
+    )
+    asyncio.run(run(parser.parse_args()))
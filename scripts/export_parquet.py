@@ -0,0 +1,65 @@
+"""
+Append listening events added since the last run to the Parquet dataset
+under EXPORT_DIR (all users, or one user's own dataset). Read it back with
+pandas.read_parquet(path) or pyarrow.dataset.dataset(path, partitioning="hive").
+"""
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models.social_account  # noqa: F401  (registers the mapper)
+from app.config import settings
+from app.crud.listening_event_crud import EXPORTABLE_COLUMNS
+from app.repositories.listening_event import SQLAlchemyListeningEventRepository
+from app.services.parquet_export_service import (
+    ParquetExportService,
+    dataset_dir,
+)
+
+
+async def export(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.database_url)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            service = ParquetExportService(
+                SQLAlchemyListeningEventRepository(session),
+                export_dir=args.export_dir,
+                compression=args.compression,
+            )
+            try:
+                result = await service.export(args.user, args.columns)
+            except ValueError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+    finally:
+        await engine.dispose()
+    print(
+        f"✅ {result['rows']} events in {result['files']} files -> "
+        f"{dataset_dir(args.export_dir, args.user)} (up to transaction {result['last_xid']})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--user", help="Export only this user's events")
+    parser.add_argument(
+        "--columns", nargs="+", choices=list(EXPORTABLE_COLUMNS),
+        metavar="COLUMN",
+        help=(
+            f"Columns to write: {', '.join(EXPORTABLE_COLUMNS)} (default: "
+            "all); id and played_at are always kept"
+        )
+    )
+    parser.add_argument("--export-dir", default=settings.export_dir)
+    parser.add_argument(
+        "--compression", default=settings.export_compression,
+        choices=["zstd", "snappy", "gzip", "none"]
+    )
+    asyncio.run(export(parser.parse_args()))
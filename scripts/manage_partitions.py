@@ -0,0 +1,84 @@
+"""Create, list and detach monthly listening_events partitions"""
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+from datetime import date, datetime
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.db import partitions
+
+
+def parse_month(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected YYYY-MM")
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.database_url)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            if args.command == "list":
+                for partition in await partitions.list_partitions(session):
+                    print(f"{partition.month:%Y-%m}  {partition.name}")
+                return
+
+            if args.command == "create":
+                if args.start:
+                    names = await partitions.ensure_partitions(
+                        session, args.start, args.end or args.start
+                    )
+                else:
+                    names = await partitions.ensure_upcoming_partitions(
+                        session, args.months_ahead
+                    )
+                verb = "Created"
+            else:
+                names = await partitions.detach_partitions(
+                    session,
+                    args.before,
+                    archive_schema=args.archive_schema,
+                    drop=args.drop
+                )
+                verb = "Dropped" if args.drop else "Archived"
+
+            await session.commit()
+            for name in names:
+                print(f"✅ {verb} {name}")
+            if not names:
+                print("Nothing to do.")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List attached monthly partitions")
+
+    create = commands.add_parser(
+        "create", help="Create partitions ahead of time or for a past range"
+    )
+    create.add_argument(
+        "--months-ahead", type=int, default=settings.partition_months_ahead
+    )
+    create.add_argument("--from", dest="start", type=parse_month)
+    create.add_argument("--to", dest="end", type=parse_month)
+
+    detach = commands.add_parser(
+        "detach", help="Detach partitions older than a month"
+    )
+    detach.add_argument("--before", type=parse_month, required=True)
+    detach.add_argument("--archive-schema", default="archive")
+    detach.add_argument(
+        "--drop", action="store_true", help="Drop instead of archiving"
+    )
+
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,208 @@
+"""
+Local stand-in for the Spotify accounts and Web API endpoints used by the
+app, with injectable latency, rate limiting and server errors.
+
+Point the app at it with:
+    SPOTIFY_API_BASE_URL=http://127.0.0.1:8900/v1
+    SPOTIFY_TOKEN_URL=http://127.0.0.1:8900/api/token
+"""
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import hashlib
+import random
+import secrets
+from typing import Awaitable, Callable
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Form, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.constants.spotify import SPOTIFY_AUDIO_FEATURES
+
+
+class Faults:
+    """Failure and latency knobs, adjustable at runtime via POST /_faults"""
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        retry_after: int = 1,
+        error_ratio: float = 0.0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.error_ratio = error_ratio
+
+
+def _seed(value: str) -> random.Random:
+    return random.Random(hashlib.sha1(value.encode()).digest())
+
+
+def fake_track(track_id: str) -> dict:
+    rng = _seed(track_id)
+    return {
+        "id": track_id,
+        "name": f"Track {track_id[:6]}",
+        "duration_ms": rng.randint(90_000, 420_000),
+        "popularity": rng.randint(0, 100),
+        "explicit": rng.random() < 0.1,
+        "artists": [{"id": f"artist{rng.randint(1, 500)}", "name": "Mock Artist"}],
+        "album": {"id": f"album{rng.randint(1, 2000)}", "name": "Mock Album"},
+    }
+
+
+def fake_audio_features(track_id: str) -> dict:
+    rng = _seed(f"features:{track_id}")
+    features = {name: round(rng.random(), 3) for name in SPOTIFY_AUDIO_FEATURES}
+    features["loudness"] = round(-60 * rng.random(), 2)
+    features["tempo"] = round(60 + 140 * rng.random(), 2)
+    return {"id": track_id, **features}
+
+
+def split_ids(ids: str, limit: int) -> list[str]:
+    track_ids = [track_id for track_id in ids.split(",") if track_id]
+    if not track_ids or len(track_ids) > limit:
+        raise HTTPException(status_code=400, detail=f"1 to {limit} ids required")
+    return track_ids
+
+
+def create_app(faults: Faults) -> FastAPI:
+    app = FastAPI(title="Mock Spotify API")
+    tokens: set[str] = set()
+
+    @app.middleware("http")
+    async def inject_faults(
+        request: Request,
+        call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        if request.url.path.startswith("/_faults"):
+            return await call_next(request)
+        delay = faults.latency_ms + random.uniform(0, faults.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        roll = random.random()
+        if roll < faults.rate_limit_ratio:
+            return JSONResponse(
+                {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(faults.retry_after)},
+            )
+        if roll < faults.rate_limit_ratio + faults.error_ratio:
+            return JSONResponse(
+                {"error": {"status": 503, "message": "Service unavailable"}},
+                status_code=503,
+            )
+        if request.url.path.startswith("/v1/"):
+            auth = request.headers.get("Authorization", "")
+            if auth.removeprefix("Bearer ") not in tokens:
+                return JSONResponse(
+                    {"error": {"status": 401, "message": "Invalid access token"}},
+                    status_code=401,
+                )
+        return await call_next(request)
+
+    @app.post("/api/token")
+    async def token(grant_type: str = Form(...)) -> dict:
+        access_token = secrets.token_urlsafe(24)
+        tokens.add(access_token)
+        body = {
+            "access_token": access_token,
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        }
+        if grant_type == "authorization_code":
+            body["refresh_token"] = secrets.token_urlsafe(24)
+        return body
+
+    @app.get("/v1/me")
+    async def me() -> dict:
+        return {
+            "id": "mock-user",
+            "display_name": "Mock User",
+            "email": "mock-user@example.com",
+        }
+
+    @app.get("/v1/me/top/tracks")
+    async def top_tracks(limit: int = Query(20, ge=1, le=50)) -> dict:
+        return {
+            "items": [fake_track(f"{n:022d}") for n in range(limit)],
+            "limit": limit,
+        }
+
+    @app.get("/v1/browse/categories")
+    async def categories(limit: int = Query(20, ge=1, le=50)) -> dict:
+        return {"categories": {"items": [
+            {"id": f"category{n}", "name": f"Category {n}"}
+            for n in range(limit)
+        ]}}
+
+    @app.get("/v1/tracks")
+    async def tracks(ids: str) -> dict:
+        return {"tracks": [fake_track(i) for i in split_ids(ids, 50)]}
+
+    @app.get("/v1/tracks/{track_id}")
+    async def track(track_id: str) -> dict:
+        return fake_track(track_id)
+
+    @app.get("/v1/audio-features")
+    async def audio_features(ids: str) -> dict:
+        return {"audio_features": [
+            fake_audio_features(i) for i in split_ids(ids, 100)
+        ]}
+
+    @app.get("/_faults")
+    async def get_faults() -> dict:
+        return vars(faults)
+
+    @app.post("/_faults")
+    async def set_faults(changes: dict) -> dict:
+        for name, value in changes.items():
+            if not hasattr(faults, name):
+                raise HTTPException(status_code=400, detail=f"Unknown knob {name}")
+            setattr(faults, name, type(getattr(faults, name))(value))
+        return vars(faults)
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit-ratio", type=float, default=0.0,
+        help="Share of requests answered with 429"
+    )
+    parser.add_argument(
+        "--retry-after", type=int, default=1,
+        help="Retry-After seconds sent with 429s"
+    )
+    parser.add_argument(
+        "--error-ratio", type=float, default=0.0,
+        help="Share of requests answered with 503"
+    )
+    args = parser.parse_args()
+
+    faults = Faults(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_ratio=args.rate_limit_ratio,
+        retry_after=args.retry_after,
+        error_ratio=args.error_ratio,
+    )
+    print(f"✅ Mock Spotify API on http://{args.host}:{args.port}")
+    uvicorn.run(
+        create_app(faults), host=args.host, port=args.port, log_level="warning"
+    )
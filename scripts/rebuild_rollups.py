@@ -0,0 +1,41 @@
+"""Recompute listening rollups from listening_events"""
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models.social_account  # noqa: F401  (registers the mapper)
+from app.config import settings
+from app.crud.user_daily_stats_crud import UserDailyStatsCRUD
+from app.crud.user_entity_stats_crud import UserEntityStatsCRUD
+from app.models.user import User
+
+
+async def rebuild(user_ids: list[str]) -> None:
+    engine = create_async_engine(settings.database_url)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            if not user_ids:
+                result = await session.execute(select(User.id))
+                user_ids = list(result.scalars().all())
+            for user_id in user_ids:
+                days = await UserDailyStatsCRUD.rebuild_user(session, user_id)
+                tracks = await UserEntityStatsCRUD.rebuild_user(session, user_id)
+                await session.commit()
+                print(f"✅ {user_id}: {days} days, {tracks} tracks")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "user_ids", nargs="*", help="Users to rebuild (default: all users)"
+    )
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.user_ids))
@@ -1,26 +1,51 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 import json
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from app.api.deps import (
+    get_history_export_service,
+    get_listening_history_service,
+    get_response_cache,
+)
 from app.constants.routes import API_PREFIX
+from app.crud.listening_event_crud import EXPORT_FIELDS
+from app.main import app
 from app.models.user import User
 from app.schemas.track import Track
+from app.services.history_export_service import HistoryExportService
 
 VALID_CONTENT_TYPE = "application/json"
 INVALID_CONTENT_TYPE = "text/csv"
 UPLOAD_ENDPOINT = f"{API_PREFIX}/data/upload/spotify"
 LISTENING_HISTORY_ENDPOINT = f"{API_PREFIX}/data/users/{{user_id}}/listening-history"
+EXPORT_ENDPOINT = f"{LISTENING_HISTORY_ENDPOINT}/export"
 USER_STATS_ENDPOINT = f"{API_PREFIX}/data/users/{{user_id}}/stats"
+USER_TOP_ENDPOINT = f"{API_PREFIX}/data/users/{{user_id}}/top/{{entity}}"
 TRACK_ENDPOINT = f"{API_PREFIX}/data/tracks/{{track_id}}"
+JOB_ENDPOINT = f"{API_PREFIX}/data/jobs/{{job_id}}"
 ARTIST_TRACKS_ENDPOINT = f"{API_PREFIX}/data/artists/{{artist_id}}/tracks"
 
 pytestmark = pytest.mark.asyncio
 
 
-async def test_upload_valid_json(client: AsyncClient, test_user: User) -> None:
+@patch("app.api.routes.data.ingest_spotify_upload")
+@patch("app.repositories.ingestion_job.RedisIngestionJobRepository.create")
+async def test_upload_valid_json(
+    mock_create_job: MagicMock,
+    mock_task: MagicMock,
+    client: AsyncClient,
+    test_user: User,
+    tmp_path,
+    monkeypatch
+) -> None:
+    monkeypatch.setattr(
+        "app.api.routes.data.settings.ingest_spool_dir", str(tmp_path)
+    )
     payload = [{
         "ts": "2023-01-01T12:00:00Z",
         "master_metadata_track_name": "Track A",
@@ -38,9 +63,14 @@ async def test_upload_valid_json(client: AsyncClient, test_user: User) -> None:
     assert response.status_code == status.HTTP_202_ACCEPTED
     data = response.json()
     assert "message" in data
-    assert "details" in data
-    assert isinstance(data["details"].get("processed"), int)
-    assert isinstance(data["details"].get("skipped"), int)
+    job_id = data["job_id"]
+    assert data["status_url"].endswith(f"/data/jobs/{job_id}")
+    mock_create_job.assert_called_once()
+
+    _, user_id, path = mock_task.delay.call_args.args
+    assert user_id == str(test_user.id)
+    with open(path) as spooled:
+        assert json.load(spooled) == payload
 
 
 async def test_upload_invalid_json(client: AsyncClient, test_user: User) -> None:
@@ -67,6 +97,38 @@ async def test_upload_wrong_content_type(client: AsyncClient, test_user: User) -
     assert response.json()["detail"] == "Invalid file type. JSON required."
 
 
+@patch("app.repositories.ingestion_job.RedisIngestionJobRepository.get")
+async def test_get_job_status(mock_get: MagicMock, client: AsyncClient) -> None:
+    mock_get.return_value = {
+        "id": "job-1",
+        "user_id": "user-1",
+        "status": "running",
+        "processed": "900",
+        "skipped": "100",
+        "bytes_total": "4000",
+        "bytes_read": "1000",
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "started_at": "2024-01-01T00:00:00+00:00",
+    }
+
+    response = await client.get(JOB_ENDPOINT.format(job_id="job-1"))
+
+    assert response.status_code == status.HTTP_200_OK
+    job = response.json()
+    assert job["processed"] == 900
+    assert job["records_per_second"] > 0
+    assert job["eta_seconds"] > 0
+
+
+@patch(
+    "app.repositories.ingestion_job.RedisIngestionJobRepository.get",
+    return_value=None
+)
+async def test_get_job_status_not_found(mock_get: MagicMock, client: AsyncClient) -> None:
+    response = await client.get(JOB_ENDPOINT.format(job_id="missing"))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 async def test_get_listening_history_empty(client: AsyncClient, test_user: User) -> None:
     url = LISTENING_HISTORY_ENDPOINT.format(user_id=test_user.id)
     response = await client.get(url)
@@ -77,6 +139,78 @@ async def test_get_listening_history_empty(client: AsyncClient, test_user: User)
     assert data["total"] == 0
     assert data["limit"] == 100
     assert data["offset"] == 0
+    assert data["next_cursor"] is None
+
+
+async def test_export_listening_history_csv_header_only(
+    client: AsyncClient, test_user: User, db_session: AsyncSession
+) -> None:
+    @asynccontextmanager
+    async def test_sessions():
+        yield db_session
+
+    app.dependency_overrides[get_history_export_service] = (
+        lambda: HistoryExportService(test_sessions)
+    )
+    url = EXPORT_ENDPOINT.format(user_id=test_user.id)
+    response = await client.get(url, params={"format": "csv"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    assert response.text.splitlines() == [",".join(EXPORT_FIELDS)]
+
+
+async def test_export_listening_history_escapes_the_filename(
+    client: AsyncClient
+) -> None:
+    async def no_rows(*args):
+        yield b""
+
+    service = MagicMock()
+    service.export = no_rows
+    app.dependency_overrides[get_history_export_service] = lambda: service
+    url = EXPORT_ENDPOINT.format(user_id='Саша"1')
+    response = await client.get(url, params={"gzip": True})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-disposition"] == (
+        'attachment; filename="listening-history-%D0%A1%D0%B0%D1%88%D0%B0%221.ndjson.gz"; '
+        "filename*=UTF-8''listening-history-%D0%A1%D0%B0%D1%88%D0%B0%221.ndjson.gz"
+    )
+
+
+async def test_export_listening_history_rejects_unknown_format(
+    client: AsyncClient, test_user: User
+) -> None:
+    url = EXPORT_ENDPOINT.format(user_id=test_user.id)
+    response = await client.get(url, params={"format": "xlsx"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_get_listening_history_rejects_bad_cursor(
+    client: AsyncClient, test_user: User
+) -> None:
+    url = LISTENING_HISTORY_ENDPOINT.format(user_id=test_user.id)
+    response = await client.get(url, params={"cursor": "garbage"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_get_listening_history_does_not_hide_server_errors_as_bad_cursor(
+    client: AsyncClient, test_user: User
+) -> None:
+    service = AsyncMock()
+    service.get_page_json.side_effect = ValueError("bad row")
+    cache = MagicMock()
+    cache.get_or_load_json = AsyncMock(
+        side_effect=lambda namespace, scope, params, load: load()
+    )
+    app.dependency_overrides[get_listening_history_service] = lambda: service
+    app.dependency_overrides[get_response_cache] = lambda: cache
+
+    url = LISTENING_HISTORY_ENDPOINT.format(user_id=test_user.id)
+    with pytest.raises(ValueError, match="bad row"):
+        await client.get(url)
 
 
 async def test_get_user_stats_empty(client: AsyncClient, test_user: User) -> None:
@@ -87,6 +221,20 @@ async def test_get_user_stats_empty(client: AsyncClient, test_user: User) -> Non
     assert isinstance(stats, dict)
 
 
+async def test_get_user_top_empty(client: AsyncClient, test_user: User) -> None:
+    for entity in ("tracks", "artists", "albums"):
+        url = USER_TOP_ENDPOINT.format(user_id=test_user.id, entity=entity)
+        response = await client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+
+async def test_get_user_top_unknown_entity(client: AsyncClient, test_user: User) -> None:
+    url = USER_TOP_ENDPOINT.format(user_id=test_user.id, entity="genres")
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @patch("app.api.routes.data.TrackCRUD.get_track_by_id", new_callable=AsyncMock)
 async def test_get_track_found(mock_get, client: AsyncClient) -> None:
     mock_get.return_value = Track.model_construct(
@@ -1,8 +1,13 @@
+import numpy as np
 import pytest
 from httpx import AsyncClient
 from uuid import uuid4
 
+from app.api.deps import get_audio_feature_index, get_similar_tracks_index
 from app.constants.routes import API_PREFIX
+from app.core.recommendations.audio_features import FEATURES, AudioFeatureIndex
+from app.core.recommendations.item_similarity import SimilarTracksIndex
+from app.main import app
 from app.models.album import Album
 from app.models.artist import Artist
 from app.models.track import Track
@@ -71,3 +76,50 @@ async def test_get_track_not_found(client: AsyncClient) -> None:
     response = await client.get(f"{TRACKS_ENDPOINT}/non-existent-track-id")
     assert response.status_code == 404
     assert response.json()["detail"] == "Track not found"
+
+
+@pytest.mark.asyncio
+async def test_similar_tracks_served_from_the_index(client: AsyncClient) -> None:
+    index = SimilarTracksIndex(
+        np.array(["x", "y", "z"]),
+        np.array([[1, 2], [0, -1], [0, -1]]),
+        np.array([[0.75, 0.5], [0.75, 0.0], [0.5, 0.0]], dtype=np.float32),
+    )
+    app.dependency_overrides[get_similar_tracks_index] = lambda: index
+
+    response = await client.get(f"{TRACKS_ENDPOINT}/x/similar", params={"limit": 5})
+    missing = await client.get(f"{TRACKS_ENDPOINT}/unknown/similar")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"track_id": "y", "score": 0.75}, {"track_id": "z", "score": 0.5}
+    ]
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_sounds_like_and_range_search(client: AsyncClient) -> None:
+    features = np.full((3, len(FEATURES)), 0.5, dtype=np.float32)
+    features[:, FEATURES.index("loudness")] = -8.0
+    features[:, FEATURES.index("tempo")] = [120.0, 124.0, 170.0]
+    index = AudioFeatureIndex()
+    index.add(["x", "y", "z"], features)
+    app.dependency_overrides[get_audio_feature_index] = lambda: index
+
+    response = await client.get(f"{TRACKS_ENDPOINT}/x/sounds-like", params={"limit": 1})
+    search = await client.get(
+        f"{TRACKS_ENDPOINT}/audio-features/search",
+        params={"where": ["tempo:120:130", "energy:0.4:"]}
+    )
+    invalid = await client.get(
+        f"{TRACKS_ENDPOINT}/x/sounds-like", params={"where": "pitch:1:2"}
+    )
+    missing = await client.get(f"{TRACKS_ENDPOINT}/unknown/sounds-like")
+
+    assert response.status_code == 200
+    assert [match["track_id"] for match in response.json()] == ["y"]
+    assert search.json() == [
+        {"track_id": "x", "distance": None}, {"track_id": "y", "distance": None}
+    ]
+    assert invalid.status_code == 422
+    assert missing.status_code == 404
@@ -1,66 +1,103 @@
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
-from jose import JWTError
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 from app.api.deps import get_current_user
+from app.core.security import create_access_token
 from app.models.user import User
+from app.schemas.user import User as Principal
+from app.services.principal_cache import PrincipalCache, principal_key
+
+
+def make_repo(user: User | None) -> AsyncMock:
+    repo = AsyncMock()
+    repo.get_by_id.return_value = user
+    return repo
+
+
+def make_principals(cached: Principal | None = None) -> PrincipalCache:
+    redis = MagicMock()
+    redis.get.return_value = cached.model_dump_json() if cached else None
+    return PrincipalCache(redis, ttl_seconds=300)
+
+
+def db_user(user_id: str) -> User:
+    return User(
+        id=user_id,
+        username="test",
+        email="test@example.com",
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
 
 
 @pytest.mark.asyncio
-@patch("app.api.deps.jwt.decode")
-async def test_get_current_user_success(mock_decode) -> None:
-    user_id = "user-123"
-    mock_decode.return_value = {"sub": user_id}
+async def test_get_current_user_loads_and_caches_principal() -> None:
+    token = create_access_token({"sub": "user-123"})
+    repo = make_repo(db_user("user-123"))
+    principals = make_principals()
+
+    principal = await get_current_user(token=token, repo=repo, principals=principals)
 
-    mock_user = User(id=user_id, username="test", email="test@example.com")
-    mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = mock_user
+    assert principal.id == "user-123"
+    repo.get_by_id.assert_awaited_once_with("user-123")
+    key, value = principals.redis.set.call_args.args
+    assert key == principal_key("user-123")
+    assert Principal.model_validate_json(value) == principal
+    # Never cached past the token's expiry (30 minutes) or the TTL.
+    assert 0 < principals.redis.set.call_args.kwargs["ex"] <= 300
 
-    db: AsyncSession = AsyncMock()
-    db.execute.return_value = mock_result
 
-    user = await get_current_user(token="dummy.token", db=db)
-    assert user == mock_user
+@pytest.mark.asyncio
+async def test_get_current_user_cache_hit_skips_database() -> None:
+    cached = Principal.model_validate(db_user("user-123"))
+    token = create_access_token({"sub": "user-123"})
+    repo = make_repo(None)
 
+    principal = await get_current_user(
+        token=token, repo=repo, principals=make_principals(cached)
+    )
 
-@patch("app.api.deps.jwt.decode")
-async def test_get_current_user_invalid_token(mock_decode) -> None:
-    mock_decode.side_effect = JWTError("bad token")
-    db: AsyncSession = AsyncMock()
+    assert principal == cached
+    repo.get_by_id.assert_not_awaited()
 
-    with pytest.raises(HTTPException) as exc:
-        await get_current_user(token="bad.token", db=db)
 
-    assert exc.value.status_code == 401
-    assert "Could not validate credentials" in str(exc.value.detail)
+@pytest.mark.asyncio
+async def test_get_current_user_short_lived_token_bounds_ttl() -> None:
+    token = create_access_token({"sub": "user-123"}, timedelta(seconds=30))
+    principals = make_principals()
+
+    await get_current_user(
+        token=token, repo=make_repo(db_user("user-123")), principals=principals
+    )
+
+    assert principals.redis.set.call_args.kwargs["ex"] <= 30
 
 
 @pytest.mark.asyncio
-@patch("app.api.deps.jwt.decode")
-async def test_get_current_user_missing_sub(mock_decode) -> None:
-    mock_decode.return_value = {}  
-    db: AsyncSession = AsyncMock()
+@pytest.mark.parametrize("token", [
+    "bad.token",
+    create_access_token({"sub": "user-123"}, timedelta(seconds=-1)),
+    create_access_token({"name": "no subject"}),
+])
+async def test_get_current_user_invalid_token(token: str) -> None:
+    repo = make_repo(db_user("user-123"))
 
     with pytest.raises(HTTPException) as exc:
-        await get_current_user(token="missing-sub.token", db=db)
+        await get_current_user(token=token, repo=repo, principals=make_principals())
 
     assert exc.value.status_code == 401
+    repo.get_by_id.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-@patch("app.api.deps.jwt.decode")
-async def test_get_current_user_user_not_found(mock_decode) -> None:
-    mock_decode.return_value = {"sub": "not-in-db"}
-
-    db: AsyncSession = AsyncMock()
-    mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = None
-    db.execute.return_value = mock_result
+async def test_get_current_user_user_not_found() -> None:
+    token = create_access_token({"sub": "not-in-db"})
+    principals = make_principals()
 
     with pytest.raises(HTTPException) as exc:
-        await get_current_user(token="valid.token", db=db)
+        await get_current_user(token=token, repo=make_repo(None), principals=principals)
 
     assert exc.value.status_code == 404
     assert exc.value.detail == "User not found"
+    principals.redis.set.assert_not_called()
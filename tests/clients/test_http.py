@@ -0,0 +1,41 @@
+import pytest
+import httpx
+import respx
+
+from app.clients import http
+from app.clients.spotify import SpotifyClient
+from app.config import settings
+from app.constants.spotify import SPOTIFY_API_BASE_URL, SPOTIFY_TOKEN_URL
+from app.domain.music.providers.spotify_oauth import SpotifyOAuthService
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_reused_until_closed() -> None:
+    client = await http.start_http_client()
+    try:
+        assert http.get_http_client() is client
+        assert SpotifyOAuthService().http is client
+        assert SpotifyClient(settings)._http is client
+    finally:
+        await http.close_http_client()
+
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_spotify_client_calls_go_through_the_given_client() -> None:
+    respx.post(SPOTIFY_TOKEN_URL).mock(
+        return_value=httpx.Response(200, json={"access_token": "token"})
+    )
+    route = respx.get(f"{SPOTIFY_API_BASE_URL}/browse/categories").mock(
+        return_value=httpx.Response(200, json={"categories": {"items": []}})
+    )
+
+    async with httpx.AsyncClient() as client:
+        spotify = SpotifyClient(settings, http=client)
+        await spotify.get("/browse/categories")
+        await spotify.get("/browse/categories")
+
+    assert route.call_count == 2
+    assert route.calls.last.request.headers["Authorization"] == "Bearer token"
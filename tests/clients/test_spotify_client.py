@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+import respx
+
+from app.clients.spotify import TOKEN_CACHE_KEY, SpotifyClient
+from app.config import settings
+from app.constants.spotify import SPOTIFY_API_BASE_URL, SPOTIFY_TOKEN_URL
+
+CATEGORIES_URL = f"{SPOTIFY_API_BASE_URL}/browse/categories"
+
+
+def token_response(token: str, expires_in: int = 3600) -> httpx.Response:
+    return httpx.Response(
+        200, json={"access_token": token, "expires_in": expires_in}
+    )
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_concurrent_calls_share_one_token_request() -> None:
+    auth = respx.post(SPOTIFY_TOKEN_URL).mock(return_value=token_response("t1"))
+    respx.get(CATEGORIES_URL).mock(return_value=httpx.Response(200, json={}))
+
+    async with httpx.AsyncClient() as http:
+        client = SpotifyClient(settings, http=http)
+        await asyncio.gather(*(client.get("/browse/categories") for _ in range(10)))
+
+    assert auth.call_count == 1
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_token_is_refreshed_ahead_of_expiry() -> None:
+    auth = respx.post(SPOTIFY_TOKEN_URL).mock(side_effect=[
+        # Already inside the refresh margin when it arrives.
+        token_response("t1", expires_in=settings.spotify_token_refresh_margin_seconds),
+        token_response("t2"),
+    ])
+    api = respx.get(CATEGORIES_URL).mock(return_value=httpx.Response(200, json={}))
+
+    async with httpx.AsyncClient() as http:
+        client = SpotifyClient(settings, http=http)
+        await client.get("/browse/categories")
+        await client.get("/browse/categories")
+        await client.get("/browse/categories")
+
+    assert auth.call_count == 2
+    assert api.calls.last.request.headers["Authorization"] == "Bearer t2"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_unauthorized_triggers_one_reauth_and_retry() -> None:
+    auth = respx.post(SPOTIFY_TOKEN_URL).mock(side_effect=[
+        token_response("revoked"), token_response("t2"),
+    ])
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        if request.headers["Authorization"] == "Bearer revoked":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"ok": True})
+
+    respx.get(CATEGORIES_URL).mock(side_effect=respond)
+
+    async with httpx.AsyncClient() as http:
+        client = SpotifyClient(settings, http=http)
+        results = await asyncio.gather(
+            *(client.get("/browse/categories") for _ in range(5))
+        )
+
+    assert results == [{"ok": True}] * 5
+    assert auth.call_count == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_token_is_shared_through_redis() -> None:
+    auth = respx.post(SPOTIFY_TOKEN_URL).mock(return_value=token_response("mine"))
+    api = respx.get(CATEGORIES_URL).mock(return_value=httpx.Response(200, json={}))
+    redis = MagicMock()
+    redis.get.return_value = json.dumps(
+        {"access_token": "shared", "expires_at": time.time() + 3600}
+    )
+
+    async with httpx.AsyncClient() as http:
+        await SpotifyClient(settings, http=http, redis=redis).get("/browse/categories")
+
+    assert auth.call_count == 0
+    assert api.calls.last.request.headers["Authorization"] == "Bearer shared"
+
+    redis.get.return_value = None
+    async with httpx.AsyncClient() as http:
+        await SpotifyClient(settings, http=http, redis=redis).get("/browse/categories")
+
+    assert auth.call_count == 1
+    key, value = redis.set.call_args.args
+    assert key == TOKEN_CACHE_KEY
+    assert json.loads(value)["access_token"] == "mine"
+    assert redis.set.call_args.kwargs["ex"] > 0
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from app.core.recommendations.audio_features import (
+    FEATURES,
+    AudioFeatureIndex,
+    normalize,
+    parse_range,
+)
+
+TEMPO = FEATURES.index("tempo")
+ENERGY = FEATURES.index("energy")
+
+
+def random_features(n: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    features = rng.random((n, len(FEATURES))).astype(np.float32)
+    features[:, FEATURES.index("loudness")] *= -60
+    features[:, TEMPO] = 60 + 140 * features[:, TEMPO]
+    return features
+
+
+def brute_force(features: np.ndarray, row: int, mask: np.ndarray, k: int) -> list[int]:
+    distances = np.linalg.norm(normalize(features) - normalize(features[row]), axis=1)
+    distances[~mask] = np.inf
+    distances[row] = np.inf
+    return list(np.argsort(distances, kind="stable")[:k])
+
+
+def test_parse_range() -> None:
+    assert parse_range("tempo:120:130") == ("tempo", (120.0, 130.0))
+    assert parse_range("energy:0.7:") == ("energy", (0.7, None))
+    assert parse_range("valence::0.2") == ("valence", (None, 0.2))
+    for spec in ("tempo", "pitch:1:2", "tempo:fast:"):
+        with pytest.raises(ValueError):
+            parse_range(spec)
+
+
+@pytest.mark.parametrize("brute_force_limit", [0, 10**6])
+def test_sounds_like_matches_brute_force(brute_force_limit: int) -> None:
+    features = random_features(2000)
+    ids = [f"t{i}" for i in range(len(features))]
+    index = AudioFeatureIndex(leaf_size=8, brute_force_limit=brute_force_limit)
+    index.add(ids, features)
+
+    everything = np.ones(len(features), dtype=bool)
+    assert [m.track_id for m in index.sounds_like("t0", 10)] == [
+        ids[row] for row in brute_force(features, 0, everything, 10)
+    ]
+
+    ranges = {"tempo": (120.0, 130.0), "energy": (0.7, None)}
+    in_range = (
+        (features[:, TEMPO] >= 120) & (features[:, TEMPO] <= 130)
+        & (features[:, ENERGY] >= 0.7)
+    )
+    matches = index.sounds_like("t0", 5, ranges)
+    assert [m.track_id for m in matches] == [
+        ids[row] for row in brute_force(features, 0, in_range, 5)
+    ]
+    distances = [m.distance for m in matches]
+    assert distances == sorted(distances)
+
+
+def test_incremental_adds_replace_and_extend_the_index() -> None:
+    features = random_features(500)
+    ids = [f"t{i}" for i in range(len(features))]
+    index = AudioFeatureIndex(brute_force_limit=0)
+    index.add(ids, features)
+
+    # "t1" now sounds exactly like "t0"; "new" joins via the unindexed tail.
+    index.add(["t1", "new"], features[[0, 2]])
+
+    assert len(index) == 501
+    assert "new" in index
+    closest = index.sounds_like("t0", 2)
+    assert closest[0].track_id == "t1"
+    assert closest[0].distance == 0.0
+    assert [m.track_id for m in index.sounds_like("new", 1)] == ["t2"]
+    assert index.sounds_like("unknown") == []
+
+
+def test_added_leaves_the_serving_index_untouched() -> None:
+    features = random_features(50)
+    index = AudioFeatureIndex()
+    index.add([f"t{i}" for i in range(50)], features)
+
+    updated = index.added(["t1", "new"], features[[0, 2]])
+
+    assert len(index) == 50 and "new" not in index
+    assert index.sounds_like("t0", 1)[0].distance > 0
+    assert len(updated) == 51
+    assert updated.sounds_like("t0", 1)[0].distance == 0.0
+
+
+def test_search_filters_raw_feature_values() -> None:
+    features = random_features(300)
+    index = AudioFeatureIndex()
+    index.add([f"t{i}" for i in range(len(features))], features)
+
+    found = index.search({"tempo": (120.0, 130.0)}, limit=1000)
+
+    expected = np.flatnonzero(
+        (features[:, TEMPO] >= 120) & (features[:, TEMPO] <= 130)
+    )
+    assert [m.track_id for m in found] == [f"t{row}" for row in expected]
+    assert all(m.distance is None for m in found)
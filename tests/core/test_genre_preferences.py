@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+from datetime import date, datetime, timezone
+
+from app.core.analysis.genre_preferences import (
+    SCORE_COLUMNS,
+    Period,
+    compute_genre_scores,
+    window_expiries,
+)
+
+AS_OF = datetime(2024, 1, 10, 12, tzinfo=timezone.utc)
+
+
+def plays(*rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["user_id", "day", "genres", "ms_played"])
+
+
+def scores_of(frame: pd.DataFrame, user_id: str, period: str) -> dict:
+    rows = frame[(frame["user_id"] == user_id) & (frame["period"] == period)]
+    return dict(zip(rows["genre"], rows["preference_score"]))
+
+
+def test_time_split_across_genres_and_decayed() -> None:
+    frame = compute_genre_scores(plays(
+        ("u1", date(2024, 1, 10), ["rock", "indie"], 2000),
+        ("u1", date(2023, 1, 10), ["jazz"], 5000),
+    ), AS_OF)
+
+    assert scores_of(frame, "u1", "short_term") == {"rock": 0.5, "indie": 0.5}
+    # A year old with a one-year half-life: 2500 against 1000 + 1000.
+    long_term = scores_of(frame, "u1", "long_term")
+    assert long_term["jazz"] == pytest.approx(2500 / 4500)
+    assert sum(long_term.values()) == pytest.approx(1.0)
+
+
+def test_users_are_scored_independently_in_one_pass() -> None:
+    frame = compute_genre_scores(plays(
+        ("u1", date(2024, 1, 9), ["rock"], 1000),
+        ("u2", date(2024, 1, 9), ["pop"], 10),
+        ("u2", date(2024, 1, 9), [], 99999),
+        ("u2", date(2024, 1, 9), None, 99999),
+    ), AS_OF, periods=(Period("p", 7, 7.0),))
+
+    assert list(frame.columns) == SCORE_COLUMNS
+    assert scores_of(frame, "u1", "p") == {"rock": 1.0}
+    assert scores_of(frame, "u2", "p") == {"pop": 1.0}
+
+
+def test_plays_outside_every_window_or_without_genres_give_nothing() -> None:
+    empty = compute_genre_scores(plays(), AS_OF)
+    old = compute_genre_scores(
+        plays(("u1", date(2020, 1, 1), ["rock"], 1000)), AS_OF,
+        periods=(Period("p", 28, 7.0),)
+    )
+    genreless = compute_genre_scores(
+        plays(("u1", date(2024, 1, 9), [], 1000)), AS_OF
+    )
+
+    for frame in (empty, old, genreless):
+        assert frame.empty
+        assert list(frame.columns) == SCORE_COLUMNS
+
+
+def test_window_expiries_are_the_first_play_to_leave_a_window() -> None:
+    expiries = window_expiries(plays(
+        # Inside short_term until 2024-01-29, medium_term until 2024-07-01.
+        ("u1", date(2024, 1, 1), ["rock"], 1000),
+        ("u1", date(2024, 1, 9), ["rock"], 1000),
+        # Only inside medium_term.
+        ("u2", date(2023, 12, 1), ["jazz"], 1000),
+        # Outside every window.
+        ("u3", date(2020, 1, 1), ["jazz"], 1000),
+    ), AS_OF)
+
+    assert expiries == {"u1": date(2024, 1, 29), "u2": date(2024, 5, 31)}
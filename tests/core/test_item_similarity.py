@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import scipy.sparse as sp
+
+from app.core.recommendations.item_similarity import (
+    IndexFile,
+    SimilarTracksIndex,
+    top_k_neighbors,
+)
+
+
+def brute_force(matrix: np.ndarray, k: int) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=0)
+    norms[norms == 0] = 1.0
+    normalized = matrix / norms
+    similarity = normalized.T @ normalized
+    np.fill_diagonal(similarity, 0)
+    return np.sort(similarity, axis=1)[:, ::-1][:, :k]
+
+
+def test_blocks_match_the_dense_computation() -> None:
+    rng = np.random.default_rng(7)
+    dense = rng.random((40, 25)) * (rng.random((40, 25)) < 0.2)
+
+    whole = top_k_neighbors(sp.csr_matrix(dense), k=5, block_size=25)
+    blocked = top_k_neighbors(sp.csr_matrix(dense), k=5, block_size=4)
+
+    np.testing.assert_array_equal(whole[0], blocked[0])
+    np.testing.assert_allclose(blocked[1], brute_force(dense, 5), atol=1e-6)
+    assert not (blocked[0] == np.arange(25)[:, None]).any()
+
+
+def test_build_filters_rare_tracks_and_pads_missing_neighbors() -> None:
+    # users a, b, c; tracks x, y, z (z has a single listener)
+    index = SimilarTracksIndex.build(
+        user_codes=np.array([0, 0, 1, 1, 2, 2]),
+        track_codes=np.array([0, 1, 0, 1, 0, 2]),
+        plays=np.array([3.0, 1.0, 1.0, 1.0, 2.0, 5.0]),
+        track_ids=np.array(["x", "y", "z"]),
+        k=3,
+    )
+
+    assert len(index) == 2 and "z" not in index
+    assert [t.track_id for t in index.similar("x")] == ["y"]
+    assert index.neighbors[0].tolist() == [1, -1, -1]
+    assert index.similar("z") == []
+
+
+def test_save_load_and_reload_on_change(tmp_path) -> None:
+    path = tmp_path / "models" / "similar.npz"
+    index_file = IndexFile(path, check_seconds=0)
+    assert index_file.get() is None
+
+    SimilarTracksIndex(
+        np.array(["x", "y"]), np.array([[1], [0]]), np.array([[0.5], [0.5]])
+    ).save(path)
+    loaded = index_file.get()
+    assert loaded.similar("x") == [("y", 0.5)]
+    assert index_file.get() is loaded
+
+    SimilarTracksIndex(
+        np.array(["x", "y", "w"]),
+        np.array([[2], [0], [0]]),
+        np.array([[0.25], [0.5], [0.25]]),
+    ).save(path)
+    # Make the rewrite visible even on coarse mtime filesystems.
+    mtime = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+    assert index_file.get().similar("x") == [("w", 0.25)]
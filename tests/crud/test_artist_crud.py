@@ -89,3 +89,31 @@ async def test_get_or_create_by_name_new() -> None:
     assert result.name == "New Artist"
     db.add.assert_called_once()
     db.flush.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_get_or_create_by_names_selects_only_conflicting() -> None:
+    inserted = MagicMock()
+    inserted.all.return_value = [("New Artist", "id-new")]
+    existing = MagicMock()
+    existing.all.return_value = [("Known Artist", "id-known")]
+
+    db: AsyncSession = AsyncMock()
+    db.execute.side_effect = [inserted, existing]
+
+    result = await ArtistCRUD.bulk_get_or_create_by_names(
+        db, ["New Artist", "Known Artist", "New Artist"]
+    )
+
+    assert result == {"New Artist": "id-new", "Known Artist": "id-known"}
+    assert db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_get_or_create_by_names_empty() -> None:
+    db: AsyncSession = AsyncMock()
+
+    result = await ArtistCRUD.bulk_get_or_create_by_names(db, [])
+
+    assert result == {}
+    db.execute.assert_not_called()
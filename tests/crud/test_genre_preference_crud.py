@@ -0,0 +1,38 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.crud.genre_preference_crud import GenrePreferenceCRUD
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_plays_are_condensed_per_user_artist_and_day() -> None:
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+
+    await GenrePreferenceCRUD.get_artist_day_plays(db, ["u1", "u2"])
+
+    statement = str(db.execute.await_args.args[0].compile(
+        dialect=postgresql.dialect()
+    ))
+    assert "JOIN artists ON artists.id = tracks.artist_id" in statement
+    assert "listening_events.user_id IN" in statement
+    assert (
+        "GROUP BY listening_events.user_id, artists.id, "
+        "date(timezone(%(timezone_1)s, listening_events.played_at))"
+    ) in statement
+
+
+async def test_replace_deletes_then_bulk_inserts() -> None:
+    db = AsyncMock()
+    rows = [{"user_id": "u1", "genre": "rock", "period": "long_term",
+             "preference_score": 1.0}]
+
+    written = await GenrePreferenceCRUD.replace_for_users(db, ["u1", "u2"], rows)
+
+    assert written == 1
+    delete_call, insert_call = db.execute.await_args_list
+    assert str(delete_call.args[0]).startswith("DELETE FROM user_genre_preferences")
+    assert insert_call.args[1] == rows
@@ -0,0 +1,248 @@
+import asyncio
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.crud.listening_event_crud import (
+    CREATE_STAGING_SQL,
+    EXPORT_FIELDS,
+    INSERT_STAGED_EVENTS_SQL,
+    STAGED_DAYS_SQL,
+    STAGING_COLUMNS,
+    STAGING_TABLE,
+    ListeningEventCRUD,
+)
+from app.crud.user_daily_stats_crud import (
+    LOCK_USER_SQL,
+    REFRESH_DAYS_SQL,
+    UserDailyStatsCRUD,
+)
+from app.crud.user_entity_stats_crud import INCREMENT_STATS_SQL
+from app.models.album import Album
+from app.models.artist import Artist
+from app.models.track import Track
+from tests.conftest import TestSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_copy_plays_stages_then_merges() -> None:
+    calls: list[str] = []
+    driver = AsyncMock()
+
+    async def copy_records_to_table(table, records, columns):
+        calls.append("copy")
+        assert table == STAGING_TABLE
+        assert columns == STAGING_COLUMNS
+        assert list(records) == [
+            ("user1", "track1", True, "Song", "Artist", "Album", played_at, 1000)
+        ]
+
+    driver.copy_records_to_table.side_effect = copy_records_to_table
+    raw = MagicMock(driver_connection=driver)
+    conn = AsyncMock()
+    conn.get_raw_connection.return_value = raw
+
+    db = AsyncMock()
+    db.connection.return_value = conn
+
+    async def execute(statement, params=None):
+        calls.append(statement)
+        result = MagicMock()
+        result.all.return_value = [("track1", 1, 1000, played_at)]
+        result.scalars.return_value.all.return_value = [date(2023, 1, 1)]
+        return result
+
+    db.execute.side_effect = execute
+    played_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+    inserted = await ListeningEventCRUD.copy_plays(
+        db, "user1", [("track1", True, "Song", "Artist", "Album", played_at, 1000)]
+    )
+
+    assert inserted == 1
+    # The staging table must exist (and the transaction be open) before COPY.
+    assert calls[0] is CREATE_STAGING_SQL
+    assert calls.index("copy") < calls.index(INSERT_STAGED_EVENTS_SQL)
+    expected_tail = [
+        LOCK_USER_SQL, INSERT_STAGED_EVENTS_SQL, STAGED_DAYS_SQL, REFRESH_DAYS_SQL,
+        *INCREMENT_STATS_SQL
+    ]
+    assert len(calls) >= len(expected_tail)
+    assert all(
+        a is b for a, b in zip(calls[-len(expected_tail):], expected_tail)
+    )
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_events_counts_only_inserted_rows() -> None:
+    db = AsyncMock()
+    played_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    result = MagicMock()
+    result.all.return_value = [("user1", "track1", played_at, 1000)]
+    db.execute.return_value = result
+    event = {
+        "user_id": "user1", "track_id": "track1", "played_at": played_at,
+        "duration_ms": 1000, "progress_ms": 0, "skipped": False,
+    }
+
+    inserted = await ListeningEventCRUD.bulk_create_events(db, [event, event])
+
+    assert inserted == 1
+    lock_call, insert_call, refresh_call, *increment_calls = (
+        db.execute.await_args_list
+    )
+    assert lock_call.args == (LOCK_USER_SQL, {"user_id": "user1"})
+    statement = str(insert_call.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (user_id, track_id, played_at) DO NOTHING" in statement
+    # The rollups are updated from the inserted rows in the same transaction.
+    assert refresh_call.args[0] is REFRESH_DAYS_SQL
+    assert [call.args[0] for call in increment_calls] == list(INCREMENT_STATS_SQL)
+    assert increment_calls[0].args[1]["plays"] == [1]
+    assert refresh_call.args[1] == {"user_id": "user1", "days": [date(2023, 1, 1)]}
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_events_locks_each_user_once_in_order() -> None:
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+    played_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    events = [
+        {"user_id": user_id, "track_id": "track1", "played_at": played_at,
+         "duration_ms": 1000, "progress_ms": 0, "skipped": False}
+        for user_id in ("user2", "user1", "user2")
+    ]
+
+    await ListeningEventCRUD.bulk_create_events(db, events)
+
+    locks = [
+        call.args[1]["user_id"] for call in db.execute.await_args_list
+        if call.args[0] is LOCK_USER_SQL
+    ]
+    assert locks == ["user1", "user2"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_events_splits_inserts_under_the_parameter_limit() -> None:
+    db = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = []
+    db.execute.return_value = result
+    played_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    events = [
+        {"user_id": "user1", "track_id": f"track{i}",
+         "played_at": played_at + timedelta(seconds=i), "duration_ms": 1000,
+         "progress_ms": 0, "skipped": False, "context_type": None,
+         "context_id": None}
+        for i in range(5000)
+    ]
+
+    await ListeningEventCRUD.bulk_create_events(db, events)
+
+    inserts = [
+        call.args[0] for call in db.execute.await_args_list
+        if call.args[0] is not LOCK_USER_SQL
+    ]
+    sizes = [
+        len(statement.compile(dialect=postgresql.dialect()).params)
+        for statement in inserts
+    ]
+    assert len(inserts) == 2
+    assert sum(sizes) == 5000 * 8
+    assert max(sizes) <= 32767
+
+
+@pytest.mark.asyncio
+async def test_concurrent_chunks_on_one_day_both_reach_the_rollup(
+    test_user, db_session
+) -> None:
+    artist = Artist(id=str(uuid4()), name="Artist")
+    album = Album(id=str(uuid4()), name="Album", artist_id=artist.id)
+    track = Track(
+        id=str(uuid4()), name="Track", artist_id=artist.id,
+        album_id=album.id, duration_ms=1000
+    )
+    db_session.add_all([artist, album, track])
+    await db_session.commit()
+    played_at = datetime(2023, 3, 1, 12, tzinfo=timezone.utc)
+
+    def chunk(minute: int) -> list[dict]:
+        return [{
+            "user_id": test_user.id, "track_id": track.id,
+            "played_at": played_at + timedelta(minutes=minute),
+            "duration_ms": 1000, "progress_ms": 0, "skipped": False,
+        }]
+
+    async with TestSessionLocal() as first, TestSessionLocal() as second:
+        await ListeningEventCRUD.bulk_create_events(first, chunk(0))
+        # Waits for the first chunk's transaction before touching the day.
+        pending = asyncio.create_task(
+            ListeningEventCRUD.bulk_create_events(second, chunk(1))
+        )
+        await asyncio.sleep(0.2)
+        assert not pending.done()
+        await first.commit()
+        assert await pending == 1
+        await second.commit()
+
+    async with TestSessionLocal() as session:
+        days = await UserDailyStatsCRUD.get_days(session, test_user.id)
+    assert [(day.plays, day.ms_played) for day in days] == [(2, 2000)]
+
+
+@pytest.mark.asyncio
+async def test_stream_user_export_uses_a_server_side_cursor() -> None:
+    async def mappings():
+        yield {"track_name": "Track A"}
+
+    result = MagicMock()
+    result.mappings.return_value = mappings()
+    db = AsyncMock()
+    db.stream.return_value = result
+
+    rows = [
+        row async for row in ListeningEventCRUD.stream_user_export(
+            db, "user1", batch_size=100
+        )
+    ]
+
+    assert rows == [{"track_name": "Track A"}]
+    query = db.stream.await_args.args[0]
+    assert query.get_execution_options()["yield_per"] == 100
+    assert tuple(query.selected_columns.keys()) == EXPORT_FIELDS
+    statement = str(query.compile(dialect=postgresql.dialect()))
+    assert "JOIN artists" in statement and "JOIN albums" in statement
+    assert "ORDER BY listening_events.played_at, listening_events.id" in statement
+
+
+@pytest.mark.asyncio
+async def test_stream_event_batches_projects_a_transaction_range() -> None:
+    async def partitions():
+        yield [(5, "user1")]
+
+    result = MagicMock()
+    result.partitions.return_value = partitions()
+    db = AsyncMock()
+    db.stream.return_value = result
+
+    batches = [
+        batch async for batch in ListeningEventCRUD.stream_event_batches(
+            db, ["id", "user_id"], from_xid=4, to_xid=9, user_id="user1"
+        )
+    ]
+
+    assert batches == [[(5, "user1")]]
+    query = db.stream.await_args.args[0]
+    assert tuple(query.selected_columns.keys()) == ("id", "user_id")
+    statement = str(query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+    assert (
+        "listening_events.created_xid >= 4 AND listening_events.created_xid < 9"
+        in statement
+    )
+    assert "listening_events.user_id = 'user1'" in statement
+    assert "ORDER BY listening_events.id" in statement
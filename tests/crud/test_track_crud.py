@@ -1,10 +1,12 @@
 import pytest
+from datetime import datetime, timezone
 from uuid import uuid4
 from unittest.mock import AsyncMock, MagicMock, Mock
 
 from app.crud.track_crud import TrackCRUD
 from app.models.track import Track
 from app.schemas.track import TrackCreate
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -121,3 +123,108 @@ async def test_get_or_create_track_new(monkeypatch) -> None:
     result = await TrackCRUD.get_or_create_track(db, data)
 
     assert result == created_track
+
+
+@pytest.mark.asyncio
+async def test_bulk_get_or_create_tracks_creates_missing_with_given_ids() -> None:
+    existing = MagicMock()
+    existing.all.return_value = [("Song A", "artist1", "album1", "id-a")]
+    db: AsyncSession = AsyncMock()
+    db.execute.side_effect = [existing, MagicMock()]
+
+    tracks = [
+        TrackCreate(id=f"new-{name}", name=name, duration_ms=1000,
+                    artist_id="artist1", album_id="album1")
+        for name in ("Song A", "Song B", "Song A")
+    ]
+    result = await TrackCRUD.bulk_get_or_create_tracks(db, tracks)
+
+    assert result == {
+        ("Song A", "artist1", "album1"): "id-a",
+        ("Song B", "artist1", "album1"): "new-Song B",
+    }
+    assert db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_missing_tracks_inserts_only_unknown_ids() -> None:
+    existing = MagicMock()
+    existing.scalars.return_value.all.return_value = ["id-a"]
+    db: AsyncSession = AsyncMock()
+    db.execute.side_effect = [existing, MagicMock()]
+
+    tracks = [
+        TrackCreate(id=track_id, name=track_id, duration_ms=1000,
+                    artist_id="artist1", album_id="album1")
+        for track_id in ("id-a", "id-b")
+    ]
+    await TrackCRUD.bulk_create_missing_tracks(db, tracks)
+
+    assert db.execute.await_count == 2
+    params = db.execute.await_args_list[1].args[0].compile().params
+    assert [v for k, v in params.items() if k.startswith("id_")] == ["id-b"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_missing_tracks_skips_insert_when_all_known() -> None:
+    existing = MagicMock()
+    existing.scalars.return_value.all.return_value = ["id-a"]
+    db: AsyncSession = AsyncMock()
+    db.execute.return_value = existing
+
+    track = TrackCreate(id="id-a", name="A", duration_ms=1000,
+                        artist_id="artist1", album_id="album1")
+    await TrackCRUD.bulk_create_missing_tracks(db, [track])
+
+    db.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_tracks_missing_audio_features_pages_by_id() -> None:
+    db: AsyncSession = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = ["0" * 22]
+    db.execute.return_value = mock_result
+
+    ids = await TrackCRUD.get_tracks_missing_audio_features(db, 100, after="a")
+
+    assert ids == ["0" * 22]
+    statement = str(db.execute.call_args.args[0])
+    assert "tracks.audio_features_checked_at IS NULL" in statement
+    assert "tracks.id >" in statement
+    assert "ORDER BY tracks.id" in statement
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_tracks_uses_one_executemany() -> None:
+    db: AsyncSession = AsyncMock()
+    rows = [{"id": "t1", "energy": 0.1}, {"id": "t2", "energy": 0.2}]
+
+    await TrackCRUD.bulk_update_tracks(db, rows)
+    await TrackCRUD.bulk_update_tracks(db, [])
+
+    db.execute.assert_called_once()
+    assert db.execute.call_args.args[1] == rows
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_features_only_reads_fully_enriched_tracks() -> None:
+    async def partitions():
+        yield [("track1",) + (0.5,) * 9]
+
+    result = MagicMock()
+    result.partitions.return_value = partitions()
+    db = AsyncMock()
+    db.stream.return_value = result
+    since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    batches = [
+        batch async for batch in TrackCRUD.stream_audio_features(db, since, 10)
+    ]
+
+    assert batches == [[("track1",) + (0.5,) * 9]]
+    query = db.stream.await_args.args[0]
+    assert query.get_execution_options()["yield_per"] == 10
+    statement = str(query.compile(dialect=postgresql.dialect()))
+    assert "tracks.tempo IS NOT NULL" in statement
+    assert "tracks.audio_features_checked_at >=" in statement
@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import selectinload
+
+import app.models.social_account  # noqa: F401  (registers the mapper)
+from app.crud.user_crud import UserCRUD
+from app.models.user import User
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_loads_no_relationships_by_default() -> None:
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+
+    await UserCRUD.get_user_by_id(db, "user1")
+
+    statement = db.execute.await_args.args[0]
+    assert "listening_events" not in compiled(statement)
+    assert not statement._with_options
+    assert User.listening_events.property.lazy == "raise"
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_applies_loader_options() -> None:
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+    option = selectinload(User.social_accounts)
+
+    await UserCRUD.get_user_by_id(db, "user1", [option])
+
+    assert db.execute.await_args.args[0]._with_options == (option,)
+
+
+@pytest.mark.asyncio
+async def test_count_listening_events_sums_rollups() -> None:
+    db = AsyncMock()
+    result = MagicMock()
+    result.scalar_one.return_value = 300000
+    db.execute.return_value = result
+
+    assert await UserCRUD.count_listening_events(db, "user1") == 300000
+    assert "sum(user_daily_stats.plays)" in compiled(db.execute.await_args.args[0])
@@ -0,0 +1,84 @@
+import pytest
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from app.crud.user_daily_stats_crud import UserDailyStatsCRUD
+
+UTC = timezone.utc
+
+
+def make_result(row: tuple) -> MagicMock:
+    result = MagicMock()
+    result.one.return_value = row
+    return result
+
+
+@pytest.mark.asyncio
+async def test_range_totals_sum_rollups_and_read_partial_edge_days() -> None:
+    db = AsyncMock()
+    db.execute.side_effect = [
+        # whole days 2023-01-02 .. 2023-01-04 from the rollup
+        make_result((10, 600000, datetime(2023, 1, 2, 8, tzinfo=UTC),
+                     datetime(2023, 1, 4, 22, tzinfo=UTC))),
+        # afternoon of 2023-01-01 from events
+        make_result((2, 1000, datetime(2023, 1, 1, 18, tzinfo=UTC),
+                     datetime(2023, 1, 1, 19, tzinfo=UTC))),
+        # morning of 2023-01-05 from events
+        make_result((1, 500, datetime(2023, 1, 5, 3, tzinfo=UTC),
+                     datetime(2023, 1, 5, 3, tzinfo=UTC))),
+    ]
+
+    totals = await UserDailyStatsCRUD.get_range_totals(
+        db, "user1",
+        datetime(2023, 1, 1, 12, tzinfo=UTC),
+        datetime(2023, 1, 5, 6, tzinfo=UTC)
+    )
+
+    assert totals == {
+        "total_listens": 13,
+        "total_played_ms": 601500,
+        "first_played": datetime(2023, 1, 1, 18, tzinfo=UTC),
+        "last_played": datetime(2023, 1, 5, 3, tzinfo=UTC),
+    }
+    assert db.execute.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_range_totals_for_whole_days_only_read_rollups() -> None:
+    db = AsyncMock()
+    db.execute.return_value = make_result((0, 0, None, None))
+
+    totals = await UserDailyStatsCRUD.get_range_totals(
+        db, "user1", datetime(2023, 1, 1, tzinfo=UTC), datetime(2023, 2, 1, tzinfo=UTC)
+    )
+
+    assert totals["total_listens"] == 0
+    assert totals["first_played"] is None
+    db.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_range_within_one_day_reads_events() -> None:
+    db = AsyncMock()
+    db.execute.return_value = make_result((3, 900, None, None))
+
+    totals = await UserDailyStatsCRUD.get_range_totals(
+        db, "user1",
+        datetime(2023, 1, 1, 9, tzinfo=UTC), datetime(2023, 1, 1, 17, tzinfo=UTC)
+    )
+
+    assert totals["total_listens"] == 3
+    db.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_refresh_days_deduplicates_and_skips_empty() -> None:
+    db = AsyncMock()
+
+    await UserDailyStatsCRUD.refresh_days(db, "user1", [])
+    db.execute.assert_not_awaited()
+
+    await UserDailyStatsCRUD.refresh_days(
+        db, "user1", [date(2023, 1, 2), date(2023, 1, 1), date(2023, 1, 2)]
+    )
+    assert db.execute.await_args.args[1]["days"] == [date(2023, 1, 1), date(2023, 1, 2)]
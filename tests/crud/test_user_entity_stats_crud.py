@@ -0,0 +1,90 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.crud.user_entity_stats_crud import (
+    INCREMENT_STATS_SQL,
+    TrackPlays,
+    UserEntityStatsCRUD,
+    tally_plays,
+)
+
+UTC = timezone.utc
+
+
+def test_tally_plays_collapses_rows_per_track() -> None:
+    first = datetime(2023, 1, 1, 8, tzinfo=UTC)
+    later = datetime(2023, 1, 2, 9, tzinfo=UTC)
+
+    totals = tally_plays([
+        ("track1", later, 1000),
+        ("track2", first, 300),
+        ("track1", first, 500),
+    ])
+
+    assert totals == [
+        TrackPlays("track1", 2, 1500, later),
+        TrackPlays("track2", 1, 300, first),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_add_plays_updates_tracks_artists_and_albums() -> None:
+    db = AsyncMock()
+    played_at = datetime(2023, 1, 1, tzinfo=UTC)
+
+    await UserEntityStatsCRUD.add_plays(db, "user1", [])
+    db.execute.assert_not_awaited()
+
+    await UserEntityStatsCRUD.add_plays(
+        db, "user1", [TrackPlays("track1", 3, 9000, played_at)]
+    )
+
+    calls = db.execute.await_args_list
+    assert [call.args[0] for call in calls] == list(INCREMENT_STATS_SQL)
+    assert calls[0].args[1] == {
+        "user_id": "user1",
+        "track_ids": ["track1"],
+        "plays": [3],
+        "ms_played": [9000],
+        "last_played": [played_at],
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_top_reads_most_played_first() -> None:
+    db = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = []
+    db.execute.return_value = result
+
+    await UserEntityStatsCRUD.get_top(db, "user1", "artists", 10)
+
+    statement = str(db.execute.await_args.args[0].compile(
+        dialect=postgresql.dialect()
+    ))
+    assert "FROM user_artist_stats JOIN artists" in statement
+    assert "ORDER BY user_artist_stats.play_count DESC" in statement
+    assert "LIMIT" in statement
+
+
+@pytest.mark.asyncio
+async def test_stream_track_plays_reads_the_rollup_in_batches() -> None:
+    async def partitions():
+        yield [("user1", "track1", 3)]
+
+    result = MagicMock()
+    result.partitions.return_value = partitions()
+    db = AsyncMock()
+    db.stream.return_value = result
+
+    batches = [
+        batch async for batch in UserEntityStatsCRUD.stream_track_plays(db, 10)
+    ]
+
+    assert batches == [[("user1", "track1", 3)]]
+    query = db.stream.await_args.args[0]
+    assert query.get_execution_options()["yield_per"] == 10
+    assert "FROM user_track_stats" in str(query.compile(dialect=postgresql.dialect()))
@@ -0,0 +1,16 @@
+from app.db.batching import MAX_BIND_PARAMS, param_batches
+
+
+def test_batches_stay_under_the_parameter_limit() -> None:
+    rows = list(range(10000))
+
+    batches = list(param_batches(rows, 8))
+
+    assert [row for batch in batches for row in batch] == rows
+    assert all(len(batch) * 8 <= MAX_BIND_PARAMS for batch in batches)
+    assert len(batches) == 3
+
+
+def test_small_inputs_are_one_batch() -> None:
+    assert list(param_batches([1, 2, 3], 7)) == [[1, 2, 3]]
+    assert list(param_batches([], 7)) == []
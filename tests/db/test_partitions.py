@@ -0,0 +1,69 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.db import partitions
+from app.db.partitions import (
+    ensure_partitions,
+    iter_months,
+    month_start,
+    partition_name,
+)
+
+
+def test_iter_months_spans_year_boundary() -> None:
+    months = list(iter_months(date(2022, 11, 15), date(2023, 2, 1)))
+
+    assert months == [
+        date(2022, 11, 1), date(2022, 12, 1), date(2023, 1, 1), date(2023, 2, 1)
+    ]
+
+
+def test_month_start_uses_utc_for_aware_datetimes() -> None:
+    # 00:30 on March 1st in UTC+2 is still February in UTC.
+    played_at = datetime(2023, 3, 1, 0, 30, tzinfo=timezone(timedelta(hours=2)))
+
+    assert month_start(played_at) == date(2023, 2, 1)
+    assert partition_name(month_start(played_at)) == "listening_events_y2023m02"
+
+
+def mock_session() -> AsyncMock:
+    db = AsyncMock()
+    db.info = {}
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = []
+    db.execute.return_value = result
+    return db
+
+
+@pytest.mark.asyncio
+async def test_created_partitions_are_only_cached_once_committed() -> None:
+    name = partition_name(date(2031, 5, 1))
+    db = mock_session()
+
+    assert await ensure_partitions(db, date(2031, 5, 1), date(2031, 5, 1)) == [name]
+    assert name not in partitions._known_partitions
+
+    # A rolled-back transaction leaves the partition to be created again.
+    partitions._forget_created_partitions(db)
+    assert await ensure_partitions(db, date(2031, 5, 1), date(2031, 5, 1)) == [name]
+
+    partitions._remember_created_partitions(db)
+    assert await ensure_partitions(db, date(2031, 5, 1), date(2031, 5, 1)) == []
+    partitions._known_partitions.pop(name)
+
+
+@pytest.mark.asyncio
+async def test_cached_partitions_are_checked_again_after_a_while() -> None:
+    name = partition_name(date(2031, 6, 1))
+    partitions._remember([name])
+    db = mock_session()
+
+    assert await ensure_partitions(db, date(2031, 6, 1), date(2031, 6, 1)) == []
+    db.execute.assert_not_awaited()
+
+    later = partitions.time.monotonic() + partitions.KNOWN_PARTITION_SECONDS
+    with patch.object(partitions.time, "monotonic", return_value=later):
+        # Detached by another process meanwhile: created again.
+        assert await ensure_partitions(db, date(2031, 6, 1), date(2031, 6, 1)) == [name]
+    partitions._known_partitions.pop(name, None)
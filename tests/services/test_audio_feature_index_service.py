@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+from unittest.mock import MagicMock, patch
+
+from app.services.audio_feature_index_service import (
+    WATERMARK_OVERLAP,
+    AudioFeatureIndexService,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def row(track_id: str, tempo: float) -> tuple:
+    return (track_id, 0.1, 0.5, 0.5, 0.0, 0.1, -8.0, 0.05, tempo, 0.5)
+
+
+class FakeTrackRepository:
+    def __init__(self, batches: list[list[tuple]]):
+        self.batches = batches
+        self.calls: list[datetime | None] = []
+
+    async def stream_audio_features(
+        self,
+        checked_since: datetime | None = None,
+        batch_size: int = 50000
+    ) -> AsyncIterator[Sequence[tuple]]:
+        self.calls.append(checked_since)
+        for batch in self.batches:
+            yield batch
+        self.batches = []
+
+
+@asynccontextmanager
+async def session_factory() -> AsyncIterator[MagicMock]:
+    yield MagicMock()
+
+
+async def test_loads_everything_then_only_new_tracks_on_version_change() -> None:
+    repo = FakeTrackRepository([[row("a", 120.0), row("b", 121.0)], [row("c", 180.0)]])
+    redis = MagicMock()
+    redis.get.return_value = "1"
+    service = AudioFeatureIndexService(session_factory, redis, refresh_seconds=0)
+
+    with patch(
+        "app.services.audio_feature_index_service.SQLAlchemyTrackRepository",
+        return_value=repo
+    ):
+        first = index = await service.get()
+        assert len(index) == 3
+        assert index.sounds_like("a", 1)[0].track_id == "b"
+
+        # Same catalog version: the database is not read again.
+        await service.get()
+        assert repo.calls == [None]
+
+        first_load = service._watermark
+        redis.get.return_value = "2"
+        repo.batches = [[row("d", 120.5)]]
+        index = await service.get()
+
+    assert len(index) == 4
+    # Built next to the old index, which kept serving unchanged.
+    assert len(first) == 3
+    assert index.sounds_like("a", 1)[0].track_id == "d"
+    assert repo.calls == [None, first_load - WATERMARK_OVERLAP]
+
+
+async def test_requests_during_a_refresh_get_the_current_index() -> None:
+    release = asyncio.Event()
+
+    class SlowRepository(FakeTrackRepository):
+        async def stream_audio_features(
+            self,
+            checked_since: datetime | None = None,
+            batch_size: int = 50000
+        ) -> AsyncIterator[Sequence[tuple]]:
+            await release.wait()
+            async for rows in super().stream_audio_features(checked_since, batch_size):
+                yield rows
+
+    repo = SlowRepository([[row("a", 120.0)]])
+    redis = MagicMock()
+    redis.get.return_value = "1"
+    service = AudioFeatureIndexService(session_factory, redis, refresh_seconds=0)
+
+    with patch(
+        "app.services.audio_feature_index_service.SQLAlchemyTrackRepository",
+        return_value=repo
+    ):
+        release.set()
+        current = await service.get()
+        release.clear()
+        redis.get.return_value = "2"
+        repo.batches = [[row("b", 121.0)]]
+        refresh = asyncio.create_task(service.get())
+        await asyncio.sleep(0)
+
+        assert await service.get() is current
+        release.set()
+        assert len(await refresh) == 2
+
+
+async def test_warm_logs_instead_of_raising() -> None:
+    redis = MagicMock()
+    redis.get.return_value = "1"
+
+    @asynccontextmanager
+    async def broken_session() -> AsyncIterator[MagicMock]:
+        raise ConnectionError("database down")
+        yield
+
+    service = AudioFeatureIndexService(broken_session, redis)
+
+    await service.warm()
+
+    assert len(service.index) == 0
@@ -0,0 +1,30 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from app.core.security import create_access_token, decode_access_token
+from app.services import principal_cache
+from app.services.auth_service import AuthService, _claims_cache
+
+
+def test_verify_token_checks_signature_once_per_token() -> None:
+    _claims_cache.clear()
+    token = create_access_token({"sub": "user-1"}, timedelta(minutes=5))
+
+    with patch(
+        "app.services.auth_service.decode_access_token",
+        wraps=decode_access_token
+    ) as decode:
+        assert AuthService().decode_token(token) == "user-1"
+        assert AuthService().decode_token(token) == "user-1"
+
+    decode.assert_called_once_with(token)
+
+
+def test_changed_users_are_invalidated_on_commit() -> None:
+    session = MagicMock(info={principal_cache._CHANGED_USERS: {"user-1"}})
+
+    with patch.object(principal_cache, "redis_client") as redis:
+        principal_cache._invalidate_changed_users(session)
+
+    redis.delete.assert_called_once_with(principal_cache.principal_key("user-1"))
+    assert principal_cache._CHANGED_USERS not in session.info
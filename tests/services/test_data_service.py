@@ -1,76 +1,245 @@
 import pytest
-from unittest.mock import AsyncMock, patch
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
 
 from app.services.data_service import DataService
+from app.services.spotify_ingestion_service import SpotifyIngestionService
 from app.models.user import User
-from app.models.artist import Artist
-from app.models.album import Album
-from app.models.track import Track
 
 
-@pytest.mark.asyncio
-async def test_process_valid_spotify_data_creates_user_and_counts_records() -> None:
-    mock_db = AsyncMock(spec=AsyncSession)
-    mock_data = [{
-        "ts": "2023-01-01T12:00:00Z",
-        "master_metadata_track_name": "Test Track",
-        "master_metadata_album_artist_name": "Test Artist",
+def make_service(
+    user: User | None = None,
+    covered: tuple[datetime, datetime] | None = None
+) -> DataService:
+    user_repo = AsyncMock()
+    user_repo.get_by_id.return_value = user
+    user_repo.create.return_value = User(id="test_user", username="test_user")
+
+    artist_repo = AsyncMock()
+    artist_repo.bulk_get_or_create_by_names.side_effect = (
+        lambda names: {name: f"artist:{name}" for name in names}
+    )
+    album_repo = AsyncMock()
+    album_repo.bulk_get_or_create.side_effect = (
+        lambda keys: {key: f"album:{key[0]}" for key in keys}
+    )
+    track_repo = AsyncMock()
+    track_repo.bulk_get_or_create.side_effect = (
+        lambda tracks: {
+            (t.name, t.artist_id, t.album_id): f"track:{t.name}" for t in tracks
+        }
+    )
+    event_repo = AsyncMock()
+    event_repo.bulk_create_events.side_effect = (
+        lambda user_id, events: len(events)
+    )
+    event_repo.get_covered_range.return_value = covered
+
+    return DataService(
+        user_repo=user_repo,
+        artist_repo=artist_repo,
+        album_repo=album_repo,
+        track_repo=track_repo,
+        event_repo=event_repo,
+        ingestion=SpotifyIngestionService()
+    )
+
+
+def make_record(
+    track: str,
+    artist: str = "Test Artist",
+    ts: str = "2023-01-01T12:00:00Z",
+    uri: str | None = None
+) -> dict:
+    return {
+        "ts": ts,
+        "spotify_track_uri": uri,
+        "master_metadata_track_name": track,
+        "master_metadata_album_artist_name": artist,
         "master_metadata_album_album_name": "Test Album",
         "ms_played": 180000
-    }]
-    user_id = "test_user"
-
-    fake_user = User(id=user_id, username="test_user")
-    fake_artist = Artist(id="artist_123", name="Test Artist")
-    fake_album = Album(id="album_456", name="Test Album", artist_id=fake_artist.id)
-    fake_track = Track(
-        id="track_789",
-        name="Test Track",
-        duration_ms=180000,
-        artist_id=fake_artist.id,
-        album_id=fake_album.id,
-        created_at=None
-    )
+    }
+
+
+@pytest.mark.asyncio
+async def test_process_valid_spotify_data_creates_user_and_counts_records() -> None:
+    service = make_service(user=None)
+
+    result = await service.process_spotify_data([make_record("Test Track")], "test_user")
 
-    with patch(
-        "app.services.data_service.artist_crud.get_or_create_by_name",
-        new=AsyncMock(return_value=fake_artist)
-    ), \
-        patch(
-            "app.services.data_service.album_crud.get_or_create_by_name_and_artist",
-            new=AsyncMock(return_value=fake_album)
-        ), \
-        patch(
-            "app.services.data_service.track_crud.get_or_create_track",
-            new=AsyncMock(return_value=fake_track)
-        ), \
-        patch("app.services.data_service.UserCRUD") as MockUserCRUD:
-        
-        MockUserCRUD.return_value.get_user_by_id = AsyncMock(return_value=None)
-        MockUserCRUD.return_value.create_user = AsyncMock(return_value=fake_user)
-
-        service = DataService()
-        result = await service.process_spotify_data(mock_data, user_id, mock_db)
-
-        assert result["processed"] == 1
-        assert result["skipped"] == 0
-        mock_db.commit.assert_awaited_once()
+    assert result["processed"] == 1
+    assert result["skipped"] == 0
+    service.user_repo.create.assert_awaited_once()
+    service.event_repo.bulk_create_events.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 async def test_process_invalid_data_skips_record() -> None:
-    mock_db = AsyncMock(spec=AsyncSession)
-    mock_data = [{"ts": "invalid-date"}]
-    user_id = "test_user"
+    service = make_service(user=MagicMock(id="test_user"))
+
+    result = await service.process_spotify_data([{"ts": "invalid-date"}], "test_user")
+
+    assert result["processed"] == 0
+    assert result["skipped"] == 1
+    service.artist_repo.bulk_get_or_create_by_names.assert_not_awaited()
+    service.event_repo.bulk_create_events.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_resolves_each_entity_type_once_per_chunk() -> None:
+    service = make_service(user=MagicMock(id="test_user"))
+    data = [
+        make_record("Song A"),
+        make_record("Song A"),
+        make_record("Song B", artist="Other Artist"),
+    ]
+
+    result = await service.process_spotify_data(data, "test_user")
+
+    assert result == {
+        "processed": 3,
+        "inserted": 3,
+        "duplicates": 0,
+        "skipped": 0,
+        "invalid_records": [],
+    }
+    service.artist_repo.bulk_get_or_create_by_names.assert_awaited_once()
+    service.album_repo.bulk_get_or_create.assert_awaited_once()
+    service.track_repo.bulk_get_or_create.assert_awaited_once()
+    (tracks,) = service.track_repo.bulk_get_or_create.await_args.args
+    assert sorted(t.name for t in tracks) == ["Song A", "Song B"]
+    _, events = service.event_repo.bulk_create_events.await_args.args
+    assert [track_id for track_id, _, _ in events] == [
+        "track:Song A", "track:Song A", "track:Song B"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_process_splits_data_into_chunks(monkeypatch) -> None:
+    monkeypatch.setattr("app.services.data_service.settings.ingest_chunk_size", 2)
+    service = make_service(user=MagicMock(id="test_user"))
+    data = [make_record(f"Song {i}") for i in range(5)]
+
+    result = await service.process_spotify_data(data, "test_user")
+
+    assert result["processed"] == 5
+    assert service.event_repo.bulk_create_events.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_process_reports_invalid_record_indexes(monkeypatch) -> None:
+    monkeypatch.setattr("app.services.data_service.settings.ingest_chunk_size", 2)
+    service = make_service(user=MagicMock(id="test_user"))
+    data = [
+        make_record("Song A"),
+        {"ts": "2023-01-01T12:00:00Z", "ms_played": 0},
+        make_record("Song B"),
+        "not-a-record",
+        {**make_record("Song C"), "ts": "not-a-date"},
+    ]
+
+    result = await service.process_spotify_data(data, "test_user")
+
+    assert result["processed"] == 2
+    assert result["skipped"] == 3
+    assert result["invalid_records"] == [1, 3, 4]
 
-    with patch("app.services.data_service.UserCRUD") as MockUserCRUD:
-        crud_instance = MockUserCRUD.return_value
-        crud_instance.get_user_by_id = AsyncMock(return_value=AsyncMock())
 
-        service = DataService()
-        result = await service.process_spotify_data(mock_data, user_id, mock_db)
+@pytest.mark.asyncio
+async def test_process_uses_copy_loader_when_enabled(monkeypatch) -> None:
+    monkeypatch.setattr("app.services.data_service.settings.ingest_use_copy", True)
+    service = make_service(user=MagicMock(id="test_user"))
+    service.event_repo.copy_plays.side_effect = lambda user_id, plays: len(plays)
+
+    result = await service.process_spotify_data(
+        [make_record("Song A"), make_record("Song B")], "test_user"
+    )
+
+    assert result["processed"] == 2
+    service.event_repo.copy_plays.assert_awaited_once()
+    service.artist_repo.bulk_get_or_create_by_names.assert_not_awaited()
+    service.event_repo.bulk_create_events.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_reports_duplicates_rejected_by_database() -> None:
+    service = make_service(user=MagicMock(id="test_user"))
+    service.event_repo.bulk_create_events.side_effect = (
+        lambda user_id, events: len(events) - 1
+    )
+
+    result = await service.process_spotify_data(
+        [make_record("Song A"), make_record("Song B")], "test_user"
+    )
+
+    assert (result["processed"], result["inserted"], result["duplicates"]) == (2, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_process_skips_plays_inside_covered_range() -> None:
+    covered = (
+        datetime(2023, 1, 1, tzinfo=timezone.utc),
+        datetime(2023, 6, 30, tzinfo=timezone.utc),
+    )
+    service = make_service(user=MagicMock(id="test_user"), covered=covered)
+    data = [
+        make_record("Old", ts="2023-03-01T00:00:00Z"),
+        make_record("New", ts="2023-07-01T00:00:00Z"),
+    ]
+
+    result = await service.process_spotify_data(data, "test_user")
+
+    assert (result["processed"], result["inserted"], result["duplicates"]) == (2, 1, 1)
+    _, events = service.event_repo.bulk_create_events.await_args.args
+    assert [track_id for track_id, _, _ in events] == ["track:New"]
+    service.event_repo.ensure_partitions.assert_awaited_once_with(
+        datetime(2023, 7, 1, tzinfo=timezone.utc),
+        datetime(2023, 7, 1, tzinfo=timezone.utc),
+    )
+    service.event_repo.extend_covered_range.assert_awaited_once_with(
+        "test_user",
+        datetime(2023, 3, 1, tzinfo=timezone.utc),
+        datetime(2023, 7, 1, tzinfo=timezone.utc),
+    )
+
+
+@pytest.mark.asyncio
+async def test_process_fully_covered_upload_skips_database_writes() -> None:
+    covered = (
+        datetime(2022, 1, 1, tzinfo=timezone.utc),
+        datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    service = make_service(user=MagicMock(id="test_user"), covered=covered)
+
+    result = await service.process_spotify_data([make_record("Song A")], "test_user")
+
+    assert result["duplicates"] == 1
+    service.artist_repo.bulk_get_or_create_by_names.assert_not_awaited()
+    service.event_repo.bulk_create_events.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_without_valid_plays_keeps_coverage() -> None:
+    service = make_service(user=MagicMock(id="test_user"))
+
+    await service.process_spotify_data([{"ts": "invalid-date"}], "test_user")
+
+    service.event_repo.extend_covered_range.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_resolves_tracks_with_uri_by_id() -> None:
+    service = make_service(user=MagicMock(id="test_user"))
+    uri = "spotify:track:4uLU6hMCjMI75M1A2tKUQC"
+    data = [make_record("Song A", uri=uri), make_record("Song B")]
+
+    await service.process_spotify_data(data, "test_user")
 
-        assert result["processed"] == 0
-        assert result["skipped"] == 1
-        mock_db.commit.assert_awaited_once()
+    (by_id,) = service.track_repo.bulk_create_missing.await_args.args
+    assert [t.id for t in by_id] == ["4uLU6hMCjMI75M1A2tKUQC"]
+    (by_name,) = service.track_repo.bulk_get_or_create.await_args.args
+    assert [t.name for t in by_name] == ["Song B"]
+    _, events = service.event_repo.bulk_create_events.await_args.args
+    assert [track_id for track_id, _, _ in events] == [
+        "4uLU6hMCjMI75M1A2tKUQC", "track:Song B"
+    ]
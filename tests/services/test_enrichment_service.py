@@ -0,0 +1,126 @@
+import asyncio
+from typing import Iterator
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+import respx
+
+from app.clients.spotify import SpotifyClient
+from app.config import settings
+from app.constants.spotify import SPOTIFY_API_BASE_URL, SPOTIFY_TOKEN_URL
+from app.services.enrichment_service import AudioFeaturesEnrichmentService
+
+FEATURES_URL = f"{SPOTIFY_API_BASE_URL}/audio-features"
+
+
+def track_id(n: int) -> str:
+    return f"{n:022d}"
+
+
+def features_for(request: httpx.Request) -> httpx.Response:
+    ids = request.url.params["ids"].split(",")
+    return httpx.Response(200, json={"audio_features": [
+        # Spotify answers null for tracks it has no features for.
+        None if i == track_id(0) else {"id": i, "energy": 0.5, "tempo": 120.0}
+        for i in ids
+    ]})
+
+
+def make_repo(track_ids: list[str]) -> AsyncMock:
+    repo = AsyncMock()
+
+    async def missing(limit: int, after: str | None = None) -> list[str]:
+        pending = [i for i in track_ids if after is None or i > after]
+        return pending[:limit]
+
+    repo.get_missing_audio_features.side_effect = missing
+    return repo
+
+
+@pytest.fixture
+def token() -> Iterator[respx.Route]:
+    with respx.mock:
+        yield respx.post(SPOTIFY_TOKEN_URL).mock(
+            return_value=httpx.Response(200, json={"access_token": "t"})
+        )
+
+
+@pytest.mark.asyncio
+async def test_run_fetches_batches_and_bulk_updates(token: respx.Route) -> None:
+    ids = [track_id(n) for n in range(250)]
+    route = respx.get(FEATURES_URL).mock(side_effect=features_for)
+    repo = make_repo(ids)
+
+    async with httpx.AsyncClient() as http:
+        service = AudioFeaturesEnrichmentService(
+            SpotifyClient(settings, http=http), repo, max_in_flight=2
+        )
+        counts = await service.run()
+
+    assert counts == {
+        "requested": 250, "enriched": 249, "unavailable": 1, "failed": 0
+    }
+    assert [len(c.request.url.params["ids"].split(",")) for c in route.calls] \
+        == [100, 100, 50]
+    # One bulk UPDATE per page of max_in_flight batches.
+    pages = [call.args[0] for call in repo.bulk_update.await_args_list]
+    assert [len(rows) for rows in pages] == [200, 50]
+    unavailable = pages[0][0]
+    assert set(unavailable) == {"id", "audio_features_checked_at"}
+    assert pages[0][1]["energy"] == 0.5 and pages[0][1]["valence"] is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_waits_for_retry_after(token: respx.Route) -> None:
+    route = respx.get(FEATURES_URL).mock(side_effect=[
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        features_for,
+    ])
+    repo = make_repo([track_id(1)])
+
+    async with httpx.AsyncClient() as http:
+        service = AudioFeaturesEnrichmentService(SpotifyClient(settings, http=http), repo)
+        counts = await service.run()
+
+    assert counts["enriched"] == 1
+    assert route.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_left_for_the_next_run(token: respx.Route) -> None:
+    respx.get(FEATURES_URL).mock(return_value=httpx.Response(502))
+    repo = make_repo([track_id(1), track_id(2)])
+
+    async with httpx.AsyncClient() as http:
+        service = AudioFeaturesEnrichmentService(SpotifyClient(settings, http=http), repo)
+        counts = await service.run()
+
+    assert counts["failed"] == 2
+    repo.bulk_update.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_requests_in_flight_are_bounded(token: respx.Route) -> None:
+    active = peak = 0
+
+    async def slow(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return features_for(request)
+
+    respx.get(FEATURES_URL).mock(side_effect=slow)
+    repo = make_repo([track_id(n) for n in range(1, 1001)])
+
+    async with httpx.AsyncClient() as http:
+        service = AudioFeaturesEnrichmentService(
+            SpotifyClient(settings, http=http), repo,
+            max_in_flight=3, batch_size=10
+        )
+        counts = await service.run(max_tracks=95)
+
+    assert counts["requested"] == 95
+    assert peak <= 3
@@ -0,0 +1,78 @@
+import pytest
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.genre_preference_service import (
+    COMPUTED_VERSIONS_KEY,
+    GenrePreferenceService,
+)
+
+pytestmark = pytest.mark.asyncio
+
+AS_OF = datetime(2024, 1, 10, tzinfo=timezone.utc)
+
+
+def make_service(
+    versions: dict[str, str],
+    computed: dict[str, str],
+    batch_users: int = 2
+) -> tuple[GenrePreferenceService, AsyncMock, MagicMock]:
+    repo = AsyncMock()
+    repo.get_user_ids.return_value = ["u1", "u2", "u3"]
+    repo.get_artist_day_plays.side_effect = lambda user_ids: [
+        (user_id, date(2024, 1, 9), ["rock"], 1000) for user_id in user_ids
+    ]
+    repo.replace_for_users.side_effect = lambda user_ids, rows: len(rows)
+    redis = MagicMock()
+    redis.mget.side_effect = lambda keys: [
+        versions.get(key.rsplit(":", 1)[1]) for key in keys
+    ]
+    redis.hmget.side_effect = lambda key, user_ids: [
+        computed.get(user_id) for user_id in user_ids
+    ]
+    return GenrePreferenceService(repo, redis, batch_users), repo, redis
+
+
+async def test_only_users_with_new_data_are_rescored() -> None:
+    service, repo, redis = make_service(
+        versions={"u1": "3", "u2": "1"}, computed={"u1": "2", "u2": "1", "u3": "0"}
+    )
+
+    counts = await service.run(as_of=AS_OF)
+
+    assert counts == {"users": 1, "unchanged": 2, "scores": 3}
+    repo.get_artist_day_plays.assert_awaited_once_with(["u1"])
+    user_ids, rows = repo.replace_for_users.await_args.args
+    assert user_ids == ["u1"]
+    assert {row["period"] for row in rows} == {
+        "short_term", "medium_term", "long_term"
+    }
+    assert rows[0]["user_id"] == "u1" and rows[0]["preference_score"] == 1.0
+    assert rows[0]["calculated_at"] == AS_OF
+    # The 2024-01-09 play leaves the 28-day short_term window on 2024-02-06.
+    redis.hset.assert_called_once_with(
+        COMPUTED_VERSIONS_KEY, mapping={"u1": "3@2024-02-06"}
+    )
+
+
+async def test_unchanged_users_are_rescored_once_a_play_leaves_a_window() -> None:
+    service, repo, _ = make_service(
+        versions={"u1": "2", "u2": "2", "u3": "2"},
+        computed={"u1": "2@2024-01-10", "u2": "2@2024-01-11", "u3": "2"}
+    )
+
+    counts = await service.run(as_of=AS_OF)
+
+    assert counts["users"] == 1
+    repo.get_artist_day_plays.assert_awaited_once_with(["u1"])
+
+
+async def test_force_rescores_everyone_in_batches() -> None:
+    service, repo, _ = make_service(versions={}, computed={"u1": "0"})
+
+    counts = await service.run(force=True, as_of=AS_OF)
+
+    assert counts["users"] == 3
+    assert [c.args[0] for c in repo.get_artist_day_plays.await_args_list] == [
+        ["u1", "u2"], ["u3"]
+    ]
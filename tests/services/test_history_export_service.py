@@ -0,0 +1,71 @@
+import gzip
+import json
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from app.crud.listening_event_crud import EXPORT_FIELDS
+from app.services.history_export_service import HistoryExportService
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_row(i: int) -> dict:
+    row = dict.fromkeys(EXPORT_FIELDS)
+    row.update(
+        played_at=datetime(2023, 1, 1, 0, i, tzinfo=timezone.utc),
+        duration_ms=1000,
+        track_id=f"track-{i}",
+        track_name=f"Track {i}",
+    )
+    return row
+
+
+@pytest.fixture
+def service(monkeypatch):
+    calls = []
+
+    async def stream(self, user_id, start, end, batch_size):
+        calls.append((self.session, user_id, start, end, batch_size))
+        for i in range(3):
+            yield make_row(i)
+
+    monkeypatch.setattr(
+        "app.services.history_export_service."
+        "SQLAlchemyListeningEventRepository.stream_user_export",
+        stream
+    )
+    session = MagicMock()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    return HistoryExportService(session_factory), calls, session
+
+
+async def collect(service: HistoryExportService, *args) -> bytes:
+    return b"".join([chunk async for chunk in service.export(*args)])
+
+
+async def test_ndjson_export_uses_its_own_session(service) -> None:
+    export, calls, session = service
+
+    body = await collect(export, "user-1")
+
+    lines = body.decode().splitlines()
+    assert [json.loads(line)["track_id"] for line in lines] == [
+        "track-0", "track-1", "track-2"
+    ]
+    assert calls[0][:2] == (session, "user-1")
+
+
+async def test_gzipped_csv_export(service) -> None:
+    export, _, _ = service
+
+    body = gzip.decompress(await collect(export, "user-1", "csv", True))
+
+    lines = body.decode().splitlines()
+    assert lines[0] == ",".join(EXPORT_FIELDS)
+    assert len(lines) == 4
@@ -0,0 +1,150 @@
+import json
+import pytest
+import zipfile
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest.mock import AsyncMock
+
+from app.repositories.ingestion_job import IngestionJobRepository
+from app.services.ingestion_job_service import IngestionJobService
+
+
+class InMemoryJobRepository(IngestionJobRepository):
+    def __init__(self) -> None:
+        self.jobs: dict[str, dict[str, Any]] = {}
+
+    def create(self, job_id: str, user_id: str, bytes_total: int) -> None:
+        self.jobs[job_id] = {
+            "id": job_id,
+            "user_id": user_id,
+            "status": "queued",
+            "bytes_total": bytes_total,
+            "created_at": datetime.now(timezone.utc),
+        }
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        self.jobs[job_id].update(fields)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        return self.jobs.get(job_id)
+
+
+def make_data_service(result: dict[str, Any]) -> AsyncMock:
+    async def process(records, user_id, on_progress=None):
+        async for _ in records:
+            pass
+        await on_progress(result["processed"], result["skipped"])
+        return result
+
+    data_service = AsyncMock()
+    data_service.process_spotify_stream.side_effect = process
+    return data_service
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_completion(tmp_path) -> None:
+    upload = tmp_path / "upload.json"
+    upload.write_text(json.dumps([{"ts": "x"}, {"ts": "y"}]))
+    repo = InMemoryJobRepository()
+    service = IngestionJobService(repo)
+    job_id = service.create_job("user-1", upload.stat().st_size)
+
+    result = {
+        "processed": 1,
+        "inserted": 1,
+        "duplicates": 0,
+        "skipped": 1,
+        "invalid_records": [1],
+    }
+    await service.run_job(job_id, "user-1", str(upload), make_data_service(result))
+
+    job = service.get_status(job_id)
+    assert job is not None
+    assert job.status == "completed"
+    assert job.processed == 1
+    assert job.bytes_read == job.bytes_total
+    assert job.invalid_records == [1]
+    assert job.eta_seconds == 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_job_marks_bad_json_as_failed(tmp_path) -> None:
+    upload = tmp_path / "upload.json"
+    upload.write_text('[{"ts": "x"}, {broken')
+    repo = InMemoryJobRepository()
+    service = IngestionJobService(repo)
+    job_id = service.create_job("user-1", upload.stat().st_size)
+
+    await service.run_job(job_id, "user-1", str(upload), make_data_service({}))
+
+    job = service.get_status(job_id)
+    assert job is not None
+    assert job.status == "failed"
+    assert "record 1" in (job.error or "")
+
+
+@pytest.mark.asyncio
+async def test_run_archive_job_parses_members_in_pool(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "app.services.ingestion_job_service.settings.ingest_parse_processes", 2
+    )
+    record = {
+        "ts": "2023-01-01T12:00:00Z",
+        "master_metadata_track_name": "Track",
+        "master_metadata_album_artist_name": "Artist",
+        "master_metadata_album_album_name": "Album",
+        "ms_played": 1000
+    }
+    archive_path = tmp_path / "export.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for year in range(2018, 2023):
+            archive.writestr(
+                f"Streaming_History_Audio_{year}.json",
+                json.dumps([record] * 3 + [{"ts": None}])
+            )
+        archive.writestr("Streaming_History_Audio_broken.json", "[{")
+
+    repo = InMemoryJobRepository()
+    service = IngestionJobService(repo)
+    job_id = service.create_job("user-1", archive_path.stat().st_size)
+    data_service = AsyncMock()
+    # Every file repeats one play that is already stored.
+    data_service.ingest_plays.side_effect = lambda plays, user_id: {
+        "processed": len(plays),
+        "inserted": len(plays) - 1,
+        "duplicates": 1,
+    }
+
+    result = await service.run_archive_job(
+        job_id, "user-1", str(archive_path), data_service
+    )
+
+    assert result is not None
+    assert result["processed"] == 15
+    assert (result["inserted"], result["duplicates"]) == (10, 5)
+    assert result["skipped"] == 5
+    assert result["failed_files"] == ["Streaming_History_Audio_broken.json"]
+    job = service.get_status(job_id)
+    assert job is not None
+    assert job.status == "completed"
+    assert (job.files_total, job.files_done) == (6, 6)
+
+
+def test_get_status_estimates_remaining_time() -> None:
+    repo = InMemoryJobRepository()
+    service = IngestionJobService(repo)
+    job_id = service.create_job("user-1", 1000)
+    repo.update(
+        job_id,
+        status="running",
+        started_at=datetime.now(timezone.utc) - timedelta(seconds=10),
+        processed=400,
+        skipped=0,
+        bytes_read=250
+    )
+
+    job = service.get_status(job_id)
+
+    assert job is not None
+    assert job.records_per_second == pytest.approx(40, rel=0.05)
+    assert job.eta_seconds == pytest.approx(30, rel=0.05)
@@ -0,0 +1,80 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.listening_event import ListeningEvent
+from app.services.listening_history_service import ListeningHistoryService
+from app.utils.cursor import InvalidCursor, decode_cursor, encode_cursor
+
+
+def make_event(event_id: int, day: int) -> ListeningEvent:
+    return ListeningEvent(
+        id=event_id,
+        user_id="user-1",
+        track_id="track-1",
+        played_at=datetime(2023, 1, day, tzinfo=timezone.utc),
+        duration_ms=1000,
+        progress_ms=0,
+        skipped=False,
+        created_at=datetime(2023, 2, 1, tzinfo=timezone.utc),
+    )
+
+
+def make_service(
+    events: list[ListeningEvent],
+    cached: str | None = None
+) -> tuple[ListeningHistoryService, AsyncMock, MagicMock]:
+    repo = AsyncMock()
+    repo.get_user_listening_history.return_value = events
+    repo.count_user_events.return_value = 42
+    redis = MagicMock()
+    redis.hget.return_value = cached
+    return ListeningHistoryService(repo, redis), repo, redis
+
+
+def test_cursor_round_trip() -> None:
+    played_at = datetime(2023, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor(played_at, 17)) == (played_at, 17)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not a cursor")
+
+
+@pytest.mark.asyncio
+async def test_get_page_returns_next_cursor_when_more_rows_exist() -> None:
+    events = [make_event(3, 3), make_event(2, 2), make_event(1, 1)]
+    service, repo, _ = make_service(events)
+
+    page = await service.get_page("user-1", limit=2)
+
+    assert [event.id for event in page.events] == [3, 2]
+    assert decode_cursor(page.next_cursor) == (events[1].played_at, 2)
+    assert page.total == 42
+    # One extra row tells whether another page exists.
+    assert repo.get_user_listening_history.await_args.args[1] == 3
+
+
+@pytest.mark.asyncio
+async def test_get_page_seeks_from_cursor_and_uses_cached_total() -> None:
+    service, repo, redis = make_service([make_event(1, 1)], cached="7")
+    cursor = encode_cursor(datetime(2023, 1, 2, tzinfo=timezone.utc), 2)
+
+    page = await service.get_page("user-1", limit=2, cursor=cursor, offset=50)
+
+    assert page.next_cursor is None
+    assert page.total == 7
+    args = repo.get_user_listening_history.await_args.args
+    assert args[2] == 0
+    assert args[5] == (datetime(2023, 1, 2, tzinfo=timezone.utc), 2)
+    repo.count_user_events.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_page_json_matches_page() -> None:
+    events = [make_event(2, 2), make_event(1, 1)]
+    service, _, _ = make_service(events, cached="2")
+
+    page = await service.get_page("user-1", limit=5)
+    body = await service.get_page_json("user-1", limit=5)
+
+    assert body == page.model_dump_json().encode()
@@ -0,0 +1,145 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from typing import AsyncIterator
+from unittest.mock import AsyncMock
+
+import pyarrow.dataset as ds
+
+from app.services.parquet_export_service import (
+    STATE_FILE,
+    ParquetExportService,
+    dataset_dir,
+)
+
+pytestmark = pytest.mark.asyncio
+
+# `xid` is the inserting transaction: event 3 got a low id from a
+# transaction that committed after the one holding event 4.
+EVENTS = [
+    {"id": 1, "xid": 10, "user_id": "u1", "played_at": datetime(2023, 1, 31, 23, tzinfo=timezone.utc)},
+    {"id": 2, "xid": 11, "user_id": "u2", "played_at": datetime(2023, 2, 1, 1, tzinfo=timezone.utc)},
+    {"id": 3, "xid": 13, "user_id": "u1", "played_at": datetime(2023, 1, 5, tzinfo=timezone.utc)},
+    {"id": 4, "xid": 12, "user_id": "u1", "played_at": datetime(2023, 2, 2, tzinfo=timezone.utc)},
+]
+
+
+def make_repo(finished_xid: int, fail: bool = False) -> AsyncMock:
+    repo = AsyncMock()
+    repo.get_finished_xid.return_value = finished_xid
+
+    async def stream(
+        fields: list[str],
+        from_xid: int,
+        to_xid: int,
+        user_id: str | None,
+        batch_size: int
+    ) -> AsyncIterator[list[tuple]]:
+        rows = [
+            tuple(event.get(field) for field in fields)
+            for event in EVENTS
+            if from_xid <= event["xid"] < to_xid
+            and user_id in (None, event["user_id"])
+        ]
+        for i in range(0, len(rows), batch_size):
+            yield rows[i:i + batch_size]
+        if fail:
+            raise RuntimeError("connection lost")
+
+    repo.stream_event_batches = stream
+    return repo
+
+
+def read(path) -> list[dict]:
+    table = ds.dataset(path, format="parquet", partitioning="hive").to_table()
+    return sorted(table.to_pylist(), key=lambda row: row["id"])
+
+
+async def test_exports_incrementally_by_month(tmp_path) -> None:
+    columns = ["user_id"]
+    # Transaction 13 (event 3) is still open: event 4 goes first.
+    first = await ParquetExportService(
+        make_repo(13), export_dir=str(tmp_path), batch_size=1
+    ).export(columns=columns)
+    second = await ParquetExportService(
+        make_repo(14), export_dir=str(tmp_path), batch_size=1
+    ).export(columns=columns)
+
+    root = dataset_dir(str(tmp_path))
+    assert first == {"rows": 3, "files": 2, "last_xid": 13}
+    assert second == {"rows": 1, "files": 1, "last_xid": 14}
+    rows = read(root)
+    assert [row["id"] for row in rows] == [1, 2, 3, 4]
+    assert [row["month"] for row in rows] == ["2023-01", "2023-02", "2023-01", "2023-02"]
+    assert set(rows[0]) == {"id", "user_id", "played_at", "month"}
+    assert json.loads((root / STATE_FILE).read_text())["last_xid"] == 14
+
+
+async def test_nothing_new_leaves_state_alone(tmp_path) -> None:
+    service = ParquetExportService(make_repo(5), export_dir=str(tmp_path))
+
+    assert await service.export() == {"rows": 0, "files": 0, "last_xid": 0}
+    assert not dataset_dir(str(tmp_path)).exists()
+
+
+async def test_rerun_after_a_crash_replaces_the_published_parts(tmp_path) -> None:
+    service = ParquetExportService(make_repo(12), export_dir=str(tmp_path))
+    # Crash after the parts were published but before the state was saved.
+    service._save_state = lambda root, state: None
+    await service.export(columns=["user_id"])
+
+    rerun = await ParquetExportService(
+        make_repo(14), export_dir=str(tmp_path)
+    ).export(columns=["user_id"])
+
+    root = dataset_dir(str(tmp_path))
+    assert rerun["rows"] == 4
+    assert [row["id"] for row in read(root)] == [1, 2, 3, 4]
+    assert sorted(path.name for path in root.rglob("part-*")) == [
+        "part-0-14.parquet", "part-0-14.parquet"
+    ]
+
+
+async def test_id_watermarked_dataset_is_refused(tmp_path) -> None:
+    root = dataset_dir(str(tmp_path))
+    root.mkdir(parents=True)
+    (root / STATE_FILE).write_text(json.dumps({
+        "columns": ["id", "user_id", "played_at"], "last_id": 4
+    }))
+
+    with pytest.raises(ValueError, match="id watermarks"):
+        await ParquetExportService(
+            make_repo(14), export_dir=str(tmp_path)
+        ).export(columns=["user_id"])
+
+
+async def test_user_export_is_its_own_dataset(tmp_path) -> None:
+    repo = make_repo(14)
+    result = await ParquetExportService(repo, export_dir=str(tmp_path)).export("u1")
+
+    assert result["rows"] == 3
+    assert [row["id"] for row in read(dataset_dir(str(tmp_path), "u1"))] == [1, 3, 4]
+
+
+async def test_projection_must_match_the_dataset(tmp_path) -> None:
+    await ParquetExportService(
+        make_repo(11), export_dir=str(tmp_path)
+    ).export(columns=["user_id"])
+
+    service = ParquetExportService(make_repo(14), export_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="exported with columns"):
+        await service.export(columns=["track_name"])
+    with pytest.raises(ValueError, match="Unknown export columns"):
+        await service.export(columns=["password"])
+
+
+async def test_failed_export_publishes_nothing(tmp_path) -> None:
+    service = ParquetExportService(
+        make_repo(14, fail=True), export_dir=str(tmp_path)
+    )
+    with pytest.raises(RuntimeError):
+        await service.export(columns=["user_id"])
+
+    root = dataset_dir(str(tmp_path))
+    assert not (root / STATE_FILE).exists()
+    assert not [path for path in root.rglob("*") if path.is_file()]
@@ -0,0 +1,110 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from redis import RedisError
+
+from app.services.response_cache import (
+    METRICS_KEY,
+    VERSION_KEY_PREFIX,
+    ResponseCache,
+    bump_data_version,
+    user_scope,
+)
+
+
+def make_redis(store: dict) -> MagicMock:
+    redis = MagicMock()
+    redis.get.side_effect = store.get
+    redis.set.side_effect = lambda key, value, ex: store.__setitem__(key, value)
+    return redis
+
+
+@pytest.mark.asyncio
+async def test_miss_loads_and_stores_then_hit_skips_loader() -> None:
+    store: dict = {}
+    redis = make_redis(store)
+    cache = ResponseCache(redis, ttl_seconds=60)
+    load = AsyncMock(return_value={"at": datetime(2023, 1, 1, tzinfo=timezone.utc)})
+    params = {"start": None}
+
+    first = await cache.get_or_load("stats", user_scope("u1"), params, load)
+    second = await cache.get_or_load("stats", user_scope("u1"), params, load)
+
+    assert first == second == {"at": "2023-01-01T00:00:00+00:00"}
+    load.assert_awaited_once()
+    assert redis.set.call_args.kwargs["ex"] == 60
+    assert [c.args for c in redis.hincrby.call_args_list] == [
+        (METRICS_KEY, "stats:misses", 1),
+        (METRICS_KEY, "stats:hits", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_version_bump_changes_the_entry_key() -> None:
+    store: dict = {}
+    cache = ResponseCache(make_redis(store))
+    load = AsyncMock(return_value=[1])
+
+    await cache.get_or_load("history", user_scope("u1"), {}, load)
+    store[f"{VERSION_KEY_PREFIX}user:u1"] = "1"
+    await cache.get_or_load("history", user_scope("u1"), {}, load)
+
+    assert load.await_count == 2
+    assert any(":user:u1:v1:" in key for key in store)
+
+
+@pytest.mark.asyncio
+async def test_none_is_not_cached() -> None:
+    store: dict = {}
+    redis = make_redis(store)
+
+    value = await ResponseCache(redis).get_or_load(
+        "stats", "user:u1", {}, AsyncMock(return_value=None)
+    )
+
+    assert value is None
+    redis.set.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_loader() -> None:
+    redis = MagicMock()
+    redis.get.side_effect = RedisError("down")
+
+    value = await ResponseCache(redis).get_or_load(
+        "stats", "user:u1", {}, AsyncMock(return_value={"total": 1})
+    )
+
+    assert value == {"total": 1}
+
+
+def test_bump_and_metrics() -> None:
+    redis = MagicMock()
+    bump_data_version(redis, user_scope("u1"), "catalog")
+    pipe = redis.pipeline.return_value
+    assert [c.args[0] for c in pipe.incr.call_args_list] == [
+        f"{VERSION_KEY_PREFIX}user:u1", f"{VERSION_KEY_PREFIX}catalog"
+    ]
+
+    redis.hgetall.return_value = {"stats:hits": "3", "artist_tracks:misses": "2"}
+    assert ResponseCache(redis).metrics() == {
+        "stats": {"hits": 3, "misses": 0},
+        "artist_tracks": {"hits": 0, "misses": 2},
+    }
+
+
+@pytest.mark.asyncio
+async def test_json_bodies_are_cached_as_is() -> None:
+    store: dict = {}
+    redis = make_redis(store)
+    cache = ResponseCache(redis)
+    load = AsyncMock(return_value=b'[{"id":"t1"}]')
+
+    first = await cache.get_or_load_json("artist_tracks", "catalog", {}, load)
+    # decode_responses=True clients hand back str.
+    store.update({key: value.decode() for key, value in store.items()})
+    second = await cache.get_or_load_json("artist_tracks", "catalog", {}, load)
+
+    assert first == second == b'[{"id":"t1"}]'
+    load.assert_awaited_once()
@@ -0,0 +1,121 @@
+import json
+import zipfile
+from datetime import datetime, timezone
+
+from app.services.spotify_ingestion_service import (
+    ParsedPlay,
+    SpotifyIngestionService,
+    list_history_members,
+    parse_archive_member,
+)
+
+VALID_RECORD = {
+    "ts": "2023-01-01T12:00:00Z",
+    "master_metadata_track_name": "Track A",
+    "master_metadata_album_artist_name": "Artist A",
+    "master_metadata_album_album_name": "Album A",
+    "ms_played": 120000
+}
+
+
+def test_parse_plays_returns_invalid_positions() -> None:
+    records = [VALID_RECORD, {"ts": "2023-01-01T12:00:00Z"}, "junk",
+               {**VALID_RECORD, "ts": "yesterday"}]
+
+    plays, invalid = SpotifyIngestionService().parse_plays(records)
+
+    assert plays == [ParsedPlay(
+        track_name="Track A",
+        artist_name="Artist A",
+        album_name="Album A",
+        played_at=datetime(2023, 1, 1, 12, tzinfo=timezone.utc),
+        ms_played=120000
+    )]
+    assert invalid == [1, 2, 3]
+
+
+def test_parse_record_keeps_legacy_shape() -> None:
+    track, played_at, ms_played = SpotifyIngestionService().parse_record(
+        VALID_RECORD, "artist-1", "album-1"
+    )
+
+    assert (track.name, track.artist_id, track.album_id) == (
+        "Track A", "artist-1", "album-1"
+    )
+    assert played_at.year == 2023
+    assert ms_played == 120000
+
+
+def test_archive_members_are_filtered_and_parsed(tmp_path) -> None:
+    archive_path = tmp_path / "my_spotify_data.zip"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "Spotify Extended Streaming History/Streaming_History_Audio_2023.json",
+            json.dumps([VALID_RECORD, {"ts": None}])
+        )
+        archive.writestr(
+            "Spotify Extended Streaming History/Streaming_History_Video_2023.json",
+            "[]"
+        )
+        archive.writestr("ReadMeFirst.pdf", b"%PDF")
+
+    members = list_history_members(str(archive_path))
+
+    assert [info.filename for info in members] == [
+        "Spotify Extended Streaming History/Streaming_History_Audio_2023.json"
+    ]
+    plays, invalid = parse_archive_member(str(archive_path), members[0].filename)
+    assert len(plays) == 1
+    assert invalid == 1
+
+
+def test_parse_batch_returns_columns_and_validity_mask() -> None:
+    records = [
+        VALID_RECORD,
+        {**VALID_RECORD, "ts": "2023-01-01T12:00:00.250Z", "ms_played": "5"},
+        {**VALID_RECORD, "ms_played": 0},
+        {**VALID_RECORD, "master_metadata_track_name": None},
+        {**VALID_RECORD, "ts": 1672574400},
+        None,
+    ]
+
+    frame = SpotifyIngestionService().parse_batch(records)
+
+    assert frame["valid"].tolist() == [True, True, False, False, False, False]
+    assert str(frame["played_at"].dtype) == "datetime64[ns, UTC]"
+    assert frame["ms_played"].tolist()[:2] == [120000, 5]
+    assert frame["played_at"][1].microsecond == 250000
+
+
+def test_parse_batch_handles_empty_chunk() -> None:
+    service = SpotifyIngestionService()
+
+    assert service.parse_plays([]) == ([], [])
+
+
+def test_track_uri_becomes_track_id() -> None:
+    service = SpotifyIngestionService()
+    records = [
+        {**VALID_RECORD, "spotify_track_uri": "spotify:track:4uLU6hMCjMI75M1A2tKUQC"},
+        {**VALID_RECORD, "spotify_track_uri": "spotify:episode:4uLU6hMCjMI75M1A2tKUQC"},
+        VALID_RECORD,
+    ]
+
+    plays, _ = service.parse_plays(records)
+
+    assert [play.spotify_track_id for play in plays] == [
+        "4uLU6hMCjMI75M1A2tKUQC", None, None
+    ]
+    assert service.parse_play(records[0]) == plays[0]
+    assert service.track_id(plays[0]) == "4uLU6hMCjMI75M1A2tKUQC"
+
+
+def test_track_id_without_uri_is_deterministic() -> None:
+    service = SpotifyIngestionService()
+    play = service.parse_play(VALID_RECORD)
+    other = service.parse_play(
+        {**VALID_RECORD, "master_metadata_album_album_name": "Album B"}
+    )
+
+    assert service.track_id(play) == service.track_id(service.parse_play(VALID_RECORD))
+    assert service.track_id(play) != service.track_id(other)
@@ -0,0 +1,24 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.recommendations.item_similarity import SimilarTracksIndex
+from app.services.track_similarity_service import TrackSimilarityService
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_rebuild_saves_index_from_streamed_play_counts(tmp_path) -> None:
+    async def stream():
+        yield [("a", "x", 3), ("a", "y", 1), ("b", "x", 1)]
+        yield [("b", "y", 2), ("c", "z", 9)]
+
+    repo = AsyncMock()
+    repo.stream_track_plays = stream
+    path = tmp_path / "similar.npz"
+
+    counts = await TrackSimilarityService(repo, path=path, k=5).rebuild()
+
+    assert counts == {"users": 3, "tracks": 2, "pairs": 5}
+    index = SimilarTracksIndex.load(path)
+    assert [t.track_id for t in index.similar("y")] == ["x"]
+    assert "z" not in index
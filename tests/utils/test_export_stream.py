@@ -0,0 +1,60 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from datetime import datetime, timezone
+
+from app.utils.export_stream import gzip_chunks, iter_csv, iter_ndjson
+
+pytestmark = pytest.mark.asyncio
+
+FIELDS = ("played_at", "track_name", "skipped")
+
+
+async def rows(n: int):
+    for i in range(n):
+        yield {
+            "played_at": datetime(2023, 1, 1, 0, i % 60, tzinfo=timezone.utc),
+            "track_name": f"Søng, \"{i}\"",
+            "skipped": i % 2 == 0,
+        }
+
+
+async def collect(chunks) -> list[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+async def test_ndjson_lines_are_chunked() -> None:
+    chunks = await collect(iter_ndjson(rows(500), chunk_size=1024))
+
+    assert len(chunks) > 1
+    lines = b"".join(chunks).decode().splitlines()
+    assert len(lines) == 500
+    assert json.loads(lines[1]) == {
+        "played_at": "2023-01-01T00:01:00+00:00",
+        "track_name": "Søng, \"1\"",
+        "skipped": False,
+    }
+
+
+async def test_csv_has_header_and_quotes_values() -> None:
+    body = b"".join(await collect(iter_csv(rows(3), FIELDS, chunk_size=16)))
+
+    records = list(csv.reader(io.StringIO(body.decode())))
+    assert records[0] == list(FIELDS)
+    assert records[2] == ["2023-01-01T00:01:00+00:00", "Søng, \"1\"", "False"]
+
+
+async def test_empty_csv_is_just_the_header() -> None:
+    body = b"".join(await collect(iter_csv(rows(0), FIELDS)))
+    assert body.decode().splitlines() == [",".join(FIELDS)]
+
+
+async def test_gzip_round_trips() -> None:
+    plain = b"".join(await collect(iter_ndjson(rows(200), chunk_size=512)))
+    compressed = b"".join(
+        await collect(gzip_chunks(iter_ndjson(rows(200), chunk_size=512)))
+    )
+
+    assert gzip.decompress(compressed) == plain
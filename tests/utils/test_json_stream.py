@@ -0,0 +1,59 @@
+import io
+import json
+import pytest
+
+from app.utils.json_stream import JSONStreamError, iter_json_array
+
+pytestmark = pytest.mark.asyncio
+
+
+def reader(payload: bytes):
+    stream = io.BytesIO(payload)
+
+    async def read(size: int) -> bytes:
+        return stream.read(size)
+
+    return read
+
+
+async def collect(payload: bytes, read_size: int = 7, **kwargs) -> list:
+    return [
+        item async for item in iter_json_array(
+            reader(payload), read_size=read_size, **kwargs
+        )
+    ]
+
+
+async def test_yields_records_across_read_boundaries() -> None:
+    records = [
+        {"ts": "2023-01-01T12:00:00Z", "name": "Søng ♫", "ms_played": i}
+        for i in range(50)
+    ]
+    payload = json.dumps(records, indent=2).encode("utf-8")
+
+    assert await collect(payload) == records
+
+
+async def test_handles_bom_empty_array_and_scalars() -> None:
+    assert await collect(b"\xef\xbb\xbf  [ ]  ") == []
+    assert await collect(b"[1, 22, 333]", read_size=1) == [1, 22, 333]
+
+
+@pytest.mark.parametrize("payload, index", [
+    (b"{not-valid-json", 0),
+    (b'[{"a": 1}, {"b": }]', 1),
+    (b'[{"a": 1} {"b": 2}]', 1),
+    (b'[{"a": 1}, {"b": 2}', 2),
+    (b'[{"a": 1}] trailing', 1),
+])
+async def test_reports_failing_record_index(payload: bytes, index: int) -> None:
+    with pytest.raises(JSONStreamError) as exc:
+        await collect(payload)
+    assert exc.value.index == index
+
+
+async def test_rejects_oversized_record() -> None:
+    payload = b'[{"a": "' + b"x" * 1000
+
+    with pytest.raises(JSONStreamError):
+        await collect(payload, read_size=64, max_record_size=256)